@@ -1,12 +1,11 @@
 from logging.config import fileConfig
-import os
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
-from dotenv import load_dotenv
 from alembic import context
-from contacts.main import Base
+from contacts import models  # noqa: F401 - реєструє таблиці в метаданих
+from contacts.config import get_settings
+from contacts.database import Base
 
-load_dotenv()
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -21,7 +20,7 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 target_metadata = None
-database_url = os.getenv("SQLALCHEMY_DATABASE_URL")
+database_url = get_settings().database_url
 config.set_main_option("sqlalchemy.url", database_url)
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -0,0 +1,43 @@
+"""Add trigram search indexes to contacts table
+
+Revision ID: 3f1c9a7d2b10
+Revises: aa6c34f9961d
+Create Date: 2026-10-16 10:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b10'
+down_revision: Union[str, None] = 'aa6c34f9961d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ('first_name', 'last_name', 'email')
+
+
+def upgrade() -> None:
+    # Індекси pg_trgm існують лише на PostgreSQL; інші СУБД використовують індекс у пам'яті.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f'ix_contacts_{column}_trgm',
+            'contacts',
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f'ix_contacts_{column}_trgm', table_name='contacts')
@@ -0,0 +1,41 @@
+"""Add birthday_doy column to contacts table
+
+Revision ID: 8c4d1e6f2a75
+Revises: 5b7e2c4a9d31
+Create Date: 2026-10-16 11:48:02.913467
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4d1e6f2a75'
+down_revision: Union[str, None] = '5b7e2c4a9d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('birthday_doy', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_contacts_birthday_doy'), 'contacts', ['birthday_doy'], unique=False)
+    # Заповнення ключа (місяць * 100 + день) для наявних контактів
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "UPDATE contacts SET birthday_doy = "
+            "CAST(EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday) AS INTEGER) "
+            "WHERE birthday IS NOT NULL"
+        )
+    else:
+        op.execute(
+            "UPDATE contacts SET birthday_doy = "
+            "CAST(strftime('%m', birthday) AS INTEGER) * 100 + CAST(strftime('%d', birthday) AS INTEGER) "
+            "WHERE birthday IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_contacts_birthday_doy'), table_name='contacts')
+    op.drop_column('contacts', 'birthday_doy')
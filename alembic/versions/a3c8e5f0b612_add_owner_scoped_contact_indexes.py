@@ -0,0 +1,36 @@
+"""Add owner-scoped composite indexes to contacts table
+
+Revision ID: a3c8e5f0b612
+Revises: f1a6d8e2b457
+Create Date: 2026-10-16 18:11:42.508317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c8e5f0b612'
+down_revision: Union[str, None] = 'f1a6d8e2b457'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_contacts_owner_id_id', 'contacts', ['owner_id', 'id'], unique=False)
+    op.create_index(
+        'ix_contacts_owner_name_keyset', 'contacts', ['owner_id', 'last_name', 'first_name', 'id'], unique=False
+    )
+    op.create_index('ix_contacts_owner_birthday_doy', 'contacts', ['owner_id', 'birthday_doy'], unique=False)
+    # Запити без фільтра за власником більше не виконуються, тож індекси без owner_id зайві.
+    op.drop_index('ix_contacts_name_keyset', table_name='contacts')
+    op.drop_index(op.f('ix_contacts_birthday_doy'), table_name='contacts')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_contacts_birthday_doy'), 'contacts', ['birthday_doy'], unique=False)
+    op.create_index('ix_contacts_name_keyset', 'contacts', ['last_name', 'first_name', 'id'], unique=False)
+    op.drop_index('ix_contacts_owner_birthday_doy', table_name='contacts')
+    op.drop_index('ix_contacts_owner_name_keyset', table_name='contacts')
+    op.drop_index('ix_contacts_owner_id_id', table_name='contacts')
@@ -0,0 +1,32 @@
+"""Scope contact email and phone uniqueness to owner
+
+Revision ID: b9d4f2c7e813
+Revises: a3c8e5f0b612
+Create Date: 2026-10-16 19:02:17.114903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d4f2c7e813'
+down_revision: Union[str, None] = 'a3c8e5f0b612'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Глобальні унікальні індекси замінюються обмеженнями в межах власника.
+    op.drop_index(op.f('ix_contacts_email'), table_name='contacts')
+    op.drop_index(op.f('ix_contacts_phone'), table_name='contacts')
+    op.create_unique_constraint('uq_contacts_owner_email', 'contacts', ['owner_id', 'email'])
+    op.create_unique_constraint('uq_contacts_owner_phone', 'contacts', ['owner_id', 'phone'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_contacts_owner_phone', 'contacts', type_='unique')
+    op.drop_constraint('uq_contacts_owner_email', 'contacts', type_='unique')
+    op.create_index(op.f('ix_contacts_phone'), 'contacts', ['phone'], unique=True)
+    op.create_index(op.f('ix_contacts_email'), 'contacts', ['email'], unique=True)
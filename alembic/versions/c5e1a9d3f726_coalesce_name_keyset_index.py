@@ -0,0 +1,36 @@
+"""Build the name keyset index on coalesced names
+
+Revision ID: c5e1a9d3f726
+Revises: b9d4f2c7e813
+Create Date: 2026-10-17 09:14:52.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e1a9d3f726'
+down_revision: Union[str, None] = 'b9d4f2c7e813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Курсорна пагінація за іменем порівнює coalesce(стовпець, ''), щоб не пропускати записи з NULL.
+    op.drop_index('ix_contacts_owner_name_keyset', table_name='contacts')
+    op.create_index(
+        'ix_contacts_owner_name_keyset',
+        'contacts',
+        ['owner_id', sa.text("coalesce(last_name, '')"), sa.text("coalesce(first_name, '')"), 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_owner_name_keyset', table_name='contacts')
+    op.create_index(
+        'ix_contacts_owner_name_keyset', 'contacts', ['owner_id', 'last_name', 'first_name', 'id'], unique=False
+    )
@@ -0,0 +1,28 @@
+"""Add version and updated_at columns to contacts table
+
+Revision ID: d2a9f4b7c318
+Revises: 8c4d1e6f2a75
+Create Date: 2026-10-16 14:05:37.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a9f4b7c318'
+down_revision: Union[str, None] = '8c4d1e6f2a75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('contacts', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('contacts', 'updated_at')
+    op.drop_column('contacts', 'version')
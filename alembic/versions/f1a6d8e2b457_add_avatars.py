@@ -0,0 +1,41 @@
+"""Add avatar_url column to users and avatar_jobs table
+
+Revision ID: f1a6d8e2b457
+Revises: e7b3c5a1f940
+Create Date: 2026-10-16 17:02:19.734925
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6d8e2b457'
+down_revision: Union[str, None] = 'e7b3c5a1f940'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('avatar_url', sa.String(), nullable=True))
+    op.create_table(
+        'avatar_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('urls', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_avatar_jobs_user_id'), 'avatar_jobs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_avatar_jobs_user_id'), table_name='avatar_jobs')
+    op.drop_table('avatar_jobs')
+    op.drop_column('users', 'avatar_url')
@@ -0,0 +1,82 @@
+"""
+Порівняння швидкості серіалізації сторінки контактів.
+
+Звичайний шлях FastAPI (ORM-об'єкти → ``ContactResponse`` → ``jsonable_encoder`` → JSON)
+порівнюється зі швидким шляхом ``contacts.serialization`` (вибірка стовпців → orjson).
+
+Запуск:
+    python -m benchmarks.serialization_benchmark --rows 1000 --repeat 20
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import date
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from contacts import crud, schemas, serialization  # noqa: E402
+from contacts.database import Base  # noqa: E402
+from contacts.models import Contact  # noqa: E402
+
+
+def seed(db, rows: int):
+    db.add_all(
+        Contact(
+            first_name=f"First{i}", last_name=f"Last{i}", email=f"user{i}@example.com", phone=f"+380{i:09d}",
+            birthday=date(1980 + i % 30, i % 12 + 1, i % 28 + 1), additional_info="x" * (i % 200),
+        )
+        for i in range(rows)
+    )
+    db.commit()
+
+
+def orm_path(db, rows: int) -> bytes:
+    contacts = crud.get_contacts(db, limit=rows)
+    content = jsonable_encoder([schemas.ContactResponse.model_validate(contact) for contact in contacts])
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(db, rows: int) -> bytes:
+    return serialization.rows_to_json(crud.get_contacts_rows(db, limit=rows))
+
+
+def measure(fn, db, rows: int, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        db.expunge_all()
+        start = time.perf_counter()
+        fn(db, rows)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(timings), 3), "min_ms": round(min(timings), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Кількість контактів на сторінці")
+    parser.add_argument("--repeat", type=int, default=20, help="Кількість повторів")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.rows)
+
+    results = {
+        "rows": args.rows,
+        "encoder": "orjson" if serialization.orjson is not None else "pydantic_core",
+        "orm_pydantic": measure(orm_path, db, args.rows, args.repeat),
+        "fast_path": measure(fast_path, db, args.rows, args.repeat),
+    }
+    results["speedup"] = round(results["orm_pydantic"]["median_ms"] / results["fast_path"]["median_ms"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
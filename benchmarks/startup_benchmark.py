@@ -0,0 +1,78 @@
+"""
+Вимірювання часу запуску процесу застосунку.
+
+Кожен вимір виконується в окремому процесі Python: імпорт ``contacts.main``, створення
+застосунку, запуск lifespan і перший запит до ``/health/cache`` (без звернення до бази даних).
+Так оцінюється, як швидко новий процес uvicorn готовий обслуговувати запити.
+
+Запуск:
+    python -m benchmarks.startup_benchmark --repeat 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Код, що виконується в дочірньому процесі; результат — JSON з часом етапів у мілісекундах.
+PROBE = """
+import json, time
+start = time.perf_counter()
+from contacts.main import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    started = time.perf_counter()
+    client.get("/health/cache").raise_for_status()
+    served = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "lifespan_ms": (started - created) * 1000,
+    "first_request_ms": (served - started) * 1000,
+    "ready_ms": (served - start) * 1000,
+}))
+"""
+
+
+def probe(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(samples: list, key: str) -> dict:
+    values = [sample[key] for sample in samples]
+    return {"median_ms": round(statistics.median(values), 3), "min_ms": round(min(values), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="Кількість запусків процесу")
+    parser.add_argument(
+        "--database-url", default="sqlite://", help="URL бази даних (запуск до неї не підключається)"
+    )
+    args = parser.parse_args()
+
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URL=args.database_url)
+    env.pop("DB_CREATE_ALL", None)
+    env.pop("MAIL_WORKER_ENABLED", None)
+    samples = [probe(env) for _ in range(args.repeat)]
+
+    results = {
+        "repeat": args.repeat,
+        "import": summarize(samples, "import_ms"),
+        "create_app": summarize(samples, "create_app_ms"),
+        "lifespan": summarize(samples, "lifespan_ms"),
+        "first_request": summarize(samples, "first_request_ms"),
+        "ready": summarize(samples, "ready_ms"),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
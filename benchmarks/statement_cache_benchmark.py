@@ -0,0 +1,131 @@
+"""
+Порівняння вартості гарячих запитів (контакт за id, користувач за id та за email).
+
+Запит через застарілий ``Session.query(...)``, що будується під час кожного виклику,
+порівнюється з інструкціями ``select()``, побудованими один раз з ``bindparam``
+(``crud.CONTACT_BY_ID``, ``utils.USER_BY_ID``, ``auth.USER_BY_EMAIL``), а також з тими самими
+інструкціями на рушії з вимкненим кешем скомпільованого SQL (``query_cache_size=0``).
+База даних — SQLite у пам'яті, тож вимірюється переважно час процесора на стороні Python.
+
+Запуск:
+    python -m benchmarks.statement_cache_benchmark --calls 2000 --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import date
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from contacts import crud  # noqa: E402
+from contacts.database import Base  # noqa: E402
+from contacts.models import Contact, User  # noqa: E402
+from contacts.routers.auth import USER_BY_EMAIL  # noqa: E402
+from contacts.utils import USER_BY_ID  # noqa: E402
+
+USERS = 10
+CONTACTS_PER_USER = 100
+
+
+def make_session(query_cache_size: int = 1200):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool,
+        query_cache_size=query_cache_size,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all(User(email=f"user{u}@example.com", hashed_password="x") for u in range(USERS))
+    db.add_all(
+        Contact(
+            first_name=f"First{i}", last_name=f"Last{i}", email=f"contact{i}@example.com", phone=f"+380{i:09d}",
+            birthday=date(1990, i % 12 + 1, i % 28 + 1), owner_id=i % USERS + 1,
+        )
+        for i in range(USERS * CONTACTS_PER_USER)
+    )
+    db.commit()
+    return db
+
+
+def legacy_contact(db, i: int):
+    return db.query(Contact).filter(Contact.id == i, Contact.owner_id == (i - 1) % USERS + 1).first()
+
+
+def prebuilt_contact(db, i: int):
+    return crud.get_contact(db, i, owner_id=(i - 1) % USERS + 1)
+
+
+def legacy_user_by_id(db, i: int):
+    return db.query(User).filter(User.id == i % USERS + 1).first()
+
+
+def prebuilt_user_by_id(db, i: int):
+    return db.execute(USER_BY_ID, {"user_id": i % USERS + 1}).scalar_one_or_none()
+
+
+def legacy_user_by_email(db, i: int):
+    return db.query(User).filter(User.email == f"user{i % USERS}@example.com").first()
+
+
+def prebuilt_user_by_email(db, i: int):
+    return db.execute(USER_BY_EMAIL, {"email": f"user{i % USERS}@example.com"}).scalar_one_or_none()
+
+
+def measure(fn, db, calls: int, repeat: int) -> dict:
+    """
+    Вимірює середній час одного виклику.
+
+    Аргументи:
+        fn (Callable): Функція запиту.
+        db (Session): Сесія бази даних.
+        calls (int): Кількість викликів в одному повторі.
+        repeat (int): Кількість повторів.
+
+    Повертає:
+        dict: Медіана та мінімум часу одного виклику в мікросекундах.
+    """
+    total = USERS * CONTACTS_PER_USER
+    fn(db, 1)
+    timings = []
+    for _ in range(repeat):
+        db.expunge_all()
+        start = time.perf_counter()
+        for n in range(calls):
+            fn(db, n % total + 1)
+        timings.append((time.perf_counter() - start) * 1e6 / calls)
+        db.expunge_all()
+    return {"median_us": round(statistics.median(timings), 2), "min_us": round(min(timings), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000, help="Кількість викликів в одному повторі")
+    parser.add_argument("--repeat", type=int, default=5, help="Кількість повторів")
+    args = parser.parse_args()
+
+    cached = make_session()
+    uncached = make_session(query_cache_size=0)
+    cases = {
+        "contact_by_id": (legacy_contact, prebuilt_contact),
+        "user_by_id": (legacy_user_by_id, prebuilt_user_by_id),
+        "user_by_email": (legacy_user_by_email, prebuilt_user_by_email),
+    }
+    results = {"calls": args.calls}
+    for name, (legacy, prebuilt) in cases.items():
+        result = {
+            "legacy_query": measure(legacy, cached, args.calls, args.repeat),
+            "prebuilt_select": measure(prebuilt, cached, args.calls, args.repeat),
+            "prebuilt_select_no_cache": measure(prebuilt, uncached, args.calls, args.repeat),
+        }
+        result["speedup"] = round(result["legacy_query"]["median_us"] / result["prebuilt_select"]["median_us"], 2)
+        results[name] = result
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
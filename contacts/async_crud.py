@@ -0,0 +1,217 @@
+"""
+Асинхронні версії операцій із контактами.
+
+Кожна функція виконує відповідну функцію з ``contacts.crud`` через ``AsyncSession.run_sync``:
+код запиту спільний для обох шарів, а очікування відповіді бази даних (asyncpg, aiosqlite)
+не займає потік і не блокує цикл подій. Синхронний код усередині ``run_sync`` виконується
+в циклі подій, тому звернення до кешу контактів (можливо, Redis) відбуваються поза ним.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from contacts import crud
+from contacts.cache import contact_cache
+from contacts import schemas
+from contacts import serialization
+
+
+async def get_contact(db: AsyncSession, contact_id: int, owner_id: int = None, loader: str = None):
+    """
+    Отримує контакт за його ідентифікатором.
+
+    Аргументи:
+        db (AsyncSession): Асинхронна сесія бази даних.
+        contact_id (int): Ідентифікатор контакту.
+        owner_id (int, optional): Ідентифікатор власника контактів.
+        loader (str, optional): Стратегія завантаження власника контакту (див. ``crud.loader_options``).
+
+    Повертає:
+        Contact: Об'єкт контакту або None, якщо контакт не знайдено.
+    """
+    return await db.run_sync(crud.get_contact, contact_id, owner_id=owner_id, loader=loader)
+
+
+async def get_contacts(db: AsyncSession, skip: int = 0, limit: int = 10, owner_id: int = None, loader: str = None):
+    """
+    Отримує список контактів з пагінацією skip/limit.
+
+    Аргументи:
+        db (AsyncSession): Асинхронна сесія бази даних.
+        skip (int): Кількість пропущених записів.
+        limit (int): Максимальна кількість записів, що повертаються.
+        owner_id (int, optional): Ідентифікатор власника контактів.
+        loader (str, optional): Стратегія завантаження власника контакту (див. ``crud.loader_options``).
+
+    Повертає:
+        list: Список контактів.
+    """
+    return await db.run_sync(crud.get_contacts, skip, limit, owner_id=owner_id, loader=loader)
+
+
+async def get_contacts_rows(
+    db: AsyncSession, skip: int = 0, limit: int = 10, columns: list = None, owner_id: int = None
+):
+    """
+    Отримує сторінку контактів у вигляді рядків вибраних стовпців.
+
+    Аргументи:
+        db (AsyncSession): Асинхронна сесія бази даних.
+        skip (int): Кількість пропущених записів.
+        limit (int): Максимальна кількість записів.
+        columns (list, optional): Стовпці вибірки (за замовчуванням поля ContactResponse).
+        owner_id (int, optional): Ідентифікатор власника контактів.
+
+    Повертає:
+        list[Row]: Рядки зі значеннями стовпців.
+    """
+    return await db.run_sync(crud.get_contacts_rows, skip, limit, columns, owner_id=owner_id)
+
+
+async def get_contact_cached(db: AsyncSession, contact_id: int, owner_id: int = None):
+    """
+    Отримує серіалізований контакт через кеш (read-through).
+
+    Кеш читається поза ``run_sync``, а база даних — лише у разі промаху.
+
+    Аргументи:
+        db (AsyncSession): Асинхронна сесія бази даних.
+        contact_id (int): Ідентифікатор контакту.
+        owner_id (int, optional): Ідентифікатор власника контакту.
+
+    Повертає:
+        bytes | None: Запис ``conditional.pack`` або None, якщо контакт не знайдено.
+    """
+    key = await contact_cache.offload(contact_cache.contact_key, contact_id, owner_id)
+    return await contact_cache.get_or_load_async(
+        key, lambda: db.run_sync(crud.load_contact_entry, contact_id, owner_id)
+    )
+
+
+async def get_contacts_cached(
+    db: AsyncSession, skip: int = 0, limit: int = 10, fields: tuple = None, owner_id: int = None
+):
+    """
+    Отримує серіалізовану сторінку контактів через кеш (read-through).
+
+    Аргументи:
+        db (AsyncSession): Асинхронна сесія бази даних.
+        skip (int): Кількість пропущених записів.
+        limit (int): Максимальна кількість записів.
+        fields (tuple[str, ...], optional): Поля відповіді (за замовчуванням усі поля ContactResponse).
+        owner_id (int, optional): Ідентифікатор власника контактів.
+
+    Повертає:
+        bytes: Запис ``conditional.pack``.
+    """
+    fields = fields or serialization.CONTACT_FIELDS
+    key = await contact_cache.offload(contact_cache.list_key, skip, limit, ",".join(fields), owner_id=owner_id)
+    return await contact_cache.get_or_load_async(
+        key, lambda: db.run_sync(crud.load_contacts_entry, skip, limit, fields, owner_id)
+    )
+
+
+async def get_contacts_after(
+    db: AsyncSession, after: str = None, limit: int = 10, order: str = "id", fields: tuple = None,
+    owner_id: int = None, loader: str = None
+):
+    """
+    Отримує сторінку контактів за курсором.
+
+    Аргументи:
+        db (AsyncSession): Асинхронна сесія бази даних.
+        after (str, optional): Курсор останнього елемента попередньої сторінки.
+        limit (int): Максимальна кількість записів, що повертаються.
+        order (str): Порядок обходу: "id" або "name".
+        fields (tuple[str, ...], optional): Поля, що завантажуються (за замовчуванням усі).
+        owner_id (int, optional): Ідентифікатор власника контактів.
+        loader (str, optional): Стратегія завантаження власника контакту (див. ``crud.loader_options``).
+
+    Повертає:
+        tuple[list, str | None]: Список контактів і курсор наступної сторінки.
+    """
+    return await db.run_sync(crud.get_contacts_after, after, limit, order, fields, owner_id=owner_id, loader=loader)
+
+
+async def create_contact(db: AsyncSession, contact: schemas.ContactCreate, owner_id: int = None):
+    """
+    Створює новий контакт.
+
+    Аргументи:
+        db (AsyncSession): Асинхронна сесія бази даних.
+        contact (ContactCreate): Дані нового контакту.
+        owner_id (int, optional): Ідентифікатор власника контакту.
+
+    Повертає:
+        Contact: Об'єкт створеного контакту.
+    """
+    return await db.run_sync(crud.create_contact, contact, owner_id=owner_id)
+
+
+async def update_contact(
+    db: AsyncSession, contact_id: int, contact_data: schemas.ContactUpdate, owner_id: int = None
+):
+    """
+    Оновлює дані контакту.
+
+    Аргументи:
+        db (AsyncSession): Асинхронна сесія бази даних.
+        contact_id (int): Ідентифікатор контакту, що оновлюється.
+        contact_data (ContactUpdate): Нові дані для контакту.
+        owner_id (int, optional): Ідентифікатор власника контакту.
+
+    Повертає:
+        Contact: Оновлений об'єкт контакту або None, якщо контакт не знайдено.
+    """
+    return await db.run_sync(crud.update_contact, contact_id, contact_data, owner_id=owner_id)
+
+
+async def delete_contact(db: AsyncSession, contact_id: int, owner_id: int = None):
+    """
+    Видаляє контакт.
+
+    Аргументи:
+        db (AsyncSession): Асинхронна сесія бази даних.
+        contact_id (int): Ідентифікатор контакту, що видаляється.
+        owner_id (int, optional): Ідентифікатор власника контакту.
+
+    Повертає:
+        Contact: Видалений об'єкт контакту або None, якщо контакт не знайдено.
+    """
+    return await db.run_sync(crud.delete_contact, contact_id, owner_id=owner_id)
+
+
+async def search_contacts(
+    db: AsyncSession, query: str, limit: int = 20, cursor: str = None, fields: tuple = None, owner_id: int = None,
+    loader: str = None
+):
+    """
+    Шукає контакти за ім'ям, прізвищем або email.
+
+    Аргументи:
+        db (AsyncSession): Асинхронна сесія бази даних.
+        query (str): Пошуковий запит.
+        limit (int): Максимальна кількість записів, що повертаються.
+        cursor (str, optional): Курсор наступної сторінки.
+        fields (tuple[str, ...], optional): Поля, що завантажуються (за замовчуванням усі).
+        owner_id (int, optional): Ідентифікатор власника контактів.
+        loader (str, optional): Стратегія завантаження власника контакту (див. ``crud.loader_options``).
+
+    Повертає:
+        tuple[list, str | None]: Список контактів і курсор наступної сторінки.
+    """
+    return await db.run_sync(crud.search_contacts, query, limit, cursor, fields, owner_id=owner_id, loader=loader)
+
+
+async def get_upcoming_birthdays(db: AsyncSession, days: int = 7, owner_id: int = None, loader: str = None):
+    """
+    Отримує контакти з найближчими днями народження.
+
+    Аргументи:
+        db (AsyncSession): Асинхронна сесія бази даних.
+        days (int): Кількість днів наперед.
+        owner_id (int, optional): Ідентифікатор власника контактів.
+        loader (str, optional): Стратегія завантаження власника контакту (див. ``crud.loader_options``).
+
+    Повертає:
+        list: Список контактів.
+    """
+    return await db.run_sync(crud.get_upcoming_birthdays, days, owner_id=owner_id, loader=loader)
@@ -0,0 +1,372 @@
+"""
+Модуль з кешами застосунку.
+
+``TTLCache`` — потокобезпечний LRU-кеш з обмеженим розміром і часом життя записів.
+``ContactCache`` — кеш серіалізованих відповідей з контактами поверх змінного сховища:
+``LocalCacheBackend`` (пам'ять процесу) або ``RedisCacheBackend`` (сервер з протоколом Redis).
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+from contacts.config import get_settings
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU-кеш з часом життя записів.
+
+    Атрибути:
+        maxsize (int): Максимальна кількість записів; найдавніше використаний запис витісняється.
+        ttl (float): Час життя запису за замовчуванням у секундах.
+        hits (int): Кількість влучань.
+        misses (int): Кількість промахів.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._timer = timer
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """
+        Повертає значення з кешу.
+
+        Аргументи:
+            key: Ключ запису.
+            default: Значення, що повертається, якщо запису немає або його час життя минув.
+
+        Повертає:
+            Значення запису або default.
+        """
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                expires_at, value = item
+                if expires_at > self._timer():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float = None):
+        """
+        Зберігає значення в кеші.
+
+        Аргументи:
+            key: Ключ запису.
+            value: Значення.
+            ttl (float, optional): Час життя запису у секундах (за замовчуванням ``self.ttl``).
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._timer() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Видаляє запис з кешу.
+
+        Аргументи:
+            key: Ключ запису.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Очищає кеш.
+        """
+        with self._lock:
+            self._data.clear()
+
+
+class LocalCacheBackend:
+    """
+    Сховище кешу в пам'яті процесу (LRU з часом життя записів).
+
+    Атрибути:
+        maxsize (int): Максимальна кількість записів.
+        blocking (bool): Чи виконують операції мережевий ввід-вивід (для пам'яті процесу — ні).
+    """
+
+    blocking = False
+
+    def __init__(self, maxsize: int = 10000):
+        self._cache = TTLCache(maxsize=maxsize)
+        # Лічильники зберігаються окремо, щоб їх не витісняли записи кешу.
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        if key in self._counters:
+            return self._counters[key]
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._cache.set(key, value, ttl=ttl)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._cache.delete(key)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        self._cache.clear()
+        with self._lock:
+            self._counters.clear()
+
+
+class RedisCacheBackend:
+    """
+    Сховище кешу на сервері з протоколом Redis.
+
+    Атрибути:
+        client: Клієнт з методами get, set(ex/px), delete та incr — ``redis.Redis``
+            або сумісна заміна (наприклад, локальна заглушка в тестах).
+        prefix (str): Префікс ключів застосунку.
+        blocking (bool): Операції звертаються до сервера, тож в асинхронному коді виконуються в потоці.
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "contacts-api:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str):
+        """
+        Створює сховище за URL сервера.
+
+        Аргументи:
+            url (str): URL вигляду ``redis://host:port/db``.
+
+        Повертає:
+            RedisCacheBackend: Сховище з клієнтом ``redis.Redis``.
+
+        Порушення:
+            RuntimeError: Якщо пакет redis не встановлено.
+        """
+        try:
+            import redis
+        except ImportError as error:
+            raise RuntimeError("CONTACT_CACHE_URL requires the 'redis' package") from error
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        if ttl > 0:
+            self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def build_backend(url: str = None, maxsize: int = 10000):
+    """
+    Створює сховище кешу за URL.
+
+    Аргументи:
+        url (str, optional): ``memory://`` (за замовчуванням) або ``redis://...``/``rediss://...``.
+        maxsize (int): Максимальна кількість записів для сховища в пам'яті.
+
+    Повертає:
+        LocalCacheBackend | RedisCacheBackend: Сховище кешу.
+
+    Порушення:
+        ValueError: Якщо схема URL не підтримується.
+    """
+    if not url or url.startswith("memory://"):
+        return LocalCacheBackend(maxsize=maxsize)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend.from_url(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+class ContactCache:
+    """
+    Кеш серіалізованих (JSON) відповідей з контактами.
+
+    Ключі окремих контактів і сторінок списку містять номер покоління власника, який збільшується
+    за будь-якої зміни його контактів, тож застарілі записи більше не читаються і витісняються
+    за часом життя, а зміни одного користувача не скидають кеш інших. Покоління читається
+    до завантаження запису: якщо зміна відбулася під час завантаження, застарілий запис
+    зберігається під ключем попереднього покоління і вже не буде прочитаний.
+
+    Атрибути:
+        backend: Сховище кешу.
+        ttl (float): Час життя записів у секундах (0 вимикає кешування).
+        hits (int): Кількість влучань.
+        misses (int): Кількість промахів.
+    """
+
+    GENERATION_KEY = "contacts:generation"
+
+    def __init__(self, backend, ttl: float = 60.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _generation_key(self, owner_id: int = None) -> str:
+        if owner_id is None:
+            return self.GENERATION_KEY
+        return f"{self.GENERATION_KEY}:{owner_id}"
+
+    def _scoped_key(self, kind: str, parts, owner_id: int = None) -> str:
+        generation = self.backend.get(self._generation_key(owner_id)) or 0
+        scope = "all" if owner_id is None else owner_id
+        return f"contacts:{kind}:{scope}:{int(generation)}:" + ":".join(str(part) for part in parts)
+
+    def contact_key(self, contact_id: int, owner_id: int = None) -> str:
+        return self._scoped_key("item", (contact_id,), owner_id)
+
+    def list_key(self, *parts, owner_id: int = None) -> str:
+        return self._scoped_key("list", parts, owner_id)
+
+    def get_or_load(self, key: str, loader):
+        """
+        Повертає відповідь з кешу або завантажує її і зберігає в кеші.
+
+        Аргументи:
+            key (str): Ключ запису.
+            loader (Callable[[], bytes | None]): Функція, що формує відповідь; None не кешується.
+
+        Повертає:
+            bytes | None: Серіалізована відповідь.
+        """
+        if self.ttl <= 0:
+            return loader()
+        payload = self.backend.get(key)
+        if payload is not None:
+            self._count(True)
+            return payload
+        self._count(False)
+        payload = loader()
+        if payload is not None:
+            self.backend.set(key, payload, self.ttl)
+        return payload
+
+    async def offload(self, func, *args, **kwargs):
+        """
+        Виконує операцію зі сховищем з асинхронного коду.
+
+        Операції блокуючого сховища (Redis) виконуються в потоці через ``asyncio.to_thread``,
+        щоб не блокувати цикл подій; операції з пам'яттю процесу виконуються одразу.
+
+        Аргументи:
+            func (Callable): Операція, наприклад ``contact_key`` або ``backend.get``.
+            args, kwargs: Аргументи операції.
+
+        Повертає:
+            Результат операції.
+        """
+        if getattr(self.backend, "blocking", True):
+            return await asyncio.to_thread(func, *args, **kwargs)
+        return func(*args, **kwargs)
+
+    async def get_or_load_async(self, key: str, loader):
+        """
+        Асинхронна версія ``get_or_load``: сховище не блокує цикл подій.
+
+        Аргументи:
+            key (str): Ключ запису.
+            loader (Callable[[], Awaitable[bytes | None]]): Співпрограма, що формує відповідь;
+                None не кешується.
+
+        Повертає:
+            bytes | None: Серіалізована відповідь.
+        """
+        if self.ttl <= 0:
+            return await loader()
+        payload = await self.offload(self.backend.get, key)
+        if payload is not None:
+            self._count(True)
+            return payload
+        self._count(False)
+        payload = await loader()
+        if payload is not None:
+            await self.offload(self.backend.set, key, payload, self.ttl)
+        return payload
+
+    def invalidate_contacts(self, *contact_ids: int, owner_id: int = None):
+        """
+        Видаляє з кешу контакти та сторінки списку власника (і сторінки без фільтра за власником).
+
+        Аргументи:
+            contact_ids (int): Ідентифікатори змінених контактів.
+            owner_id (int, optional): Власник змінених контактів.
+        """
+        # Записи поточного покоління видаляються одразу, щоб не займати місце до кінця часу життя.
+        keys = [self.contact_key(contact_id) for contact_id in contact_ids]
+        if owner_id is not None:
+            keys.extend(self.contact_key(contact_id, owner_id) for contact_id in contact_ids)
+            self.backend.incr(self._generation_key(owner_id))
+        self.backend.incr(self.GENERATION_KEY)
+        self.backend.delete(*keys)
+
+    def clear(self):
+        """
+        Очищає кеш і лічильники.
+        """
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Повертає лічильники кешу.
+
+        Повертає:
+            dict: Тип сховища, кількість влучань і промахів.
+        """
+        return {"backend": type(self.backend).__name__, "hits": self.hits, "misses": self.misses}
+
+
+# Кеш відповідей з контактами: CONTACT_CACHE_URL (memory:// або redis://...),
+# CONTACT_CACHE_TTL (секунди, 0 — вимкнено), CONTACT_CACHE_SIZE (записів у пам'яті процесу).
+_settings = get_settings()
+contact_cache = ContactCache(
+    build_backend(_settings.contact_cache_url, maxsize=_settings.contact_cache_size),
+    ttl=_settings.contact_cache_ttl,
+)
@@ -0,0 +1,139 @@
+"""
+Модуль для умовних GET-запитів (ETag / Last-Modified).
+
+Відповідь кешується разом зі своїми валідаторами у вигляді конверта (ETag, Last-Modified, тіло),
+тож на запит з ``If-None-Match`` можна відповісти 304 без звернення до бази даних і без
+серіалізації контактів.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def contact_etag(contact_id: int, version: int) -> str:
+    """
+    Формує слабкий ETag контакту.
+
+    Аргументи:
+        contact_id (int): Ідентифікатор контакту.
+        version (int): Версія рядка контакту.
+
+    Повертає:
+        str: ETag вигляду ``W/"<id>-<version>"``.
+    """
+    return f'W/"{contact_id}-{version or 0}"'
+
+
+def list_etag(rows) -> str:
+    """
+    Формує слабкий ETag сторінки контактів за сукупною версією її рядків.
+
+    Аргументи:
+        rows (Iterable): Контакти або рядки з атрибутами id та version.
+
+    Повертає:
+        str: ETag вигляду ``W/"<хеш пар (id, version)>"``.
+    """
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(f"{row.id}:{row.version or 0},".encode())
+    return f'W/"{digest.hexdigest()[:20]}"'
+
+
+def http_date(value: datetime = None):
+    """
+    Форматує час у форматі заголовка Last-Modified.
+
+    Аргументи:
+        value (datetime, optional): Час (без часового поясу вважається UTC).
+
+    Повертає:
+        str | None: Дата у форматі HTTP або None, якщо час не вказано.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def pack(etag: str, last_modified: str, body: bytes) -> bytes:
+    """
+    Пакує валідатори та тіло відповіді в один запис кешу.
+
+    Аргументи:
+        etag (str): ETag відповіді.
+        last_modified (str): Значення Last-Modified або None.
+        body (bytes): Тіло відповіді (JSON).
+
+    Повертає:
+        bytes: Запис кешу.
+    """
+    return f"{etag}\n{last_modified or ''}\n".encode() + body
+
+
+def unpack(value: bytes):
+    """
+    Розпаковує запис кешу, створений ``pack``.
+
+    Аргументи:
+        value (bytes): Запис кешу.
+
+    Повертає:
+        tuple[str, str | None, bytes]: ETag, Last-Modified та тіло відповіді.
+    """
+    etag, last_modified, body = value.split(b"\n", 2)
+    return etag.decode(), last_modified.decode() or None, body
+
+
+def is_not_modified(request: Request, etag: str, last_modified: str = None) -> bool:
+    """
+    Перевіряє умовні заголовки запиту.
+
+    ``If-None-Match`` має пріоритет; ``If-Modified-Since`` враховується лише за його відсутності.
+
+    Аргументи:
+        request (Request): Запит від клієнта.
+        etag (str): Поточний ETag ресурсу.
+        last_modified (str, optional): Поточне значення Last-Modified ресурсу.
+
+    Повертає:
+        bool: True, якщо клієнт має актуальну версію ресурсу.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Слабке порівняння: префікс W/ не враховується.
+        current = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def conditional_response(request: Request, entry: bytes) -> Response:
+    """
+    Формує відповідь із запису кешу з урахуванням умовних заголовків запиту.
+
+    Аргументи:
+        request (Request): Запит від клієнта.
+        entry (bytes): Запис кешу, створений ``pack``.
+
+    Повертає:
+        Response: 304 без тіла, якщо клієнт має актуальну версію, інакше 200 з JSON.
+    """
+    etag, last_modified, body = unpack(entry)
+    headers = {"ETag": etag}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -4,26 +4,122 @@
 Цей модуль містить функції для створення, оновлення, видалення та отримання контактів із бази даних.
 """
 
-from sqlalchemy.orm import Session
+import calendar
+from datetime import date, timedelta
+
+from sqlalchemy import bindparam, case, delete, func, literal_column, or_, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload, lazyload, load_only, raiseload, selectinload
 from contacts import models
 from contacts import schemas
+from contacts import conditional
+from contacts import search
+from contacts import serialization
+from contacts.cache import contact_cache
+from contacts.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+# Максимальна кількість id в одному UPDATE/DELETE ... WHERE id IN (...)
+BULK_CHUNK_SIZE = 1000
+
+# Ключі сортування для курсорної пагінації: назва порядку -> стовпці ключа (останній завжди id).
+KEYSET_ORDERS = {
+    "id": (models.Contact.id,),
+    "name": (models.Contact.last_name, models.Contact.first_name, models.Contact.id),
+}
+
+
+def keyset_key(column):
+    """
+    Повертає вираз ключа сортування для стовпця курсорної пагінації.
+
+    Ім'я та прізвище можуть бути NULL, а порівняння кортежу з NULL дає NULL, тож такі записи
+    пропускалися б. Тому NULL упорядковується як порожній рядок (індекс
+    ``ix_contacts_owner_name_keyset`` побудований за тими самими виразами).
+
+    Аргументи:
+        column: Стовпець ключа сортування.
+
+    Повертає:
+        Вираз для ORDER BY та порівняння з курсором.
+    """
+    return column if column is models.Contact.id else func.coalesce(column, literal_column("''"))
+
+
+# Інструкції гарячих запитів будуються один раз: ключ кешу скомпільованого SQL обчислюється
+# з готової структури, а на PostgreSQL текст інструкції повторно використовується як підготовлений.
+CONTACT_BY_ID = select(models.Contact).where(models.Contact.id == bindparam("contact_id"))
+OWNED_CONTACT_BY_ID = CONTACT_BY_ID.where(models.Contact.owner_id == bindparam("owner_id"))
+
+# Стратегії завантаження зв'язків (Contact.owner, User.contacts) для окремого запиту.
+LOADER_STRATEGIES = {
+    "lazy": lazyload,
+    "selectin": selectinload,
+    "joined": joinedload,
+    # Звернення до незавантаженого зв'язку, що потребує SQL, спричиняє помилку замість запиту на кожен рядок.
+    "raise": lambda attribute: raiseload(attribute, sql_only=True),
+}
+
+
+def loader_options(loader: str = None, attribute=models.Contact.owner) -> list:
+    """
+    Формує параметр завантаження зв'язку для запиту.
+
+    Аргументи:
+        loader (str, optional): Стратегія з LOADER_STRATEGIES: "lazy", "selectin", "joined" або "raise";
+            None — стратегія моделі (окремий SELECT під час першого звернення).
+        attribute: Зв'язок, наприклад ``models.Contact.owner`` або ``models.User.contacts``.
+
+    Повертає:
+        list: Параметри для ``Query.options`` (порожній список, якщо стратегію не вказано).
+
+    Порушення:
+        ValueError: Якщо стратегія невідома.
+    """
+    if loader is None:
+        return []
+    if loader not in LOADER_STRATEGIES:
+        raise ValueError(f"Unknown loader strategy: {loader}")
+    return [LOADER_STRATEGIES[loader](attribute)]
+
+
+def owner_filter(owner_id: int = None) -> list:
+    """
+    Формує умову вибірки контактів одного власника.
+
+    Аргументи:
+        owner_id (int, optional): Ідентифікатор власника; None — без обмеження.
+
+    Повертає:
+        list: Умови WHERE (порожній список, якщо власника не вказано).
+    """
+    return [] if owner_id is None else [models.Contact.owner_id == owner_id]
 
 
-def get_contact(db: Session, contact_id: int):
+def get_contact(db: Session, contact_id: int, owner_id: int = None, loader: str = None):
     """
     Отримує контакт із бази даних за його ідентифікатором.
 
     Аргументи:
         db (Session): Сесія бази даних.
         contact_id (int): Ідентифікатор контакту.
+        owner_id (int, optional): Ідентифікатор власника; контакти інших користувачів не повертаються.
+        loader (str, optional): Стратегія завантаження власника контакту (див. ``loader_options``).
 
     Повертає:
         Contact: Об'єкт контакту або None, якщо контакт не знайдено.
     """
-    return db.query(models.Contact).filter(models.Contact.id == contact_id).first()
+    if owner_id is None:
+        stmt, params = CONTACT_BY_ID, {"contact_id": contact_id}
+    else:
+        stmt, params = OWNED_CONTACT_BY_ID, {"contact_id": contact_id, "owner_id": owner_id}
+    if loader is not None:
+        stmt = stmt.options(*loader_options(loader))
+    return db.execute(stmt, params).scalar_one_or_none()
 
 
-def get_contacts(db: Session, skip: int = 0, limit: int = 10):
+def get_contacts(
+    db: Session, skip: int = 0, limit: int = 10, fields: tuple = None, owner_id: int = None, loader: str = None
+):
     """
     Отримує список контактів із бази даних.
 
@@ -31,32 +127,304 @@ def get_contacts(db: Session, skip: int = 0, limit: int = 10):
         db (Session): Сесія бази даних.
         skip (int): Кількість пропущених записів (за замовчуванням 0).
         limit (int): Максимальна кількість записів, що повертаються (за замовчуванням 10).
+        fields (tuple[str, ...], optional): Поля, що завантажуються (за замовчуванням усі).
+        owner_id (int, optional): Ідентифікатор власника контактів.
+        loader (str, optional): Стратегія завантаження власників контактів (див. ``loader_options``).
 
     Повертає:
         list: Список контактів.
     """
-    return db.query(models.Contact).offset(skip).limit(limit).all()
+    query = db.query(models.Contact)
+    if owner_id is not None:
+        query = query.filter(*owner_filter(owner_id))
+    if fields:
+        query = query.options(load_only(*serialization.contact_columns(fields)))
+    if loader is not None:
+        query = query.options(*loader_options(loader))
+    return query.offset(skip).limit(limit).all()
+
+
+def get_contacts_rows(db: Session, skip: int = 0, limit: int = 10, columns: list = None, owner_id: int = None):
+    """
+    Отримує сторінку контактів у вигляді рядків вибраних стовпців, без створення ORM-об'єктів.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        skip (int): Кількість пропущених записів (за замовчуванням 0).
+        limit (int): Максимальна кількість записів, що повертаються (за замовчуванням 10).
+        columns (list, optional): Стовпці вибірки (за замовчуванням поля ContactResponse).
+        owner_id (int, optional): Ідентифікатор власника контактів.
+
+    Повертає:
+        list[Row]: Рядки зі значеннями стовпців.
+    """
+    columns = columns or serialization.contact_columns()
+    # Без ORDER BY СУБД може повернути ту саму сторінку з іншими рядками, а від її вмісту
+    # залежать ETag і запис у кеші.
+    stmt = (
+        select(*columns).where(*owner_filter(owner_id)).order_by(models.Contact.id).offset(skip).limit(limit)
+    )
+    return db.execute(stmt).all()
+
+
+def get_contact_cached(db: Session, contact_id: int, owner_id: int = None):
+    """
+    Отримує серіалізований контакт через кеш (read-through).
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        contact_id (int): Ідентифікатор контакту.
+        owner_id (int, optional): Ідентифікатор власника контакту.
+
+    Повертає:
+        bytes | None: Запис ``conditional.pack`` (ETag, Last-Modified та JSON схеми ContactResponse)
+        або None, якщо контакт не знайдено.
+    """
+    return contact_cache.get_or_load(
+        contact_cache.contact_key(contact_id, owner_id), lambda: load_contact_entry(db, contact_id, owner_id)
+    )
+
+
+def load_contact_entry(db: Session, contact_id: int, owner_id: int = None):
+    """
+    Завантажує контакт з бази даних і серіалізує його для кешу.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        contact_id (int): Ідентифікатор контакту.
+        owner_id (int, optional): Ідентифікатор власника контакту.
+
+    Повертає:
+        bytes | None: Запис ``conditional.pack`` або None, якщо контакт не знайдено.
+    """
+    contact = get_contact(db, contact_id, owner_id=owner_id)
+    if contact is None:
+        return None
+    return conditional.pack(
+        conditional.contact_etag(contact.id, contact.version),
+        conditional.http_date(contact.updated_at),
+        schemas.ContactResponse.model_validate(contact).model_dump_json().encode(),
+    )
+
+
+def get_contacts_cached(
+    db: Session, skip: int = 0, limit: int = 10, fields: tuple = serialization.CONTACT_FIELDS, owner_id: int = None
+):
+    """
+    Отримує серіалізовану сторінку контактів через кеш (read-through).
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        skip (int): Кількість пропущених записів (за замовчуванням 0).
+        limit (int): Максимальна кількість записів, що повертаються (за замовчуванням 10).
+        fields (tuple[str, ...]): Поля відповіді (за замовчуванням усі поля ContactResponse).
+        owner_id (int, optional): Ідентифікатор власника контактів.
+
+    Повертає:
+        bytes: Запис ``conditional.pack`` (ETag сторінки за парами (id, version) та JSON списку
+        схем ContactResponse). Last-Modified для сторінки не формується: після видалення запису
+        сторінка зсувається, і найпізніший час зміни її рядків може стати меншим, тож на
+        ``If-Modified-Since`` клієнт отримав би 304 для зміненого вмісту.
+    """
+    key = contact_cache.list_key(skip, limit, ",".join(fields), owner_id=owner_id)
+    return contact_cache.get_or_load(key, lambda: load_contacts_entry(db, skip, limit, fields, owner_id))
+
+
+def load_contacts_entry(
+    db: Session, skip: int = 0, limit: int = 10, fields: tuple = serialization.CONTACT_FIELDS, owner_id: int = None
+):
+    """
+    Завантажує сторінку контактів з бази даних і серіалізує її для кешу.
 
+    Аргументи:
+        db (Session): Сесія бази даних.
+        skip (int): Кількість пропущених записів.
+        limit (int): Максимальна кількість записів.
+        fields (tuple[str, ...]): Поля відповіді.
+        owner_id (int, optional): Ідентифікатор власника контактів.
 
-def create_contact(db: Session, contact: schemas.ContactCreate):
+    Повертає:
+        bytes: Запис ``conditional.pack`` без Last-Modified.
+    """
+    columns = serialization.contact_columns(fields) + [models.Contact.version]
+    rows = get_contacts_rows(db, skip=skip, limit=limit, columns=columns, owner_id=owner_id)
+    return conditional.pack(conditional.list_etag(rows), None, serialization.rows_to_json(rows, fields))
+
+
+def get_contacts_after(
+    db: Session, after: str = None, limit: int = 10, order: str = "id", fields: tuple = None, owner_id: int = None,
+    loader: str = None
+):
+    """
+    Отримує сторінку контактів за курсором (keyset-пагінація).
+
+    На відміну від skip/limit, вартість сторінки не залежить від її глибини, а вставка нових
+    записів під час обходу не спричиняє дублікатів чи пропусків.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        after (str, optional): Курсор останнього елемента попередньої сторінки; порожній — перша сторінка.
+        limit (int): Максимальна кількість записів, що повертаються (за замовчуванням 10).
+        order (str): Порядок обходу: "id" або "name" (прізвище, ім'я, id).
+        fields (tuple[str, ...], optional): Поля, що завантажуються (за замовчуванням усі);
+            стовпці ключа сортування завантажуються завжди.
+        owner_id (int, optional): Ідентифікатор власника контактів.
+        loader (str, optional): Стратегія завантаження власників контактів (див. ``loader_options``).
+
+    Повертає:
+        tuple[list, str | None]: Список контактів і курсор наступної сторінки (None, якщо сторінка остання).
+
+    Порушення:
+        InvalidCursorError: Якщо курсор пошкоджений або не відповідає порядку.
+    """
+    columns = KEYSET_ORDERS[order]
+    keys = [keyset_key(column) for column in columns]
+    query = db.query(models.Contact).filter(*owner_filter(owner_id)).options(*loader_options(loader))
+    if fields:
+        query = query.options(load_only(*serialization.contact_columns(fields), *columns))
+    if after:
+        values = decode_cursor(after, len(columns))
+        if not isinstance(values[-1], int) or not all(isinstance(value, (str, type(None))) for value in values[:-1]):
+            raise InvalidCursorError("Invalid cursor")
+        values = [value if value is not None else "" for value in values[:-1]] + values[-1:]
+        query = query.filter(tuple_(*keys) > tuple_(*values))
+    contacts = query.order_by(*keys).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        last = contacts[-1]
+        next_cursor = encode_cursor(*(
+            getattr(last, column.key) if column is models.Contact.id else getattr(last, column.key) or ""
+            for column in columns
+        ))
+    return contacts, next_cursor
+
+
+def birthday_window(today: date, days: int):
+    """
+    Обчислює діапазон ключів днів народження (місяць * 100 + день) для найближчих днів.
+
+    Аргументи:
+        today (date): Початкова дата діапазону.
+        days (int): Кількість днів після початкової дати, що входять у діапазон.
+
+    Повертає:
+        tuple[int, int] | None: Початковий і кінцевий ключ (початковий більший за кінцевий, якщо діапазон
+        переходить через Новий рік) або None, якщо діапазон охоплює весь рік.
+    """
+    if days >= 365:
+        return None
+    end = today + timedelta(days=days)
+    start_key = models.birthday_key(today)
+    end_key = models.birthday_key(end)
+    # У невисокосний рік народжені 29 лютого святкують 28 лютого.
+    if end_key == 228 and not calendar.isleap(end.year):
+        end_key = 229
+    return start_key, end_key
+
+
+def get_upcoming_birthdays(
+    db: Session, days: int = 7, today: date = None, owner_id: int = None, loader: str = None
+):
+    """
+    Отримує контакти, дні народження яких припадають на найближчі дні.
+
+    Запит використовує індекс (owner_id, birthday_doy) і коректно обробляє перехід
+    через Новий рік та 29 лютого.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        days (int): Кількість днів наперед, включно з сьогоднішнім (за замовчуванням 7).
+        today (date, optional): Дата відліку (за замовчуванням поточна дата).
+        owner_id (int, optional): Ідентифікатор власника контактів.
+        loader (str, optional): Стратегія завантаження власників контактів (див. ``loader_options``).
+
+    Повертає:
+        list: Список контактів, упорядкованих за найближчим днем народження.
+    """
+    today = today or date.today()
+    doy = models.Contact.birthday_doy
+    query = db.query(models.Contact).filter(*owner_filter(owner_id)).options(*loader_options(loader))
+    window = birthday_window(today, days)
+    if window is None:
+        return query.filter(doy.isnot(None)).order_by(doy, models.Contact.id).all()
+
+    start_key, end_key = window
+    if start_key <= end_key:
+        query = query.filter(doy.between(start_key, end_key))
+    else:
+        query = query.filter(or_(doy >= start_key, doy <= end_key))
+    next_year_first = case((doy >= start_key, 0), else_=1)
+    return query.order_by(next_year_first, doy, models.Contact.id).all()
+
+
+def create_contact(db: Session, contact: schemas.ContactCreate, owner_id: int = None):
     """
     Створює новий контакт у базі даних.
 
     Аргументи:
         db (Session): Сесія бази даних.
         contact (ContactCreate): Дані нового контакту.
+        owner_id (int, optional): Ідентифікатор власника контакту.
 
     Повертає:
         Contact: Об'єкт створеного контакту.
+
+    Порушення:
+        IntegrityError: Якщо у власника вже є контакт з таким email або телефоном.
     """
-    db_contact = models.Contact(**contact.model_dump())
+    db_contact = models.Contact(**contact.model_dump(), owner_id=owner_id)
     db.add(db_contact)
     db.commit()
     db.refresh(db_contact)
+    contact_cache.invalidate_contacts(owner_id=owner_id)
     return db_contact
 
 
-def update_contact(db: Session, contact_id: int, contact_data: schemas.ContactUpdate):
+def bulk_create_contacts(db: Session, contacts: list, owner_id: int = None):
+    """
+    Створює пакет контактів одним багаторядковим INSERT ... ON CONFLICT DO NOTHING.
+
+    Рядки, що конфліктують з наявними контактами власника за email або телефоном,
+    пропускаються без помилки.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        contacts (list[ContactCreate]): Дані нових контактів.
+        owner_id (int, optional): Ідентифікатор власника контактів.
+
+    Повертає:
+        list: Рядки (id, first_name, last_name, email) створених контактів.
+    """
+    if not contacts:
+        return []
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    table = models.Contact.__table__
+    values = []
+    for contact in contacts:
+        row = contact.model_dump()
+        row["birthday_doy"] = models.birthday_key(row["birthday"])
+        row["owner_id"] = owner_id
+        values.append(row)
+    stmt = (
+        insert(table)
+        .values(values)
+        .on_conflict_do_nothing()
+        .returning(table.c.id, table.c.first_name, table.c.last_name, table.c.email)
+    )
+    inserted = db.execute(stmt).all()
+    db.commit()
+    if inserted:
+        contact_cache.invalidate_contacts(owner_id=owner_id)
+    # Core INSERT не викликає подій ORM, тому індекс пошуку оновлюється явно.
+    for row in inserted:
+        search.index_contact(db.get_bind(), row.id, (row.first_name, row.last_name, row.email), owner_id)
+    return inserted
+
+
+def update_contact(db: Session, contact_id: int, contact_data: schemas.ContactUpdate, owner_id: int = None):
     """
     Оновлює дані контакту в базі даних.
 
@@ -64,32 +432,132 @@ def update_contact(db: Session, contact_id: int, contact_data: schemas.ContactUp
         db (Session): Сесія бази даних.
         contact_id (int): Ідентифікатор контакту, що оновлюється.
         contact_data (ContactUpdate): Нові дані для контакту.
+        owner_id (int, optional): Ідентифікатор власника контакту.
 
     Повертає:
         Contact: Оновлений об'єкт контакту або None, якщо контакт не знайдено.
     """
-    db_contact = get_contact(db, contact_id)
+    db_contact = get_contact(db, contact_id, owner_id=owner_id)
     if db_contact:
         for key, value in contact_data.model_dump(exclude_unset=True).items():
             setattr(db_contact, key, value)
+        # Збільшення в SQL, щоб паралельні оновлення не отримали однакову версію.
+        db_contact.version = models.Contact.version + 1
         db.commit()
         db.refresh(db_contact)
+        contact_cache.invalidate_contacts(contact_id, owner_id=db_contact.owner_id)
     return db_contact
 
 
-def delete_contact(db: Session, contact_id: int):
+def delete_contact(db: Session, contact_id: int, owner_id: int = None):
     """
     Видаляє контакт із бази даних.
 
     Аргументи:
         db (Session): Сесія бази даних.
         contact_id (int): Ідентифікатор контакту, що видаляється.
+        owner_id (int, optional): Ідентифікатор власника контакту.
 
     Повертає:
         Contact: Видалений об'єкт контакту або None, якщо контакт не знайдено.
     """
-    db_contact = get_contact(db, contact_id)
+    db_contact = get_contact(db, contact_id, owner_id=owner_id)
     if db_contact:
         db.delete(db_contact)
         db.commit()
+        contact_cache.invalidate_contacts(contact_id, owner_id=db_contact.owner_id)
     return db_contact
+
+
+def search_contacts(
+    db: Session, query: str, limit: int = 20, cursor: str = None, fields: tuple = None, owner_id: int = None,
+    loader: str = None
+):
+    """
+    Шукає контакти за ім'ям, прізвищем або email з ранжуванням результатів.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        query (str): Пошуковий запит.
+        limit (int): Максимальна кількість записів, що повертаються (за замовчуванням 20).
+        cursor (str, optional): Курсор наступної сторінки.
+        fields (tuple[str, ...], optional): Поля, що завантажуються (за замовчуванням усі).
+        owner_id (int, optional): Ідентифікатор власника контактів.
+        loader (str, optional): Стратегія завантаження власників контактів (див. ``loader_options``).
+
+    Повертає:
+        tuple[list, str | None]: Список контактів і курсор наступної сторінки (None, якщо сторінка остання).
+    """
+    return search.search_contacts(
+        db, query, limit=limit, cursor=cursor, fields=fields, owner_id=owner_id, options=loader_options(loader)
+    )
+
+
+def _chunks(ids: list):
+    unique_ids = list(dict.fromkeys(ids))
+    for start in range(0, len(unique_ids), BULK_CHUNK_SIZE):
+        yield unique_ids[start:start + BULK_CHUNK_SIZE]
+
+
+def bulk_update_contacts(db: Session, ids: list, contact_data: schemas.ContactUpdate, owner_id: int = None):
+    """
+    Оновлює групу контактів запитами UPDATE ... WHERE id IN (...) RETURNING.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        ids (list[int]): Ідентифікатори контактів, що оновлюються.
+        contact_data (ContactUpdate): Поля, що встановлюються всім вибраним контактам.
+        owner_id (int, optional): Ідентифікатор власника; контакти інших користувачів пропускаються.
+
+    Повертає:
+        list: Рядки RETURNING оновлених контактів (відсутні id пропускаються).
+    """
+    values = contact_data.model_dump(exclude_unset=True)
+    if not values:
+        return (
+            db.query(models.Contact).filter(models.Contact.id.in_(list(ids)), *owner_filter(owner_id))
+            .order_by(models.Contact.id).all()
+        )
+    if "birthday" in values:
+        values["birthday_doy"] = models.birthday_key(values["birthday"])
+    values["version"] = models.Contact.version + 1
+
+    updated = []
+    for chunk in _chunks(ids):
+        stmt = (
+            update(models.Contact).where(models.Contact.id.in_(chunk), *owner_filter(owner_id)).values(**values)
+            .returning(*models.Contact.__table__.columns)
+        )
+        updated.extend(db.execute(stmt, execution_options={"synchronize_session": False}).all())
+    db.commit()
+    contact_cache.invalidate_contacts(*(row.id for row in updated), owner_id=owner_id)
+    for contact in updated:
+        fields = (contact.first_name, contact.last_name, contact.email)
+        search.index_contact(db.get_bind(), contact.id, fields, contact.owner_id)
+    return updated
+
+
+def bulk_delete_contacts(db: Session, ids: list, owner_id: int = None):
+    """
+    Видаляє групу контактів запитами DELETE ... WHERE id IN (...) RETURNING.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        ids (list[int]): Ідентифікатори контактів, що видаляються.
+        owner_id (int, optional): Ідентифікатор власника; контакти інших користувачів пропускаються.
+
+    Повертає:
+        list: Рядки RETURNING видалених контактів (відсутні id пропускаються).
+    """
+    deleted = []
+    for chunk in _chunks(ids):
+        stmt = (
+            delete(models.Contact).where(models.Contact.id.in_(chunk), *owner_filter(owner_id))
+            .returning(*models.Contact.__table__.columns)
+        )
+        deleted.extend(db.execute(stmt, execution_options={"synchronize_session": False}).all())
+    db.commit()
+    contact_cache.invalidate_contacts(*(row.id for row in deleted), owner_id=owner_id)
+    for contact in deleted:
+        search.unindex_contact(db.get_bind(), contact.id)
+    return deleted
@@ -1,21 +1,186 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
-import os
+import threading
 
-load_dotenv()
+from contacts.config import get_settings
+from contacts.metrics import instrument_queries
+from contacts.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
 
+# Асинхронні драйвери для синхронних URL бази даних
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    """
+    Перетворює синхронний URL бази даних на URL з асинхронним драйвером.
+
+    Аргументи:
+        url (str): URL бази даних, наприклад ``postgresql://...`` або ``sqlite:///./app.db``.
+
+    Повертає:
+        str: URL з драйвером asyncpg або aiosqlite.
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None or parsed.get_driver_name() in ("asyncpg", "aiosqlite"):
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def engine_options(url: str, asynchronous: bool = False) -> dict:
+    """
+    Формує параметри рушія (пул з'єднань, кеш скомпільованих інструкцій, підготовлені інструкції)
+    з налаштувань застосунку.
+
+    Налаштування (змінні середовища):
+        DB_POOL_SIZE: Кількість постійних з'єднань у пулі (за замовчуванням 5).
+        DB_MAX_OVERFLOW: Кількість додаткових з'єднань понад розмір пулу (за замовчуванням 10).
+        DB_POOL_TIMEOUT: Час очікування вільного з'єднання у секундах (за замовчуванням 30).
+        DB_POOL_RECYCLE: Вік з'єднання у секундах, після якого воно перевідкривається (-1 — вимкнено).
+        DB_POOL_PRE_PING: Перевіряти з'єднання перед видачею ("1"/"true").
+        DB_QUERY_CACHE_SIZE: Розмір кешу скомпільованих SQL-інструкцій рушія (за замовчуванням 1200).
+        DB_PREPARED_STATEMENT_CACHE_SIZE: Кількість підготовлених на сервері PostgreSQL інструкцій
+            на з'єднання для asyncpg і psycopg 3 (за замовчуванням 256, 0 — вимкнено, наприклад
+            за PgBouncer у режимі транзакцій). psycopg2 підготовлених інструкцій не підтримує.
+
+    Аргументи:
+        url (str): URL бази даних.
+        asynchronous (bool): Чи формуються параметри для AsyncEngine.
+
+    Повертає:
+        dict: Іменовані аргументи для create_engine/create_async_engine.
+    """
+    settings = get_settings()
+    options = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+        "query_cache_size": settings.db_query_cache_size,
+    }
+    driver = make_url(url).get_driver_name()
+    cache_size = settings.db_prepared_statement_cache_size
+    if driver == "asyncpg":
+        options["connect_args"] = {"prepared_statement_cache_size": cache_size}
+    elif driver == "psycopg":
+        # psycopg 3 готує інструкцію на сервері після prepare_threshold виконань (None — ніколи).
+        options["connect_args"] = {"prepare_threshold": 1 if cache_size else None}
+    # SQLite використовує власні пули (SingletonThreadPool/StaticPool для бази в пам'яті).
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+        )
+    return options
+
+
+def slow_query_seconds():
+    """
+    Повертає поріг повільного запиту з налаштувань (SLOW_QUERY_MS).
+
+    Повертає:
+        float | None: Поріг у секундах або None, якщо журнал повільних запитів вимкнено.
+    """
+    threshold = get_settings().slow_query_ms
+    return threshold / 1000 if threshold > 0 else None
+
+
+# Рушії бази даних створюються під час першого звернення, а не під час імпорту модуля.
+# Фабрики сесій існують завжди й прив'язуються до рушія в get_engine/get_async_engine.
+engine = None
+pool_metrics = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+async_engine = None
+async_pool_metrics = None
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    Повертає синхронний рушій бази даних, створюючи його під час першого виклику.
+
+    Повертає:
+        Engine: Рушій бази даних.
+
+    Порушення:
+        RuntimeError: Якщо URL бази даних не налаштовано.
+    """
+    global engine, pool_metrics
+    if engine is not None:
+        return engine
+    with _engine_lock:
+        if engine is None:
+            url = get_settings().database_url
+            if not url:
+                raise RuntimeError("SQLALCHEMY_DATABASE_URL is not set")
+            engine = create_engine(url, **engine_options(url))
+            pool_metrics = instrument_engine(engine)
+            instrument_queries(engine, slow_query_seconds())
+            SessionLocal.configure(bind=engine)
+        return engine
+
+
+def get_async_engine():
+    """
+    Повертає асинхронний рушій бази даних, створюючи його під час першого виклику.
+
+    Повертає:
+        AsyncEngine: Рушій бази даних з драйвером asyncpg або aiosqlite.
+
+    Порушення:
+        RuntimeError: Якщо URL бази даних не налаштовано.
+    """
+    global async_engine, async_pool_metrics
+    if async_engine is not None:
+        return async_engine
+    with _engine_lock:
+        if async_engine is None:
+            settings = get_settings()
+            if not (settings.async_database_url or settings.database_url):
+                raise RuntimeError("SQLALCHEMY_DATABASE_URL is not set")
+            url = settings.async_database_url or to_async_url(settings.database_url)
+            async_engine = create_async_engine(url, **engine_options(url, asynchronous=True))
+            async_pool_metrics = instrument_engine(async_engine.sync_engine)
+            instrument_queries(async_engine.sync_engine, slow_query_seconds())
+            AsyncSessionLocal.configure(bind=async_engine)
+        return async_engine
+
+
+async def dispose_engines():
+    """
+    Закриває з'єднання пулів створених рушіїв бази даних.
+    """
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
 
-engine = create_engine(os.getenv("SQLALCHEMY_DATABASE_URL"))
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
 def get_db():
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_session_factory():
+    get_engine()
+    return SessionLocal
+
+
+async def get_async_db():
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
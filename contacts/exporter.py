@@ -0,0 +1,96 @@
+"""
+Модуль для потокового експорту контактів у форматах NDJSON та CSV.
+
+Рядки читаються серверним курсором (``yield_per``) пакетами фіксованого розміру і одразу
+перетворюються на фрагменти відповіді, тож пам'ять не залежить від кількості контактів.
+"""
+import csv
+import io
+import json
+import zlib
+
+from sqlalchemy import select
+
+from contacts import models
+
+EXPORT_COLUMNS = ("id", "first_name", "last_name", "email", "phone", "birthday", "additional_info")
+BATCH_SIZE = 1000
+
+
+def iter_batches(session_factory, batch_size: int = None, owner_id: int = None):
+    """
+    Читає контакти пакетами через серверний курсор.
+
+    Сесія створюється всередині генератора, бо відповідь передається клієнту вже після
+    виходу з ендпоінта (і закриття сесії, отриманої через залежність).
+
+    Аргументи:
+        session_factory (sessionmaker): Фабрика сесій бази даних.
+        batch_size (int, optional): Кількість рядків у пакеті (за замовчуванням BATCH_SIZE).
+        owner_id (int, optional): Ідентифікатор власника; експортуються лише його контакти.
+
+    Повертає:
+        Iterator[list[Row]]: Пакети рядків, упорядкованих за id.
+    """
+    columns = [getattr(models.Contact, name) for name in EXPORT_COLUMNS]
+    stmt = select(*columns).order_by(models.Contact.id).execution_options(yield_per=batch_size or BATCH_SIZE)
+    if owner_id is not None:
+        stmt = stmt.where(models.Contact.owner_id == owner_id)
+    with session_factory() as db:
+        for batch in db.execute(stmt).partitions():
+            yield batch
+
+
+def ndjson_chunks(batches):
+    """
+    Перетворює пакети рядків на фрагменти NDJSON.
+
+    Аргументи:
+        batches (Iterable[list[Row]]): Пакети рядків.
+
+    Повертає:
+        Iterator[bytes]: Фрагменти відповіді, по одному на пакет.
+    """
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str, ensure_ascii=False) + "\n" for row in batch
+        ).encode()
+
+
+def csv_chunks(batches):
+    """
+    Перетворює пакети рядків на фрагменти CSV з рядком заголовків.
+
+    Аргументи:
+        batches (Iterable[list[Row]]): Пакети рядків.
+
+    Повертає:
+        Iterator[bytes]: Фрагменти відповіді: заголовок, далі по одному фрагменту на пакет.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks):
+    """
+    Стискає потік фрагментів у формат gzip на льоту.
+
+    Аргументи:
+        chunks (Iterable[bytes]): Нестиснені фрагменти.
+
+    Повертає:
+        Iterator[bytes]: Стиснені фрагменти.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,124 @@
+"""
+Модуль для хешування паролів в окремому пулі процесів.
+
+Хешування bcrypt займає сотні мілісекунд процесорного часу. Якщо виконувати його в циклі
+подій або в пулі потоків обробника запитів, сплеск входів у систему блокує решту ендпоінтів.
+``PasswordHasher`` виконує хешування в пулі процесів (масштабується на всі ядра) і обмежує
+кількість задач в очікуванні: якщо черга заповнена, виникає ``HasherBusyError`` (відповідь 503).
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+from contacts.config import get_settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class HasherBusyError(RuntimeError):
+    """
+    Помилка, що виникає, коли черга задач хешування заповнена.
+    """
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Асинхронний інтерфейс до хешування паролів у пулі процесів з обмеженою чергою.
+
+    Атрибути:
+        workers (int): Кількість процесів у пулі.
+        max_pending (int): Максимальна кількість задач, що виконуються або очікують у черзі.
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 8
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """
+        Кількість задач, що виконуються або очікують у черзі.
+        """
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn замість fork: батьківський процес має потоки (uvicorn, пул потоків).
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HasherBusyError("Password hasher is saturated")
+            self._pending += 1
+        try:
+            executor = self._get_executor()
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Генерує хеш для пароля.
+
+        Аргументи:
+            password (str): Пароль у відкритому вигляді.
+
+        Повертає:
+            str: Хешований пароль.
+
+        Порушення:
+            HasherBusyError: Якщо черга задач хешування заповнена.
+        """
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Перевіряє відповідність пароля його хешу.
+
+        Аргументи:
+            password (str): Пароль у відкритому вигляді.
+            hashed_password (str): Хеш пароля.
+
+        Повертає:
+            bool: True, якщо пароль відповідає хешу, False інакше.
+
+        Порушення:
+            HasherBusyError: Якщо черга задач хешування заповнена.
+        """
+        return await self._run(_verify, password, hashed_password)
+
+    def shutdown(self):
+        """
+        Зупиняє пул процесів.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=get_settings().password_hasher_workers or None,
+    max_pending=get_settings().password_hasher_max_pending or None,
+)
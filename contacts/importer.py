@@ -0,0 +1,153 @@
+"""
+Модуль для потокового масового імпорту контактів із файлів CSV та NDJSON.
+
+Файл читається рядок за рядком, рядки валідуються схемою ``ContactCreate`` і записуються
+пакетами через ``crud.bulk_create_contacts``, тож у пам'яті одночасно перебуває лише один пакет.
+"""
+import csv
+import io
+import json
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from contacts import crud
+from contacts import schemas
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(filename: str = None, content_type: str = None):
+    """
+    Визначає формат файлу імпорту за розширенням або типом вмісту.
+
+    Аргументи:
+        filename (str, optional): Ім'я завантаженого файлу.
+        content_type (str, optional): MIME-тип завантаженого файлу.
+
+    Повертає:
+        str | None: "csv", "ndjson" або None, якщо формат визначити не вдалося.
+    """
+    filename = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if filename.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if filename.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    return None
+
+
+def iter_records(file, fmt: str):
+    """
+    Ліниво читає записи з бінарного файлу.
+
+    Аргументи:
+        file (BinaryIO): Файл із даними у кодуванні UTF-8.
+        fmt (str): Формат файлу: "csv" (з рядком заголовків) або "ndjson".
+
+    Повертає:
+        Iterator[tuple[int, dict | None, str | None]]: Номер рядка у файлі, запис та помилка розбору.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for record in reader:
+                yield reader.line_num, record, None
+        else:
+            for line_no, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as error:
+                    yield line_no, None, f"Invalid JSON: {error}"
+                    continue
+                if not isinstance(record, dict):
+                    yield line_no, None, "Expected a JSON object"
+                    continue
+                yield line_no, record, None
+    finally:
+        # Файл належить викликаючому коду, тому обгортка від'єднується без закриття файлу.
+        text.detach()
+
+
+def _clean(record: dict) -> dict:
+    return {key: (None if value == "" else value) for key, value in record.items() if key}
+
+
+class _Importer:
+    def __init__(self, db: Session, batch_size: int, owner_id: int = None):
+        self.db = db
+        self.batch_size = batch_size
+        self.owner_id = owner_id
+        self.report = schemas.ImportReport()
+        self.batch = []
+        self.batch_emails = set()
+        self.batch_phones = set()
+
+    def add_error(self, row: int, errors: list):
+        if len(self.report.errors) < MAX_REPORTED_ERRORS:
+            self.report.errors.append(schemas.ImportRowError(row=row, errors=errors))
+        else:
+            self.report.errors_truncated = True
+
+    def add(self, row: int, contact: schemas.ContactCreate):
+        # Дублікати всередині пакета відсікаються до INSERT, щоб RETURNING однозначно
+        # показував, які рядки вставлено.
+        if contact.email in self.batch_emails or contact.phone in self.batch_phones:
+            self.report.duplicates += 1
+            self.add_error(row, ["Duplicate email or phone"])
+            return
+        self.batch.append((row, contact))
+        self.batch_emails.add(contact.email)
+        self.batch_phones.add(contact.phone)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        inserted = crud.bulk_create_contacts(self.db, [contact for _, contact in self.batch], owner_id=self.owner_id)
+        inserted_emails = {row.email for row in inserted}
+        self.report.inserted += len(inserted)
+        for row, contact in self.batch:
+            if contact.email not in inserted_emails:
+                self.report.duplicates += 1
+                self.add_error(row, ["Duplicate email or phone"])
+        self.batch, self.batch_emails, self.batch_phones = [], set(), set()
+
+
+def import_contacts(db: Session, file, fmt: str, batch_size: int = None, owner_id: int = None) -> schemas.ImportReport:
+    """
+    Імпортує контакти з файлу CSV або NDJSON.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        file (BinaryIO): Файл із контактами.
+        fmt (str): Формат файлу: "csv" або "ndjson".
+        batch_size (int, optional): Кількість рядків в одному INSERT (за замовчуванням BATCH_SIZE).
+        owner_id (int, optional): Ідентифікатор власника створених контактів.
+
+    Повертає:
+        ImportReport: Кількість створених, пропущених і помилкових рядків та помилки за рядками.
+    """
+    importer = _Importer(db, batch_size or BATCH_SIZE, owner_id)
+    for row, record, error in iter_records(file, fmt):
+        importer.report.total += 1
+        if error is not None:
+            importer.report.failed += 1
+            importer.add_error(row, [error])
+            continue
+        try:
+            contact = schemas.ContactCreate.model_validate(_clean(record))
+        except ValidationError as exc:
+            importer.report.failed += 1
+            importer.add_error(row, [
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in exc.errors()
+            ])
+            continue
+        importer.add(row, contact)
+    importer.flush()
+    return importer.report
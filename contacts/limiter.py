@@ -0,0 +1,130 @@
+"""
+Модуль з обмежувачем частоти запитів, спільним для всіх роутерів застосунку.
+
+Лічильники зберігаються у сховищі ``limits``, спільному для всіх процесів застосунку, а ключем
+обмеження є користувач з токена доступу (для анонімних запитів — IP-адреса).
+
+Налаштування (змінні середовища або ``.env``, див. ``contacts.config.Settings``):
+    RATE_LIMIT_STORAGE_URI: Сховище лічильників: ``memory://`` (за замовчуванням, лише в межах процесу),
+        ``redis://host:6379/0`` (кілька серверів) або ``sqlite:///./ratelimit.db`` (один сервер).
+    RATE_LIMIT_STRATEGY: ``fixed-window`` (за замовчуванням), ``fixed-window-elastic-expiry``
+        або ``moving-window``.
+    RATE_LIMIT_ENABLED: Увімкнення обмеження ("0"/"false" вимикає, за замовчуванням увімкнено).
+"""
+import threading
+
+from jose import JWTError
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from contacts import ratelimit_storage  # noqa: F401 - реєструє схему sqlite:// у limits
+from contacts.config import get_settings
+from contacts.utils import decode_access_token
+
+def rate_limit_key(request) -> str:
+    """
+    Визначає ключ обмеження частоти запитів.
+
+    Аргументи:
+        request (Request): Запит від клієнта.
+
+    Повертає:
+        str: ``user:<id>`` для запитів з дійсним токеном доступу, інакше ``ip:<адреса>``.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = decode_access_token(token).get("sub")
+        except JWTError:
+            subject = None
+        if subject:
+            return f"user:{subject}"
+    return f"ip:{get_remote_address(request)}"
+
+
+class RateLimitMetrics:
+    """
+    Лічильники дозволених і відхилених запитів для кожного ліміту.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def record(self, limit: str, allowed: bool):
+        """
+        Реєструє перевірку ліміту.
+
+        Аргументи:
+            limit (str): Ліміт, наприклад "5 per 1 minute".
+            allowed (bool): Чи було запит дозволено.
+        """
+        with self._lock:
+            counters = self._counters.setdefault(limit, {"allowed": 0, "rejected": 0})
+            counters["allowed" if allowed else "rejected"] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Повертає поточні значення лічильників.
+
+        Повертає:
+            dict: Лічильники allowed/rejected за лімітами.
+        """
+        with self._lock:
+            return {limit: dict(counters) for limit, counters in self._counters.items()}
+
+
+class _MeteredStrategy:
+    def __init__(self, strategy, metrics: RateLimitMetrics):
+        self._strategy = strategy
+        self._metrics = metrics
+
+    def hit(self, item, *identifiers, cost: int = 1) -> bool:
+        allowed = self._strategy.hit(item, *identifiers, cost=cost)
+        self._metrics.record(str(item), allowed)
+        return allowed
+
+    def __getattr__(self, name):
+        return getattr(self._strategy, name)
+
+
+class MeteredLimiter(Limiter):
+    """
+    ``slowapi.Limiter``, що рахує дозволені та відхилені запити.
+
+    Атрибути:
+        metrics (RateLimitMetrics): Лічильники перевірок лімітів.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.metrics = RateLimitMetrics()
+        super().__init__(*args, **kwargs)
+
+    @property
+    def limiter(self):
+        return _MeteredStrategy(super().limiter, self.metrics)
+
+    def snapshot(self) -> dict:
+        """
+        Повертає стан обмежувача.
+
+        Повертає:
+            dict: Стратегія, схема сховища, стан сховища та лічильники за лімітами.
+        """
+        return {
+            "strategy": self._strategy,
+            "storage": self._storage_uri.split("://", 1)[0],
+            "storage_healthy": not self._storage_dead,
+            "limits": self.metrics.snapshot(),
+        }
+
+
+_settings = get_settings()
+limiter = MeteredLimiter(
+    key_func=rate_limit_key,
+    strategy=_settings.rate_limit_strategy,
+    storage_uri=_settings.rate_limit_storage_uri,
+    enabled=_settings.rate_limit_enabled,
+    # Якщо спільне сховище недоступне, ліміти тимчасово рахуються в пам'яті процесу.
+    in_memory_fallback_enabled=not _settings.rate_limit_storage_uri.startswith("memory://"),
+)
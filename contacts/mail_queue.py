@@ -0,0 +1,341 @@
+"""
+Модуль надійної черги вихідних листів.
+
+Ендпоінти лише записують лист у таблицю ``outbound_emails`` (``enqueue_email``), а окремий
+обробник ``MailWorker`` вибирає листи пакетами, надсилає їх через пул постійних SMTP-з'єднань
+з обмеженою кількістю паралельних відправлень, повторює невдалі спроби з експоненційною
+затримкою та записує стан доставки. Лист, узятий обробником, орендується на ``lease`` секунд:
+якщо обробник зупиниться, не записавши результат, лист буде взято знову після закінчення оренди.
+
+Запуск обробника:
+    python -m contacts.mail_queue
+
+Налаштування (змінні середовища або ``.env``, див. ``contacts.config.Settings``):
+    MAIL_SERVER, MAIL_PORT, MAIL_USERNAME, MAIL_PASSWORD, MAIL_FROM, MAIL_FROM_NAME,
+    MAIL_STARTTLS, MAIL_SSL_TLS: Параметри SMTP-сервера.
+    MAIL_QUEUE_BATCH_SIZE: Кількість листів в одному пакеті (за замовчуванням 50).
+    MAIL_QUEUE_CONCURRENCY: Кількість SMTP-з'єднань і паралельних відправлень (за замовчуванням 4).
+    MAIL_QUEUE_MAX_ATTEMPTS: Кількість спроб до позначення листа як "failed" (за замовчуванням 5).
+    MAIL_QUEUE_RETRY_DELAY: Затримка перед першою повторною спробою у секундах (за замовчуванням 30).
+    MAIL_QUEUE_POLL_INTERVAL: Інтервал опитування порожньої черги у секундах (за замовчуванням 5).
+"""
+import asyncio
+import logging
+import random
+from datetime import timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+
+import aiosmtplib
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from contacts import models
+from contacts.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+
+def smtp_factory() -> aiosmtplib.SMTP:
+    """
+    Створює (ще не з'єднаний) SMTP-клієнт з параметрами з налаштувань застосунку.
+
+    Повертає:
+        aiosmtplib.SMTP: SMTP-клієнт.
+    """
+    settings = get_settings()
+    return aiosmtplib.SMTP(
+        hostname=settings.mail_server,
+        port=settings.mail_port,
+        username=settings.mail_username or None,
+        password=settings.mail_password or None,
+        use_tls=settings.mail_ssl_tls,
+        start_tls=settings.mail_starttls if not settings.mail_ssl_tls else False,
+        timeout=30,
+    )
+
+
+def enqueue_email(db: Session, recipient: str, subject: str, body: str, subtype: str = "plain"):
+    """
+    Ставить лист у чергу на надсилання.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        recipient (str): Адреса отримувача.
+        subject (str): Тема листа.
+        body (str): Текст листа.
+        subtype (str): Тип вмісту: "plain" (за замовчуванням) або "html".
+
+    Повертає:
+        OutboundEmail: Збережений запис черги.
+    """
+    email = models.OutboundEmail(recipient=recipient, subject=subject, body=body, subtype=subtype)
+    db.add(email)
+    db.commit()
+    db.refresh(email)
+    return email
+
+
+def build_message(recipient: str, subject: str, body: str, subtype: str = "plain") -> EmailMessage:
+    """
+    Формує лист.
+
+    Аргументи:
+        recipient (str): Адреса отримувача.
+        subject (str): Тема листа.
+        body (str): Текст листа.
+        subtype (str): Тип вмісту: "plain" або "html".
+
+    Повертає:
+        EmailMessage: Лист для надсилання.
+    """
+    settings = get_settings()
+    message = EmailMessage()
+    message["From"] = formataddr((settings.mail_from_name, settings.mail_from or settings.mail_username))
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(body, subtype=subtype)
+    return message
+
+
+class SMTPConnectionPool:
+    """
+    Пул постійних SMTP-з'єднань.
+
+    З'єднання відкривається під час першої видачі й повторно використовується наступними
+    листами; з'єднання, на якому сталася помилка, закривається і замінюється новим.
+
+    Атрибути:
+        size (int): Максимальна кількість одночасно виданих з'єднань.
+        connects (int): Кількість відкритих з'єднань за час роботи пулу.
+    """
+
+    def __init__(self, factory, size: int):
+        self.size = size
+        self.connects = 0
+        self._factory = factory
+        self._idle = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def acquire(self):
+        """
+        Видає з'єднаний SMTP-клієнт, очікуючи, якщо всі з'єднання зайняті.
+
+        Повертає:
+            SMTP-клієнт з відкритим з'єднанням.
+        """
+        await self._semaphore.acquire()
+        try:
+            client = self._idle.pop() if self._idle else self._factory()
+            if not client.is_connected:
+                await client.connect()
+                self.connects += 1
+            return client
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self, client, broken: bool = False):
+        """
+        Повертає клієнт до пулу.
+
+        Аргументи:
+            client: SMTP-клієнт, отриманий з ``acquire``.
+            broken (bool): Чи сталася помилка з'єднання (клієнт закривається).
+        """
+        if broken:
+            client.close()
+        else:
+            self._idle.append(client)
+        self._semaphore.release()
+
+    async def close(self):
+        """
+        Закриває всі вільні з'єднання.
+        """
+        idle, self._idle = self._idle, []
+        for client in idle:
+            try:
+                await client.quit()
+            except aiosmtplib.SMTPException:
+                client.close()
+
+
+class MailWorker:
+    """
+    Обробник черги вихідних листів.
+
+    Атрибути:
+        session_factory (sessionmaker): Фабрика сесій бази даних.
+        pool (SMTPConnectionPool): Пул SMTP-з'єднань.
+        batch_size (int): Кількість листів в одному пакеті.
+        max_attempts (int): Кількість спроб до позначення листа як "failed".
+        retry_delay (float): Затримка перед першою повторною спробою у секундах.
+        lease (float): Час оренди взятого листа у секундах.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        smtp_factory=smtp_factory,
+        batch_size: int = None,
+        concurrency: int = None,
+        max_attempts: int = None,
+        retry_delay: float = None,
+        lease: float = 300.0,
+    ):
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.pool = SMTPConnectionPool(smtp_factory, concurrency or settings.mail_queue_concurrency)
+        self.batch_size = batch_size or settings.mail_queue_batch_size
+        self.max_attempts = max_attempts or settings.mail_queue_max_attempts
+        self.retry_delay = settings.mail_queue_retry_delay if retry_delay is None else retry_delay
+        self.lease = lease
+
+    def claim(self) -> list:
+        """
+        Бере з черги пакет листів, час надсилання яких настав, і орендує їх.
+
+        Повертає:
+            list[tuple]: Листи (id, отримувач, тема, текст, тип вмісту, номер спроби).
+        """
+        email = models.OutboundEmail
+        now = models.utcnow()
+        with self.session_factory() as db:
+            stmt = (
+                select(email)
+                .where(email.status.in_(("pending", "sending")), email.next_attempt_at <= now)
+                .order_by(email.next_attempt_at, email.id)
+                .limit(self.batch_size)
+            )
+            if db.get_bind().dialect.name == "postgresql":
+                # Кілька обробників не візьмуть ті самі листи.
+                stmt = stmt.with_for_update(skip_locked=True)
+            batch = []
+            for row in db.scalars(stmt):
+                row.status = "sending"
+                row.attempts += 1
+                row.next_attempt_at = now + timedelta(seconds=self.lease)
+                batch.append((row.id, row.recipient, row.subject, row.body, row.subtype, row.attempts))
+            db.commit()
+        return batch
+
+    def backoff(self, attempts: int) -> float:
+        """
+        Обчислює затримку перед наступною спробою.
+
+        Аргументи:
+            attempts (int): Кількість виконаних спроб.
+
+        Повертає:
+            float: Затримка у секундах (експоненційна з випадковим відхиленням до 10%).
+        """
+        return self.retry_delay * 2 ** (attempts - 1) * random.uniform(0.9, 1.1)
+
+    async def deliver(self, email: tuple):
+        """
+        Надсилає один лист через пул з'єднань.
+
+        Аргументи:
+            email (tuple): Лист з ``claim``.
+
+        Повертає:
+            tuple[int, int, str | None, bool]: id листа, номер спроби, помилка (None, якщо лист
+            надіслано) та ознака остаточної помилки (повторювати немає сенсу).
+        """
+        email_id, recipient, subject, body, subtype, attempts = email
+        message = build_message(recipient, subject, body, subtype)
+        try:
+            client = await self.pool.acquire()
+        except (aiosmtplib.SMTPException, OSError) as error:
+            return email_id, attempts, f"connect: {error}", False
+        broken = False
+        try:
+            await client.send_message(message)
+            return email_id, attempts, None, False
+        except aiosmtplib.SMTPRecipientsRefused as error:
+            return email_id, attempts, str(error), True
+        except aiosmtplib.SMTPResponseException as error:
+            return email_id, attempts, str(error), error.code >= 500
+        except (aiosmtplib.SMTPException, OSError) as error:
+            broken = True
+            return email_id, attempts, str(error), False
+        finally:
+            self.pool.release(client, broken=broken)
+
+    def record(self, results: list):
+        """
+        Записує результати надсилання пакета.
+
+        Аргументи:
+            results (list[tuple]): Результати ``deliver``.
+        """
+        email = models.OutboundEmail
+        now = models.utcnow()
+        with self.session_factory() as db:
+            for email_id, attempts, error, permanent in results:
+                if error is None:
+                    values = {"status": "sent", "sent_at": now, "last_error": None}
+                elif permanent or attempts >= self.max_attempts:
+                    values = {"status": "failed", "last_error": error}
+                else:
+                    values = {
+                        "status": "pending",
+                        "last_error": error,
+                        "next_attempt_at": now + timedelta(seconds=self.backoff(attempts)),
+                    }
+                db.execute(update(email).where(email.id == email_id).values(**values))
+            db.commit()
+
+    async def run_once(self) -> int:
+        """
+        Обробляє один пакет листів.
+
+        Повертає:
+            int: Кількість оброблених листів.
+        """
+        batch = await asyncio.to_thread(self.claim)
+        if not batch:
+            return 0
+        results = await asyncio.gather(*(self.deliver(email) for email in batch))
+        await asyncio.to_thread(self.record, results)
+        failed = sum(1 for _, _, error, _ in results if error is not None)
+        logger.info("Mail batch processed: %d sent, %d failed", len(results) - failed, failed)
+        return len(batch)
+
+    async def run(self, stop: asyncio.Event = None, poll_interval: float = None):
+        """
+        Обробляє чергу, доки не буде встановлено подію зупинки.
+
+        Аргументи:
+            stop (asyncio.Event, optional): Подія зупинки обробника.
+            poll_interval (float, optional): Інтервал опитування порожньої черги у секундах.
+        """
+        stop = stop or asyncio.Event()
+        poll_interval = get_settings().mail_queue_poll_interval if poll_interval is None else poll_interval
+        try:
+            while not stop.is_set():
+                try:
+                    processed = await self.run_once()
+                except Exception:
+                    logger.exception("Mail queue iteration failed")
+                    processed = 0
+                if processed < self.batch_size:
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await self.pool.close()
+
+
+def main():
+    from contacts.database import get_session_factory
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(MailWorker(get_session_factory()).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,72 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Literal, Optional
+
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import JSONResponse
+from starlette.staticfiles import StaticFiles
 
-from contacts.models import Contact
 from contacts import schemas
+from contacts import conditional
 from contacts import crud
-from contacts.database import engine, Base, get_db
-from datetime import datetime, timedelta
-from contacts.routers import auth, contacts_router
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from contacts import serialization
+from contacts.avatars import avatar_pipeline, local_media
+from contacts.config import get_settings
+from contacts.database import Base, dispose_engines, get_db, get_engine, get_session_factory
+from contacts.hashing import HasherBusyError, password_hasher
+from contacts.limiter import limiter
+from contacts.metrics import MetricsMiddleware
+from contacts.mail_queue import MailWorker
+from contacts.models import User
+from contacts.pagination import InvalidCursorError
+from contacts.tokens import RevocationListFullError
+from contacts.utils import get_current_user, get_key_ring
+from contacts.routers import auth, bulk, contacts_router, contacts_async, health, metrics
 from fastapi import FastAPI, Request
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
-contacts_app = FastAPI()
+router = APIRouter()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запускає та зупиняє ресурси застосунку.
+
+    Під час запуску за потреби створює таблиці (``DB_CREATE_ALL=1``) та запускає обробник черги
+    листів у процесі застосунку (``MAIL_WORKER_ENABLED=1``). Рушії бази даних, пули процесів
+    і клієнти сховищ створюються під час першого звернення. Під час зупинки пули процесів
+    зупиняються, а з'єднання з базою даних закриваються.
 
-limiter = Limiter(key_func=get_remote_address)
-contacts_app.state.limiter = limiter
-contacts_app.add_middleware(SlowAPIMiddleware)
+    Аргументи:
+        app (FastAPI): Застосунок.
+    """
+    settings = get_settings()
+    # Ключі підпису читаються під час запуску, тож попередження про відсутній ключ видно одразу.
+    get_key_ring()
+    if settings.db_create_all:
+        await run_in_threadpool(Base.metadata.create_all, bind=get_engine())
 
-Base.metadata.create_all(bind=engine)
+    stop = asyncio.Event()
+    mail_worker = None
+    if settings.mail_worker_enabled:
+        mail_worker = asyncio.create_task(MailWorker(get_session_factory()).run(stop))
+    try:
+        yield
+    finally:
+        stop.set()
+        if mail_worker is not None:
+            await mail_worker
+        await run_in_threadpool(password_hasher.shutdown)
+        await run_in_threadpool(avatar_pipeline.shutdown)
+        await dispose_engines()
 
-contacts_app.include_router(auth.router)
-contacts_app.include_router(contacts_router.router)
 
-@contacts_app.exception_handler(RateLimitExceeded)
 async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
     """
     Обробляє помилку ліміту запитів (Rate Limit Exceeded).
@@ -43,25 +83,52 @@ async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
         content={"detail": "Too many requests"}
     )
 
+async def hasher_busy_handler(request: Request, exc: HasherBusyError):
+    """
+    Обробляє переповнення черги хешування паролів.
+
+    Аргументи:
+        request (Request): Запит, що викликав помилку.
+        exc (HasherBusyError): Об'єкт помилки.
+
+    Повертає:
+        JSONResponse: Відповідь із статус кодом 503 та заголовком Retry-After.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily overloaded"},
+        headers={"Retry-After": "1"}
+    )
+
+async def revocation_list_full_handler(request: Request, exc: RevocationListFullError):
+    """
+    Обробляє переповнення списку відкликаних токенів.
+
+    Аргументи:
+        request (Request): Запит, що викликав помилку.
+        exc (RevocationListFullError): Об'єкт помилки.
+
+    Повертає:
+        JSONResponse: Відповідь із статус кодом 503 та заголовком Retry-After.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Token revocation temporarily unavailable"},
+        headers={"Retry-After": "60"}
+    )
+
 origins = [
     "http://localhost",
     "http://localhost:8000",
 ]
 
-contacts_app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@contacts_app.post("/contacts/", response_model=schemas.ContactResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/contacts/", response_model=schemas.ContactResponse, status_code=status.HTTP_201_CREATED)
 @limiter.limit("5/minute")
 def create_contact(
     request: Request,
     contact: schemas.ContactCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
 ):
     """
     Створює новий контакт.
@@ -70,31 +137,54 @@ def create_contact(
         request (Request): Запит від клієнта.
         contact (schemas.ContactCreate): Дані нового контакту.
         db (Session): Сесія бази даних для доступу до таблиці контактів.
+        current_user (User): Поточний користувач, власник контактів.
 
     Повертає:
         schemas.ContactResponse: Створений контакт.
+
+    Порушення:
+        HTTPException: 409, якщо контакт з таким email або телефоном уже є у користувача.
     """
-    return crud.create_contact(db=db, contact=contact)
+    try:
+        return crud.create_contact(db=db, contact=contact, owner_id=current_user.id)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Email or phone already exists")
 
-@contacts_app.get("/contacts/{contact_id}", response_model=schemas.ContactResponse)
-def read_contact(contact_id: int, db: Session = Depends(get_db)):
+@router.get("/contacts/{contact_id}", response_model=schemas.ContactResponse)
+def read_contact(
+    request: Request,
+    contact_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """
     Повертає контакт за його ID.
 
+    Відповідь містить заголовки ETag та Last-Modified; якщо ETag збігається з ``If-None-Match``,
+    повертається 304 без тіла.
+
     Аргументи:
+        request (Request): Запит від клієнта.
         contact_id (int): Ідентифікатор контакту.
         db (Session): Сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
 
     Повертає:
         schemas.ContactResponse: Контакт з відповідним ID.
     """
-    db_contact = crud.get_contact(db, contact_id=contact_id)
-    if db_contact is None:
+    entry = crud.get_contact_cached(db, contact_id=contact_id, owner_id=current_user.id)
+    if entry is None:
         raise HTTPException(status_code=404, detail="Contact not found")
-    return db_contact
+    return conditional.conditional_response(request, entry)
 
-@contacts_app.put("/contacts/{contact_id}", response_model=schemas.ContactResponse)
-def update_contact(contact_id: int, contact: schemas.ContactUpdate, db: Session = Depends(get_db)):
+@router.put("/contacts/{contact_id}", response_model=schemas.ContactResponse)
+def update_contact(
+    contact_id: int,
+    contact: schemas.ContactUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """
     Оновлює контакт за його ID.
 
@@ -102,79 +192,193 @@ def update_contact(contact_id: int, contact: schemas.ContactUpdate, db: Session
         contact_id (int): Ідентифікатор контакту.
         contact (schemas.ContactUpdate): Дані для оновлення контакту.
         db (Session): Сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
 
     Повертає:
         schemas.ContactResponse: Оновлений контакт.
+
+    Порушення:
+        HTTPException: 409, якщо контакт з таким email або телефоном уже є у користувача.
     """
-    db_contact = crud.update_contact(db, contact_id=contact_id, contact_data=contact)
+    try:
+        db_contact = crud.update_contact(db, contact_id=contact_id, contact_data=contact, owner_id=current_user.id)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Email or phone already exists")
     if db_contact is None:
         raise HTTPException(status_code=404, detail="Contact not found")
     return db_contact
 
-@contacts_app.delete("/contacts/{contact_id}", response_model=schemas.ContactResponse)
-def delete_contact(contact_id: int, db: Session = Depends(get_db)):
+@router.delete("/contacts/{contact_id}", response_model=schemas.ContactResponse)
+def delete_contact(contact_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """
     Видаляє контакт за його ID.
 
     Аргументи:
         contact_id (int): Ідентифікатор контакту.
         db (Session): Сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
 
     Повертає:
         schemas.ContactResponse: Видалений контакт.
     """
-    db_contact = crud.delete_contact(db, contact_id=contact_id)
+    db_contact = crud.delete_contact(db, contact_id=contact_id, owner_id=current_user.id)
     if db_contact is None:
         raise HTTPException(status_code=404, detail="Contact not found")
     return db_contact
 
-@contacts_app.get("/contacts/", response_model=list[schemas.ContactResponse])
-def read_contacts(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
+@router.get("/contacts/", response_model=list[schemas.ContactResponse])
+def read_contacts(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    after: Optional[str] = None,
+    order: Literal["id", "name"] = "id",
+    fields: tuple = Depends(serialization.response_fields),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """
     Повертає список контактів з пагінацією.
 
+    Без параметра ``after`` використовується пагінація skip/limit (з заголовком ETag
+    і відповіддю 304 на ``If-None-Match``). Якщо ``after`` передано
+    (порожнє значення означає першу сторінку), використовується курсорна пагінація у порядку
+    ``order``, а курсор наступної сторінки повертається в заголовку ``X-Next-Cursor``.
+
     Аргументи:
+        request (Request): Запит від клієнта.
         skip (int): Кількість пропущених елементів.
-        limit (int): Максимальна кількість елементів.
+        limit (int): Максимальна кількість елементів (від 1 до 100).
+        after (str, optional): Курсор останнього елемента попередньої сторінки.
+        order (str): Порядок курсорного обходу: "id" або "name".
+        fields (tuple[str, ...]): Поля відповіді з параметра ``fields`` (за замовчуванням усі).
         db (Session): Сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
 
     Повертає:
         list[schemas.ContactResponse]: Список контактів.
     """
-    return crud.get_contacts(db, skip=skip, limit=limit)
+    if after is None:
+        return conditional.conditional_response(request, crud.get_contacts_cached(
+            db, skip=skip, limit=limit, fields=fields, owner_id=current_user.id
+        ))
+    try:
+        contacts, next_cursor = crud.get_contacts_after(
+            db, after=after, limit=limit, order=order, fields=fields, owner_id=current_user.id
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return serialization.json_response(serialization.objects_to_json(contacts, fields), headers)
 
-@contacts_app.get("/contacts/search/", response_model=list[schemas.ContactResponse])
-def search_contacts(query: str, db: Session = Depends(get_db)):
+@router.get("/contacts/search/", response_model=list[schemas.ContactResponse])
+def search_contacts(
+    query: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: tuple = Depends(serialization.response_fields),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """
     Пошук контактів за запитом (ім'я, прізвище або email).
 
+    Результати впорядковані за релевантністю. Якщо є наступна сторінка, її курсор
+    повертається в заголовку ``X-Next-Cursor``.
+
     Аргументи:
         query (str): Пошуковий запит.
+        limit (int): Максимальна кількість результатів (від 1 до 100).
+        cursor (str, optional): Курсор наступної сторінки.
+        fields (tuple[str, ...]): Поля відповіді з параметра ``fields`` (за замовчуванням усі).
         db (Session): Сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
 
     Повертає:
         list[schemas.ContactResponse]: Список знайдених контактів.
     """
-    return db.query(Contact).filter(
-        (Contact.first_name.contains(query)) |
-        (Contact.last_name.contains(query)) |
-        (Contact.email.contains(query))
-    ).all()
+    try:
+        contacts, next_cursor = crud.search_contacts(
+            db, query, limit=limit, cursor=cursor, fields=fields, owner_id=current_user.id
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return serialization.json_response(serialization.objects_to_json(contacts, fields), headers)
 
-@contacts_app.get("/contacts/upcoming_birthdays/", response_model=list[schemas.ContactResponse])
-def upcoming_birthdays(db: Session = Depends(get_db)):
+@router.get("/contacts/upcoming_birthdays/", response_model=list[schemas.ContactResponse])
+def upcoming_birthdays(
+    days: int = Query(7, ge=0, le=366),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """
-    Повертає контакти з найближчими днями народження (в межах наступного тижня).
+    Повертає контакти з найближчими днями народження (за замовчуванням в межах наступного тижня).
 
     Аргументи:
+        days (int): Кількість днів наперед (від 0 до 366).
         db (Session): Сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
 
     Повертає:
-        list[schemas.ContactResponse]: Список контактів з днями народження в межах наступного тижня.
-    """
-    today = datetime.today().date()
-    next_week = today + timedelta(days=7)
-    return db.query(Contact).filter(
-        Contact.birthday >= today,
-        Contact.birthday <= next_week
-    ).all()
+        list[schemas.ContactResponse]: Список контактів з днями народження в межах указаного періоду.
+    """
+    return serialization.json_response(serialization.objects_to_json(
+        crud.get_upcoming_birthdays(db, days=days, owner_id=current_user.id)
+    ))
+
+
+
+def create_app() -> FastAPI:
+    """
+    Створює застосунок FastAPI.
+
+    Створення застосунку не звертається до бази даних і зовнішніх сервісів, тому процеси
+    uvicorn запускаються за мілісекунди.
+
+    Повертає:
+        FastAPI: Застосунок з маршрутами, проміжними обробниками та обробниками помилок.
+    """
+    settings = get_settings()
+    app = FastAPI(lifespan=lifespan)
+
+    app.state.limiter = limiter
+    app.add_middleware(SlowAPIMiddleware)
+    app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+    app.add_exception_handler(HasherBusyError, hasher_busy_handler)
+    app.add_exception_handler(RevocationListFullError, revocation_list_full_handler)
+
+    app.include_router(auth.router)
+    app.include_router(contacts_router.router)
+    app.include_router(health.router)
+    app.include_router(bulk.router)
+    # Синхронні або асинхронні (SQLALCHEMY_ASYNC=1) ендпоінти контактів
+    app.include_router(contacts_async.router if settings.db_async else router)
+    if settings.metrics_enabled:
+        app.include_router(metrics.router)
+    # Аватари з локального сховища (AVATAR_STORAGE_URL=file://...) віддає сам застосунок.
+    media = local_media()
+    if media is not None:
+        media_url, media_root = media
+        app.mount(media_url, StaticFiles(directory=media_root, check_dir=False), name="media")
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
+    )
+    # Додається останнім, тому охоплює всі інші проміжні обробники.
+    if settings.metrics_enabled:
+        app.add_middleware(
+            MetricsMiddleware,
+            admin_ids=settings.admin_ids(),
+            max_queries=settings.max_queries_per_request or None,
+        )
+    return app
+
+
+contacts_app = create_app()
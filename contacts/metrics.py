@@ -0,0 +1,567 @@
+"""
+Модуль з інструментуванням запитів.
+
+``MetricsMiddleware`` вимірює час відповіді кожного маршруту, а події SQLAlchemy
+(``instrument_queries``) — кількість і тривалість запитів до бази даних у межах HTTP-запиту.
+Лічильники поточного запиту зберігаються в ``ContextVar``, який успадковують пул потоків
+синхронних ендпоінтів і greenlet-и асинхронного драйвера. Разом з метриками пулу з'єднань,
+кешу та обмежувача частоти запитів вони віддаються у форматі Prometheus (``render_prometheus``).
+
+У тестах і під час розробки ``MAX_QUERIES_PER_REQUEST`` (або ``query_budget`` для коду поза
+HTTP-запитом) обмежує кількість запитів до бази даних, тож проблема N+1 завершується
+помилкою ``TooManyQueriesError``, а не повільною відповіддю.
+
+Адміністратор (``ADMIN_USER_IDS``) може додати до запиту ``?profile=1`` і отримати замість
+відповіді звіт вибіркового профілювальника ``SamplingProfiler``.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import parse_qs
+
+from jose import JWTError
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Верхні межі кошиків гістограм: тривалість у секундах і кількість запитів до бази даних
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, float("inf"))
+
+
+class TooManyQueriesError(AssertionError):
+    """
+    Помилка перевищення кількості запитів до бази даних в межах одного HTTP-запиту.
+    """
+
+
+class RequestMetrics:
+    """
+    Лічильники одного HTTP-запиту.
+
+    Атрибути:
+        queries (int): Кількість запитів до бази даних.
+        db_seconds (float): Сумарний час запитів до бази даних.
+        serialization_seconds (float): Час серіалізації відповіді в JSON.
+        max_queries (int, optional): Допустима кількість запитів до бази даних (None — без обмеження).
+    """
+
+    __slots__ = ("queries", "db_seconds", "serialization_seconds", "max_queries")
+
+    def __init__(self, max_queries: int = None):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.max_queries = max_queries
+
+
+_current = ContextVar("contacts_request_metrics", default=None)
+
+
+def current_request_metrics():
+    """
+    Повертає лічильники поточного HTTP-запиту.
+
+    Повертає:
+        RequestMetrics | None: Лічильники або None поза обробкою запиту.
+    """
+    return _current.get()
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """
+    Обмежує кількість запитів до бази даних у блоці коду (для тестів).
+
+    Аргументи:
+        max_queries (int): Допустима кількість запитів.
+
+    Повертає:
+        RequestMetrics: Лічильники блоку.
+
+    Порушення:
+        TooManyQueriesError: Якщо в блоці виконано більше запитів (до рушіїв з ``instrument_queries``).
+    """
+    request_metrics = RequestMetrics(max_queries)
+    token = _current.set(request_metrics)
+    try:
+        yield request_metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def track_serialization():
+    """
+    Додає час виконання блоку до часу серіалізації поточного запиту.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_metrics = _current.get()
+        if request_metrics is not None:
+            request_metrics.serialization_seconds += time.perf_counter() - start
+
+
+class Histogram:
+    """
+    Гістограма з мітками у стилі Prometheus.
+
+    Атрибути:
+        buckets (tuple[float, ...]): Верхні межі кошиків (остання — нескінченність).
+    """
+
+    def __init__(self, buckets: tuple = DURATION_BUCKETS):
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: tuple = ()):
+        """
+        Реєструє значення.
+
+        Аргументи:
+            value (float): Значення спостереження.
+            labels (tuple): Значення міток серії.
+        """
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Повертає копію серій.
+
+        Повертає:
+            dict: Мітки -> (накопичувальні кількості за кошиками, сума, кількість).
+        """
+        with self._lock:
+            items = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        result = {}
+        for labels, counts, total, count in items:
+            cumulative, running = [], 0
+            for value in counts:
+                running += value
+                cumulative.append(running)
+            result[labels] = (cumulative, total, count)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class HttpMetrics:
+    """
+    Метрики HTTP-запитів і запитів до бази даних.
+
+    Атрибути:
+        requests (Counter): Кількість відповідей за (метод, маршрут, статус).
+        duration (Histogram): Час відповіді за (метод, маршрут).
+        db_queries (Histogram): Кількість запитів до бази даних на HTTP-запит.
+        db_time (Histogram): Час запитів до бази даних на HTTP-запит.
+        serialization_time (Histogram): Час серіалізації на HTTP-запит.
+        query_time (Histogram): Тривалість окремих запитів до бази даних (усіх, не лише з HTTP).
+        slow_queries (int): Кількість повільних запитів до бази даних.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.duration = Histogram()
+        self.db_queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time = Histogram()
+        self.serialization_time = Histogram()
+        self.query_time = Histogram()
+        self.slow_queries = 0
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, request_metrics: RequestMetrics):
+        """
+        Реєструє завершений HTTP-запит.
+
+        Аргументи:
+            method (str): HTTP-метод.
+            route (str): Шаблон маршруту, наприклад ``/contacts/{contact_id}``.
+            status (int): Статус відповіді.
+            seconds (float): Час обробки запиту.
+            request_metrics (RequestMetrics): Лічильники запиту.
+        """
+        labels = (method, route)
+        with self._lock:
+            self.requests[(method, route, str(status))] += 1
+        self.duration.observe(seconds, labels)
+        self.db_queries.observe(request_metrics.queries, labels)
+        self.db_time.observe(request_metrics.db_seconds, labels)
+        self.serialization_time.observe(request_metrics.serialization_seconds, labels)
+
+    def observe_query(self, seconds: float, slow: bool):
+        """
+        Реєструє запит до бази даних.
+
+        Аргументи:
+            seconds (float): Тривалість запиту.
+            slow (bool): Чи перевищено поріг повільного запиту.
+        """
+        self.query_time.observe(seconds)
+        if slow:
+            with self._lock:
+                self.slow_queries += 1
+
+    def clear(self):
+        """
+        Скидає всі метрики.
+        """
+        with self._lock:
+            self.requests.clear()
+            self.slow_queries = 0
+        for histogram in (self.duration, self.db_queries, self.db_time, self.serialization_time, self.query_time):
+            histogram.clear()
+
+
+http_metrics = HttpMetrics()
+
+
+def instrument_queries(engine, slow_query_seconds: float = None, metrics: HttpMetrics = http_metrics):
+    """
+    Підключає облік запитів до бази даних до рушія.
+
+    Аргументи:
+        engine (Engine): Синхронний рушій (для AsyncEngine передається ``sync_engine``).
+        slow_query_seconds (float, optional): Поріг, після якого запит записується в журнал
+            з текстом інструкції (None — журнал вимкнено).
+        metrics (HttpMetrics): Метрики, до яких додаються запити.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_query_start
+        slow = slow_query_seconds is not None and elapsed >= slow_query_seconds
+        metrics.observe_query(elapsed, slow)
+        if slow:
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
+        request_metrics = _current.get()
+        if request_metrics is not None:
+            request_metrics.queries += 1
+            request_metrics.db_seconds += elapsed
+            if request_metrics.max_queries is not None and request_metrics.queries > request_metrics.max_queries:
+                raise TooManyQueriesError(
+                    f"{request_metrics.queries} queries exceed the limit of {request_metrics.max_queries}; "
+                    f"last statement: {statement}"
+                )
+
+
+# Функції, у яких потік чекає на роботу; вибірки з такою вершиною стеку не враховуються.
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+
+class SamplingProfiler:
+    """
+    Вибірковий профілювальник: окремий потік періодично знімає стеки всіх потоків процесу.
+
+    На відміну від cProfile, він бачить і цикл подій, і пул потоків, у якому виконуються
+    синхронні ендпоінти, а накладні витрати не залежать від кількості викликів функцій.
+
+    Атрибути:
+        interval (float): Інтервал між вибірками у секундах.
+        samples (int): Кількість вибірок з хоча б одним активним потоком.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples = 0
+        self._stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = self._elapsed = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._elapsed = time.perf_counter() - self._started
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            active = False
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(f"{_short_path(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+                active = True
+            self.samples += active
+
+    def report(self, limit: int = 40) -> str:
+        """
+        Формує текстовий звіт.
+
+        Аргументи:
+            limit (int): Кількість рядків у таблиці функцій і стеків.
+
+        Повертає:
+            str: Таблиця функцій за кількістю вибірок (включно з викликаними) та згорнуті стеки,
+            сумісні з flamegraph.pl і speedscope.
+        """
+        inclusive = Counter()
+        for stack, count in self._stacks.items():
+            for frame in set(stack.split(";")):
+                inclusive[frame] += count
+        total = sum(self._stacks.values()) or 1
+        lines = [
+            f"Duration: {self._elapsed * 1000:.1f} ms, interval: {self.interval * 1000:.1f} ms, "
+            f"samples: {self.samples}",
+            "",
+            "Samples      %  Function",
+        ]
+        for frame, count in inclusive.most_common(limit):
+            lines.append(f"{count:7d} {count * 100 / total:6.1f}  {frame}")
+        lines += ["", "Collapsed stacks:"]
+        lines += [f"{stack} {count}" for stack, count in self._stacks.most_common(limit)]
+        return "\n".join(lines) + "\n"
+
+
+def _short_path(filename: str) -> str:
+    for prefix in sorted((p for p in sys.path if p), key=len, reverse=True):
+        if filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1:]
+    return filename
+
+
+class MetricsMiddleware:
+    """
+    ASGI-обробник, що збирає метрики HTTP-запитів.
+
+    До відповіді додається заголовок ``Server-Timing`` з часом бази даних і кількістю запитів.
+    Запит адміністратора з параметром ``profile=1`` виконується під ``SamplingProfiler``,
+    а замість відповіді повертається звіт (статус вихідної відповіді — у ``X-Profiled-Status``).
+    Одночасно профілюється лише один запит.
+
+    Атрибути:
+        app: Вкладений ASGI-застосунок.
+        admin_ids (frozenset[int]): Ідентифікатори користувачів, яким дозволено профілювання.
+        max_queries (int, optional): Допустима кількість запитів до бази даних на HTTP-запит
+            (None — без обмеження); перевищення спричиняє ``TooManyQueriesError``.
+        metrics (HttpMetrics): Метрики, до яких додаються запити.
+    """
+
+    def __init__(self, app, admin_ids=frozenset(), max_queries: int = None, metrics: HttpMetrics = http_metrics):
+        self.app = app
+        self.admin_ids = frozenset(admin_ids)
+        self.max_queries = max_queries
+        self.metrics = metrics
+        self._profile_lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profiler = None
+        if self._wants_profile(scope) and self._profile_lock.acquire(blocking=False):
+            profiler = SamplingProfiler()
+            profiler.start()
+        request_metrics = RequestMetrics(self.max_queries)
+        token = _current.set(request_metrics)
+        start = time.perf_counter()
+        response_status = 500
+
+        async def send_wrapper(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                elapsed = time.perf_counter() - start
+                timing = (
+                    f'db;dur={request_metrics.db_seconds * 1000:.1f};desc="{request_metrics.queries} queries", '
+                    f"app;dur={elapsed * 1000:.1f}"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode())]}
+            if profiler is None:
+                await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            route = scope.get("route")
+            self.metrics.observe_request(
+                scope["method"], getattr(route, "path", "unmatched"), response_status, elapsed, request_metrics
+            )
+            if profiler is not None:
+                profiler.stop()
+                self._profile_lock.release()
+
+        if profiler is not None:
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"x-profiled-status", str(response_status).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": profiler.report().encode()})
+
+    def _wants_profile(self, scope) -> bool:
+        if not self.admin_ids or b"profile" not in scope.get("query_string", b""):
+            return False
+        if parse_qs(scope["query_string"].decode("latin-1")).get("profile") != ["1"]:
+            return False
+        from contacts.utils import decode_access_token
+
+        headers = dict(scope.get("headers", []))
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            subject = decode_access_token(token).get("sub")
+        except JWTError:
+            return False
+        return subject is not None and str(subject).isdigit() and int(subject) in self.admin_ids
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _le(bound: str) -> str:
+    return f'le="{bound}"'
+
+
+def _render_histogram(lines: list, name: str, help_text: str, histogram: Histogram, label_names: tuple = ()):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, (cumulative, total, count) in sorted(histogram.snapshot().items()):
+        for bound, value in zip(histogram.buckets, cumulative):
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(f"{name}_bucket{_labels(label_names, labels, _le(le))} {value}")
+        lines.append(f"{name}_sum{_labels(label_names, labels)} {total}")
+        lines.append(f"{name}_count{_labels(label_names, labels)} {count}")
+
+
+def _render_metric(lines: list, name: str, kind: str, help_text: str, samples: list):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{labels} {value}" for labels, value in samples]
+
+
+def _render_pool(lines: list, pools: dict):
+    counters = (
+        ("checkouts", "Connections checked out of the pool."),
+        ("checkins", "Connections returned to the pool."),
+        ("connects", "New DBAPI connections opened."),
+        ("invalidations", "Invalidated connections."),
+        ("overflow_checkouts", "Checkouts beyond pool_size."),
+        ("timeouts", "Timeouts waiting for a connection."),
+    )
+    for key, help_text in counters:
+        _render_metric(lines, f"contacts_db_pool_{key}_total", "counter", help_text, [
+            (_labels(("pool",), (name,)), snapshot[key]) for name, snapshot in pools.items()
+        ])
+    for key in ("checked_out", "overflow", "size"):
+        _render_metric(lines, f"contacts_db_pool_{key}", "gauge", f"Current pool {key.replace('_', ' ')}.", [
+            (_labels(("pool",), (name,)), snapshot["pool"][key])
+            for name, snapshot in pools.items() if key in snapshot.get("pool", {})
+        ])
+    name = "contacts_db_pool_wait_seconds"
+    lines += [f"# HELP {name} Time spent waiting for a pooled connection.", f"# TYPE {name} histogram"]
+    for pool_name, snapshot in pools.items():
+        wait = snapshot["wait_seconds"]
+        for le, value in wait["buckets"].items():
+            lines.append(f"{name}_bucket{_labels(('pool',), (pool_name,), _le(le))} {value}")
+        lines.append(f"{name}_sum{_labels(('pool',), (pool_name,))} {wait['sum']}")
+        lines.append(f"{name}_count{_labels(('pool',), (pool_name,))} {wait['count']}")
+
+
+def render_prometheus(metrics: HttpMetrics = http_metrics) -> str:
+    """
+    Формує метрики застосунку в текстовому форматі Prometheus.
+
+    Аргументи:
+        metrics (HttpMetrics): Метрики HTTP-запитів.
+
+    Повертає:
+        str: Метрики запитів, бази даних, пулів з'єднань, кешу контактів і обмежувача частоти запитів.
+    """
+    from contacts import database
+    from contacts.cache import contact_cache
+    from contacts.limiter import limiter
+
+    lines = []
+    route = ("method", "route")
+    with metrics._lock:
+        requests = sorted(metrics.requests.items())
+        slow_queries = metrics.slow_queries
+    _render_metric(lines, "contacts_http_requests_total", "counter", "HTTP responses by route and status.", [
+        (_labels(("method", "route", "status"), labels), count) for labels, count in requests
+    ])
+    _render_histogram(lines, "contacts_http_request_duration_seconds", "HTTP request latency.",
+                      metrics.duration, route)
+    _render_histogram(lines, "contacts_http_request_db_queries", "Database queries per HTTP request.",
+                      metrics.db_queries, route)
+    _render_histogram(lines, "contacts_http_request_db_seconds", "Database time per HTTP request.",
+                      metrics.db_time, route)
+    _render_histogram(lines, "contacts_http_request_serialization_seconds", "JSON serialization time per request.",
+                      metrics.serialization_time, route)
+    _render_histogram(lines, "contacts_db_query_duration_seconds", "Duration of database queries.",
+                      metrics.query_time)
+    _render_metric(lines, "contacts_db_slow_queries_total", "counter", "Queries slower than the threshold.", [
+        ("", slow_queries)
+    ])
+
+    pools = {}
+    if database.engine is not None:
+        pools["sync"] = database.pool_metrics.snapshot(database.engine.pool)
+    if database.async_engine is not None:
+        pools["async"] = database.async_pool_metrics.snapshot(database.async_engine.sync_engine.pool)
+    _render_pool(lines, pools)
+
+    cache = contact_cache.stats()
+    _render_metric(lines, "contacts_cache_requests_total", "counter", "Contact cache lookups.", [
+        (_labels(("backend", "result"), (cache["backend"], "hit")), cache["hits"]),
+        (_labels(("backend", "result"), (cache["backend"], "miss")), cache["misses"]),
+    ])
+
+    limits = sorted(limiter.metrics.snapshot().items())
+    _render_metric(lines, "contacts_rate_limit_checks_total", "counter", "Rate limit checks by result.", [
+        (_labels(("limit", "result"), (limit, result)), counters[result])
+        for limit, counters in limits for result in ("allowed", "rejected")
+    ])
+    return "\n".join(lines) + "\n"
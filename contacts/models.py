@@ -1,9 +1,36 @@
 import sqlalchemy
-from sqlalchemy import Column, Integer, String, Date, Boolean
+from datetime import date, datetime, timezone
+from sqlalchemy import (
+    Column, Integer, String, Text, Date, DateTime, Boolean, DDL, Index, JSON, UniqueConstraint, event, func
+)
 from .database import Base
 from sqlalchemy import ForeignKey
-from sqlalchemy.orm import relationship
-from passlib.context import CryptContext
+from sqlalchemy.orm import relationship, validates
+from .hashing import pwd_context
+
+
+def birthday_key(birthday):
+    """
+    Обчислює ключ дня народження без урахування року (місяць * 100 + день).
+
+    Аргументи:
+        birthday (date | str | None): Дата народження.
+
+    Повертає:
+        int | None: Ключ, наприклад 1231 для 31 грудня, або None, якщо дата не вказана.
+    """
+    if birthday is None:
+        return None
+    if isinstance(birthday, str):
+        birthday = date.fromisoformat(birthday)
+    return birthday.month * 100 + birthday.day
+
+
+def utcnow():
+    """
+    Повертає поточний час в UTC.
+    """
+    return datetime.now(timezone.utc)
 
 
 class Contact(Base):
@@ -14,10 +41,13 @@ class Contact(Base):
         id (int): Унікальний ідентифікатор контакту.
         first_name (str): Ім'я контакту.
         last_name (str): Прізвище контакту.
-        email (str): Унікальний email контакту.
-        phone (str): Унікальний номер телефону контакту.
+        email (str): Email контакту, унікальний серед контактів власника.
+        phone (str): Номер телефону контакту, унікальний серед контактів власника.
         birthday (Date): Дата народження контакту.
+        birthday_doy (int): Ключ дня народження (місяць * 100 + день), синхронізується з birthday.
         additional_info (str, optional): Додаткова інформація про контакт.
+        version (int): Версія рядка, збільшується під час кожного оновлення (для ETag).
+        updated_at (datetime): Час останньої зміни контакту (для Last-Modified).
         owner_id (int): Ідентифікатор власника контакту (зовнішній ключ).
         owner (User): Відношення до моделі користувача, який є власником контакту.
 
@@ -27,15 +57,51 @@ class Contact(Base):
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String, index=True)
     last_name = Column(String, index=True)
-    email = Column(String, unique=True, index=True)
-    phone = Column(String, unique=True, index=True)
+    email = Column(String)
+    phone = Column(String)
     birthday = Column(Date)
+    birthday_doy = Column(Integer)
     additional_info = Column(String, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, server_default=func.now())
     owner_id = Column(Integer, ForeignKey('users.id'))
     owner = relationship("User", back_populates="contacts")
 
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # Триграмні GIN індекси для пошуку підрядка (ILIKE '%запит%') на PostgreSQL та складені
+    # індекси з owner_id на початку: запити користувача читають лише діапазон його контактів
+    # (сторінки за id, курсорна пагінація за прізвищем та ім'ям, найближчі дні народження).
+    __table_args__ = tuple(
+        Index(
+            f"ix_contacts_{column}_trgm",
+            column,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql")
+        for column in ("first_name", "last_name", "email")
+    ) + (
+        Index("ix_contacts_owner_id_id", "owner_id", "id"),
+        # NULL в імені впорядковується як порожній рядок (див. crud.keyset_key).
+        Index(
+            "ix_contacts_owner_name_keyset",
+            owner_id, func.coalesce(last_name, ""), func.coalesce(first_name, ""), id,
+        ),
+        Index("ix_contacts_owner_birthday_doy", "owner_id", "birthday_doy"),
+        # Email і телефон унікальні в межах власника: різні користувачі можуть мати спільний контакт.
+        UniqueConstraint("owner_id", "email", name="uq_contacts_owner_email"),
+        UniqueConstraint("owner_id", "phone", name="uq_contacts_owner_phone"),
+    )
+
+    @validates("birthday")
+    def _sync_birthday_key(self, key, value):
+        self.birthday_doy = birthday_key(value)
+        return value
+
+
+event.listen(
+    Contact.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
 
 
 class User(Base):
@@ -46,6 +112,7 @@ class User(Base):
         id (int): Унікальний ідентифікатор користувача.
         email (str): Унікальний email користувача.
         hashed_password (str): Хешований пароль користувача.
+        avatar_url (str, optional): URL аватара користувача.
         contacts (List[Contact]): Список контактів, пов'язаних із користувачем.
 
     Методи:
@@ -68,6 +135,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
+    avatar_url = Column(String, nullable=True)
 
     contacts = relationship("Contact", back_populates="owner")
 
@@ -93,3 +161,66 @@ class User(Base):
 
         """
         self.hashed_password = pwd_context.hash(password)
+
+
+class OutboundEmail(Base):
+    """
+    Модель черги вихідних листів.
+
+    Лист записується в таблицю разом із транзакцією запиту і надсилається окремим
+    обробником (``contacts.mail_queue``), тому не губиться під час перезапуску застосунку.
+
+    Атрибути:
+        id (int): Унікальний ідентифікатор листа.
+        recipient (str): Адреса отримувача.
+        subject (str): Тема листа.
+        body (str): Текст листа.
+        subtype (str): Тип вмісту: "plain" або "html".
+        status (str): Стан доставки: "pending", "sending", "sent" або "failed".
+        attempts (int): Кількість спроб надсилання.
+        next_attempt_at (datetime): Час наступної спроби (для "sending" — кінець оренди обробником).
+        last_error (str, optional): Помилка останньої невдалої спроби.
+        created_at (datetime): Час постановки в чергу.
+        sent_at (datetime, optional): Час успішного надсилання.
+    """
+    __tablename__ = "outbound_emails"
+
+    id = Column(Integer, primary_key=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    subtype = Column(String, nullable=False, default="plain")
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbound_emails_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+
+class AvatarJob(Base):
+    """
+    Модель задачі обробки аватара.
+
+    Атрибути:
+        id (str): Ідентифікатор задачі (UUID).
+        user_id (int): Ідентифікатор користувача.
+        status (str): Стан задачі: "pending", "processing", "done" або "failed".
+        urls (dict, optional): URL зображень за розмірами, наприклад {"256": "...", "64": "..."}.
+        error (str, optional): Опис помилки обробки.
+        created_at (datetime): Час створення задачі.
+        updated_at (datetime): Час останньої зміни стану.
+    """
+    __tablename__ = "avatar_jobs"
+
+    id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(String, nullable=False, default="pending")
+    urls = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow)
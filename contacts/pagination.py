@@ -0,0 +1,53 @@
+"""
+Модуль для роботи з курсорами пагінації.
+
+Курсор — це непрозорий для клієнта рядок (base64url від JSON-масиву), який зберігає
+значення ключа сортування останнього елемента сторінки.
+"""
+import base64
+import binascii
+import json
+
+
+class InvalidCursorError(ValueError):
+    """
+    Помилка, що виникає, коли курсор пошкоджений або не відповідає запиту.
+    """
+
+
+def encode_cursor(*values) -> str:
+    """
+    Кодує значення ключа сортування у курсор.
+
+    Аргументи:
+        values: Значення ключа сортування останнього елемента сторінки.
+
+    Повертає:
+        str: Непрозорий курсор.
+    """
+    raw = json.dumps(list(values), separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    Розкодовує курсор у список значень ключа сортування.
+
+    Аргументи:
+        cursor (str): Курсор, отриманий від клієнта.
+        size (int): Очікувана кількість значень у курсорі.
+
+    Повертає:
+        list: Значення ключа сортування.
+
+    Порушення:
+        InvalidCursorError: Якщо курсор пошкоджений або має неочікувану довжину.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Invalid cursor")
+    return values
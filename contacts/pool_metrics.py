@@ -0,0 +1,173 @@
+"""
+Модуль для збору метрик пулу з'єднань бази даних.
+
+Пул з'єднань інструментується двома способами: підклас ``QueuePool`` вимірює час очікування
+видачі з'єднання (включно з тайм-аутами та з'єднаннями понад ``pool_size``), а події пулу
+SQLAlchemy рахують видачі, повернення, нові з'єднання та інвалідації.
+"""
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Верхні межі кошиків гістограми часу очікування з'єднання, у секундах
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class PoolMetrics:
+    """
+    Лічильники та гістограма часу очікування для одного пулу з'єднань.
+
+    Атрибути:
+        checkouts (int): Кількість виданих з'єднань.
+        checkins (int): Кількість повернених з'єднань.
+        connects (int): Кількість відкритих нових з'єднань з базою даних.
+        invalidations (int): Кількість інвалідованих з'єднань.
+        overflow_checkouts (int): Кількість видач, які перевищили pool_size.
+        timeouts (int): Кількість тайм-аутів очікування з'єднання.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+        self.wait_sum = 0.0
+        self.wait_count = 0
+
+    def observe_wait(self, seconds: float, overflow: bool = False):
+        """
+        Реєструє час очікування видачі з'єднання.
+
+        Аргументи:
+            seconds (float): Час очікування у секундах.
+            overflow (bool): Чи було видано з'єднання понад pool_size.
+        """
+        with self._lock:
+            self.wait_sum += seconds
+            self.wait_count += 1
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            if overflow:
+                self.overflow_checkouts += 1
+
+    def increment(self, name: str):
+        """
+        Збільшує лічильник на одиницю.
+
+        Аргументи:
+            name (str): Назва лічильника (checkouts, checkins, connects, invalidations, timeouts).
+        """
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self, pool=None) -> dict:
+        """
+        Повертає поточний стан метрик.
+
+        Аргументи:
+            pool (Pool, optional): Пул, з якого додатково зчитуються поточні розміри.
+
+        Повертає:
+            dict: Лічильники, гістограма очікування (накопичувальна) та стан пулу.
+        """
+        with self._lock:
+            cumulative, histogram = 0, {}
+            for bound, count in zip(WAIT_BUCKETS, self.wait_buckets):
+                cumulative += count
+                histogram["+Inf" if bound == float("inf") else str(bound)] = cumulative
+            data = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds": {"count": self.wait_count, "sum": self.wait_sum, "buckets": histogram},
+            }
+        if pool is not None:
+            data["pool"] = {"class": type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                data["pool"].update(
+                    size=pool.size(),
+                    checked_in=pool.checkedin(),
+                    checked_out=pool.checkedout(),
+                    overflow=pool.overflow(),
+                )
+        return data
+
+
+class _InstrumentedPoolMixin:
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.increment("timeouts")
+            raise
+        if self.metrics is not None:
+            self.metrics.observe_wait(time.perf_counter() - start, overflow=self.checkedout() > self.size())
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """
+    ``QueuePool``, що вимірює час очікування видачі з'єднання.
+    """
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """
+    ``AsyncAdaptedQueuePool``, що вимірює час очікування видачі з'єднання.
+    """
+
+
+def instrument_engine(engine) -> PoolMetrics:
+    """
+    Підключає збір метрик до пулу з'єднань рушія.
+
+    Аргументи:
+        engine (Engine): Синхронний рушій (для AsyncEngine передається ``sync_engine``).
+
+    Повертає:
+        PoolMetrics: Об'єкт метрик, прив'язаний до пулу рушія.
+    """
+    metrics = PoolMetrics()
+    engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.increment("checkins")
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.increment("connects")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment("invalidations")
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment("invalidations")
+
+    return metrics
@@ -0,0 +1,133 @@
+"""
+Сховище лічильників обмеження частоти запитів у файлі SQLite.
+
+Для розгортання на одному сервері з кількома процесами uvicorn: усі процеси бачать спільні
+лічильники (на відміну від ``memory://``), а лічильники переживають перезапуск застосунку.
+Сховище реєструється в ``limits`` за схемою ``sqlite``, наприклад
+``RATE_LIMIT_STORAGE_URI=sqlite:///./ratelimit.db``, і підтримує стратегії fixed-window,
+fixed-window-elastic-expiry та moving-window.
+"""
+import sqlite3
+import time
+
+from limits.storage import MovingWindowSupport, Storage
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """
+    Сховище лімітів у базі SQLite.
+
+    Атрибути:
+        path (str): Шлях до файлу бази (``:memory:`` для бази в пам'яті процесу).
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str = "sqlite://", wrap_exceptions: bool = False, timeout: float = 5.0, **options):
+        # Як у SQLAlchemy: sqlite:///відносний.db, sqlite:////абсолютний.db, sqlite:// — пам'ять.
+        self.path = uri.split("://", 1)[1][1:] or ":memory:"
+        self._connection = sqlite3.connect(
+            self.path, timeout=float(timeout), isolation_level=None, check_same_thread=False
+        )
+        self._connection.executescript(
+            "CREATE TABLE IF NOT EXISTS ratelimit_counters (key TEXT PRIMARY KEY, value INTEGER, expiry REAL);"
+            "CREATE TABLE IF NOT EXISTS ratelimit_events (key TEXT, atime REAL);"
+            "CREATE INDEX IF NOT EXISTS ix_ratelimit_events_key ON ratelimit_events (key, atime);"
+        )
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE блокує запис для інших процесів до COMMIT, тож читання й запис атомарні.
+        self._connection.execute("BEGIN IMMEDIATE")
+
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        now = time.time()
+        with self.lock:
+            self._transaction()
+            try:
+                row = self._connection.execute(
+                    "SELECT value, expiry FROM ratelimit_counters WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or row[1] <= now:
+                    value, expires_at = amount, now + expiry
+                else:
+                    value = row[0] + amount
+                    expires_at = now + expiry if elastic_expiry else row[1]
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO ratelimit_counters (key, value, expiry) VALUES (?, ?, ?)",
+                    (key, value, expires_at),
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return value
+
+    def get(self, key: str) -> int:
+        with self.lock:
+            row = self._connection.execute(
+                "SELECT value FROM ratelimit_counters WHERE key = ? AND expiry > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> int:
+        with self.lock:
+            row = self._connection.execute(
+                "SELECT expiry FROM ratelimit_counters WHERE key = ?", (key,)
+            ).fetchone()
+        return int(row[0] if row else time.time())
+
+    def check(self) -> bool:
+        try:
+            with self.lock:
+                self._connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        with self.lock:
+            cleared = self._connection.execute("DELETE FROM ratelimit_counters").rowcount
+            cleared += self._connection.execute("DELETE FROM ratelimit_events").rowcount
+        return cleared
+
+    def clear(self, key: str) -> None:
+        with self.lock:
+            self._connection.execute("DELETE FROM ratelimit_counters WHERE key = ?", (key,))
+            self._connection.execute("DELETE FROM ratelimit_events WHERE key = ?", (key,))
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        with self.lock:
+            self._transaction()
+            try:
+                self._connection.execute(
+                    "DELETE FROM ratelimit_events WHERE key = ? AND atime <= ?", (key, now - expiry)
+                )
+                (acquired,) = self._connection.execute(
+                    "SELECT COUNT(*) FROM ratelimit_events WHERE key = ?", (key,)
+                ).fetchone()
+                allowed = acquired + amount <= limit
+                if allowed:
+                    self._connection.executemany(
+                        "INSERT INTO ratelimit_events (key, atime) VALUES (?, ?)", [(key, now)] * amount
+                    )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return allowed
+
+    def get_moving_window(self, key: str, limit: int, expiry: int):
+        now = time.time()
+        with self.lock:
+            oldest, acquired = self._connection.execute(
+                "SELECT MIN(atime), COUNT(*) FROM ratelimit_events WHERE key = ? AND atime > ?", (key, now - expiry)
+            ).fetchone()
+        return int(oldest if oldest is not None else now), acquired
@@ -3,47 +3,36 @@
 
 Цей модуль містить API маршрути для реєстрації користувачів, підтвердження їх електронної пошти, автентифікації через токени та завантаження аватарів користувачів.
 """
+import os
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from contacts.models import User
-from contacts.utils import create_access_token, verify_password, hash_password
-from contacts.database import SessionLocal, get_db
-from fastapi import BackgroundTasks
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from contacts import avatars
+from contacts.limiter import limiter
+from contacts.models import AvatarJob, User
+from contacts.utils import (
+    create_access_token,
+    create_refresh_token,
+    decode_refresh_token,
+    get_current_user,
+    hash_password_async,
+    revoke_token,
+    verify_password_async,
+)
+from contacts.database import SessionLocal, get_db, get_session_factory
+from contacts.mail_queue import enqueue_email
 from pydantic import BaseModel
-import cloudinary
-import cloudinary.uploader
 from fastapi import File, UploadFile
-from dotenv import load_dotenv
-import os
+from jose import JWTError
 
 # Ініціалізація роутера
 router = APIRouter()
 
-# Завантаження конфігурацій з файлу .env
-load_dotenv()
-
-# Налаштування поштового сервера
-conf = ConnectionConfig(
-    MAIL_USERNAME="your_email@example.com",
-    MAIL_PASSWORD="your_password",
-    MAIL_FROM="your_email@example.com",
-    MAIL_PORT=587,
-    MAIL_SERVER="smtp.gmail.com",
-    MAIL_FROM_NAME="Your App",
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True
-)
-
-# Налаштування Cloudinary для завантаження аватарів
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_NAME"),
-    api_key=os.getenv("CLOUDINARY_URL"),
-    api_secret=os.getenv("SECRET_KEY")
-)
+# Запит користувача за email (вхід і реєстрація) будується один раз.
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
 
 # Схема для електронної пошти
 class EmailSchema(BaseModel):
@@ -51,33 +40,34 @@ class EmailSchema(BaseModel):
 
 # Маршрут для відправки листа для підтвердження електронної пошти
 @router.post("/send-verification-email")
-async def send_verification_email(background_tasks: BackgroundTasks, email: EmailSchema):
+async def send_verification_email(email: EmailSchema, db: Session = Depends(get_db)):
     """
-    Відправляє листа для підтвердження електронної пошти користувача.
+    Ставить у чергу лист для підтвердження електронної пошти користувача.
+
+    Лист записується в таблицю вихідних листів і надсилається обробником черги
+    (``python -m contacts.mail_queue``), тож не губиться під час перезапуску застосунку.
 
     Аргументи:
-        background_tasks (BackgroundTasks): Завдання для фонової обробки.
         email (EmailSchema): Електронна пошта користувача.
+        db (Session): Сесія бази даних.
 
     Повертає:
-        dict: Повідомлення про успішну відправку листа.
+        dict: Повідомлення про постановку листа в чергу.
     """
-    user = await User.objects.get_or_none(email=email.email)
+    user = await run_in_threadpool(get_user_by_email, db, email.email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     verification_link = f"http://localhost:8000/verify-email/{user.id}"
 
-    message = MessageSchema(
-        subject="Verify your email",
-        recipients=[email.email],
-        body=f"Click the link to verify your email: {verification_link}",
-        subtype="plain"
+    await run_in_threadpool(
+        enqueue_email,
+        db,
+        email.email,
+        "Verify your email",
+        f"Click the link to verify your email: {verification_link}",
     )
-
-    fm = FastMail(conf)
-    background_tasks.add_task(fm.send_message, message)
-    return {"message": "Verification email sent"}
+    return {"message": "Verification email queued"}
 
 # Маршрут для підтвердження електронної пошти користувача
 @router.get("/verify-email/{user_id}")
@@ -103,12 +93,52 @@ class RegisterRequest(BaseModel):
     email: str
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class RevokeRequest(BaseModel):
+    token: str
+
+def get_user_by_email(db: Session, email: str):
+    """
+    Отримує користувача за email.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        email (str): Email користувача.
+
+    Повертає:
+        User: Об'єкт користувача або None, якщо користувача не знайдено.
+    """
+    return db.execute(USER_BY_EMAIL, {"email": email}).scalar_one_or_none()
+
+
+def save_user(db: Session, user: User):
+    """
+    Зберігає користувача в базі даних.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        user (User): Об'єкт користувача.
+
+    Повертає:
+        User: Збережений об'єкт користувача.
+    """
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
 # Маршрут для реєстрації нового користувача
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     """
         Реєструє нового користувача.
 
+        Хешування пароля виконується в пулі процесів, а запити до бази даних — у пулі потоків,
+        тому ендпоінт не блокує цикл подій.
+
         Аргументи:
             request (RegisterRequest): Дані для реєстрації.
             db (Session): Сесія бази даних.
@@ -116,21 +146,18 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
         Повертає:
             dict: Дані зареєстрованого користувача (email, id).
         """
-    print(request.dict())  # Виведе вміст запиту
-    db_user = db.query(User).filter(request.email == User.email).first()
+    db_user = await run_in_threadpool(get_user_by_email, db, request.email)
     if db_user:
         raise HTTPException(status_code=409, detail="User already exists")
-    user = User(email=request.email, hashed_password=hash_password(request.password))
+    user = User(email=request.email, hashed_password=await hash_password_async(request.password))
 
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    user = await run_in_threadpool(save_user, db, user)
     return {"email": user.email, "id": user.id}
 
 
 # Маршрут для отримання токена доступу
 @router.post("/token", status_code=status.HTTP_201_CREATED)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """
     Отримує токен доступу для користувача.
 
@@ -139,36 +166,148 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
         db (Session): Сесія бази даних.
 
     Повертає:
-        dict: Токен доступу та тип токена.
+        dict: Токен доступу, токен оновлення та тип токена.
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if user is None or not verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(get_user_by_email, db, form_data.username)
+    if user is None or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=401,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.id})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {
+        "access_token": create_access_token(data={"sub": str(user.id)}),
+        "refresh_token": create_refresh_token(user.id),
+        "token_type": "bearer",
+    }
+
+
+# Маршрут для оновлення токена доступу
+@router.post("/refresh", status_code=status.HTTP_201_CREATED)
+@limiter.limit("10/minute")
+async def refresh_access_token(request: Request, body: RefreshRequest):
+    """
+    Обмінює токен оновлення на нову пару токенів.
+
+    Перевіряються лише підпис токена та список відкликаних токенів, без запитів до бази даних
+    і хешування пароля. Використаний токен оновлення відкликається (ротація), тож повторно
+    обміняти його не можна.
+
+    Аргументи:
+        request (Request): Запит від клієнта.
+        body (RefreshRequest): Токен оновлення.
+
+    Повертає:
+        dict: Новий токен доступу, новий токен оновлення та тип токена.
+
+    Порушення:
+        HTTPException: 401, якщо токен оновлення недійсний, прострочений або відкликаний.
+        RevocationListFullError: Якщо список відкликаних токенів заповнений (503).
+    """
+    try:
+        payload = decode_refresh_token(body.refresh_token)
+    except JWTError:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    revoke_token(body.refresh_token)
+    return {
+        "access_token": create_access_token(data={"sub": payload["sub"]}),
+        "refresh_token": create_refresh_token(payload["sub"]),
+        "token_type": "bearer",
+    }
+
+
+# Маршрут для відкликання токена (вихід із системи)
+@router.post("/revoke")
+@limiter.limit("10/minute")
+async def revoke(request: Request, body: RevokeRequest, current_user: User = Depends(get_current_user)):
+    """
+    Відкликає токен доступу або оновлення поточного користувача.
+
+    Як і в RFC 7009, недійсний токен не вважається помилкою; токени інших користувачів
+    не відкликаються.
+
+    Аргументи:
+        request (Request): Запит від клієнта.
+        body (RevokeRequest): Токен, що відкликається.
+        current_user (User): Поточний користувач.
+
+    Повертає:
+        dict: Повідомлення про відкликання токена.
+
+    Порушення:
+        RevocationListFullError: Якщо список відкликаних токенів заповнений (503).
+    """
+    revoke_token(body.token, subject=current_user.id)
+    return {"message": "Token revoked"}
 
 # Маршрут для завантаження аватара користувача
-@router.post("/upload-avatar")
-async def upload_avatar(user_id: int, file: UploadFile = File(...)):
+@router.post("/upload-avatar", status_code=status.HTTP_202_ACCEPTED)
+async def upload_avatar(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    current_user: User = Depends(get_current_user),
+):
     """
-    Завантажує новий аватар для користувача.
+    Приймає новий аватар поточного користувача на обробку.
+
+    Файл частинами записується у тимчасовий файл, а масштабування та збереження у сховище
+    виконуються у фоні, тому ендпоінт одразу повертає ідентифікатор задачі. Стан задачі
+    доступний за маршрутом ``/avatar-jobs/{job_id}``.
 
     Аргументи:
-        user_id (int): Ідентифікатор користувача.
+        background_tasks (BackgroundTasks): Фонові задачі запиту.
         file (UploadFile): Аватар у вигляді файлу.
+        session_factory (sessionmaker): Фабрика сесій для фонової обробки.
+        current_user (User): Поточний користувач.
 
     Повертає:
-        dict: Повідомлення про успішне оновлення аватара та URL нового аватара.
+        dict: Ідентифікатор і стан задачі обробки аватара.
+
+    Порушення:
+        HTTPException: 413, якщо файл завеликий; 415, якщо файл не є зображенням.
     """
-    user = await User.objects.get_or_none(id=user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=415, detail="Avatar must be an image")
 
-    upload_result = cloudinary.uploader.upload(file.file)
-    user.avatar_url = upload_result['url']
-    await user.save()
-    return {"message": "Avatar updated successfully", "avatar_url": user.avatar_url}
+    try:
+        path = await avatars.spool_upload(file)
+    except avatars.AvatarTooLargeError as error:
+        raise HTTPException(status_code=413, detail=str(error))
+
+    try:
+        job_id = await run_in_threadpool(avatars.avatar_pipeline.create_job, session_factory, current_user.id)
+    except BaseException:
+        os.unlink(path)
+        raise
+    background_tasks.add_task(avatars.avatar_pipeline.process, session_factory, job_id, current_user.id, path)
+    return {"job_id": job_id, "status": "pending"}
+
+
+# Маршрут для отримання стану обробки аватара
+@router.get("/avatar-jobs/{job_id}")
+async def get_avatar_job(
+    job_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+):
+    """
+    Повертає стан задачі обробки аватара поточного користувача.
+
+    Аргументи:
+        job_id (str): Ідентифікатор задачі.
+        db (Session): Сесія бази даних.
+        current_user (User): Поточний користувач.
+
+    Повертає:
+        dict: Стан задачі, URL мініатюр за розмірами та текст помилки.
+
+    Порушення:
+        HTTPException: 404, якщо задачі не знайдено або вона належить іншому користувачу.
+    """
+    job = await run_in_threadpool(db.get, AvatarJob, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Avatar job not found")
+    return {"job_id": job.id, "status": job.status, "urls": job.urls, "error": job.error}
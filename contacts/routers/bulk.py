@@ -0,0 +1,126 @@
+"""
+Роутер для масових операцій із контактами.
+"""
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from contacts import crud
+from contacts import exporter
+from contacts import importer
+from contacts import schemas
+from contacts.database import get_db, get_session_factory
+from contacts.models import User
+from contacts.utils import get_current_user
+
+router = APIRouter()
+
+
+@router.post("/contacts/import", response_model=schemas.ImportReport)
+def import_contacts(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Імпортує контакти з файлу CSV (з рядком заголовків) або NDJSON.
+
+    Файл обробляється потоково: рядки валідуються і записуються пакетами, а рядки з уже
+    наявним email або телефоном пропускаються. Контакти створюються для поточного користувача.
+
+    Аргументи:
+        file (UploadFile): Файл із контактами.
+        format (str, optional): Формат файлу; якщо не вказано, визначається за ім'ям або типом файлу.
+        db (Session): Сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
+
+    Повертає:
+        schemas.ImportReport: Звіт про імпорт з помилками за рядками.
+    """
+    fmt = format or importer.detect_format(file.filename, file.content_type)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Unsupported import format")
+    return importer.import_contacts(db, file.file, fmt, owner_id=current_user.id)
+
+
+@router.get("/contacts/export")
+def export_contacts(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    session_factory: sessionmaker = Depends(get_session_factory),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Експортує всі контакти поточного користувача потоково у форматі NDJSON або CSV.
+
+    Аргументи:
+        format (str): Формат експорту: "ndjson" або "csv".
+        gzip (bool): Чи стискати відповідь gzip на льоту (заголовок Content-Encoding: gzip).
+        session_factory (sessionmaker): Фабрика сесій бази даних.
+        current_user (User): Поточний користувач, власник контактів.
+
+    Повертає:
+        StreamingResponse: Потокова відповідь із контактами.
+    """
+    batches = exporter.iter_batches(session_factory, owner_id=current_user.id)
+    if format == "csv":
+        chunks, media_type = exporter.csv_chunks(batches), "text/csv"
+    else:
+        chunks, media_type = exporter.ndjson_chunks(batches), "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="contacts.{format}"'}
+    if gzip:
+        chunks = exporter.gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+@router.post("/contacts/bulk-update", response_model=list[schemas.ContactResponse])
+def bulk_update_contacts(
+    request: schemas.ContactBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Оновлює групу контактів одним запитом UPDATE на кожну тисячу id.
+
+    Контакти інших користувачів пропускаються.
+
+    Аргументи:
+        request (schemas.ContactBulkUpdate): Ідентифікатори контактів та поля для оновлення.
+        db (Session): Сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
+
+    Повертає:
+        list[schemas.ContactResponse]: Оновлені контакти.
+    """
+    try:
+        return crud.bulk_update_contacts(db, request.ids, request.changes, owner_id=current_user.id)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Email or phone already exists")
+
+
+@router.post("/contacts/bulk-delete", response_model=list[schemas.ContactResponse])
+def bulk_delete_contacts(
+    request: schemas.ContactBulkDelete,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Видаляє групу контактів одним запитом DELETE на кожну тисячу id.
+
+    Контакти інших користувачів пропускаються.
+
+    Аргументи:
+        request (schemas.ContactBulkDelete): Ідентифікатори контактів.
+        db (Session): Сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
+
+    Повертає:
+        list[schemas.ContactResponse]: Видалені контакти.
+    """
+    return crud.bulk_delete_contacts(db, request.ids, owner_id=current_user.id)
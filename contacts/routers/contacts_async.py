@@ -0,0 +1,236 @@
+"""
+Асинхронні ендпоінти контактів.
+
+Роутер дублює ендпоінти з ``contacts.main``, але працює з ``AsyncSession`` (asyncpg/aiosqlite),
+тому запит, що очікує відповіді бази даних, не займає потік із пулу потоків. Підключається
+замість синхронних ендпоінтів, якщо встановлено змінну середовища ``SQLALCHEMY_ASYNC=1``.
+Усі ендпоінти працюють лише з контактами поточного користувача.
+"""
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from contacts import async_crud
+from contacts import conditional
+from contacts import schemas
+from contacts import serialization
+from contacts.database import get_async_db
+from contacts.limiter import limiter
+from contacts.models import User
+from contacts.pagination import InvalidCursorError
+from contacts.utils import get_current_user_async
+
+router = APIRouter()
+
+
+@router.post("/contacts/", response_model=schemas.ContactResponse, status_code=status.HTTP_201_CREATED)
+@limiter.limit("5/minute")
+async def create_contact(
+    request: Request,
+    contact: schemas.ContactCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Створює новий контакт.
+
+    Аргументи:
+        request (Request): Запит від клієнта.
+        contact (schemas.ContactCreate): Дані нового контакту.
+        db (AsyncSession): Асинхронна сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
+
+    Повертає:
+        schemas.ContactResponse: Створений контакт.
+
+    Порушення:
+        HTTPException: 409, якщо контакт з таким email або телефоном уже є у користувача.
+    """
+    try:
+        return await async_crud.create_contact(db, contact, owner_id=current_user.id)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Email or phone already exists")
+
+
+@router.get("/contacts/{contact_id}", response_model=schemas.ContactResponse)
+async def read_contact(
+    request: Request,
+    contact_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Повертає контакт за його ID.
+
+    Відповідь містить заголовки ETag та Last-Modified; якщо ETag збігається з ``If-None-Match``,
+    повертається 304 без тіла.
+
+    Аргументи:
+        request (Request): Запит від клієнта.
+        contact_id (int): Ідентифікатор контакту.
+        db (AsyncSession): Асинхронна сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
+
+    Повертає:
+        schemas.ContactResponse: Контакт з відповідним ID.
+    """
+    entry = await async_crud.get_contact_cached(db, contact_id, owner_id=current_user.id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return conditional.conditional_response(request, entry)
+
+
+@router.put("/contacts/{contact_id}", response_model=schemas.ContactResponse)
+async def update_contact(
+    contact_id: int,
+    contact: schemas.ContactUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Оновлює контакт за його ID.
+
+    Аргументи:
+        contact_id (int): Ідентифікатор контакту.
+        contact (schemas.ContactUpdate): Дані для оновлення контакту.
+        db (AsyncSession): Асинхронна сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
+
+    Повертає:
+        schemas.ContactResponse: Оновлений контакт.
+
+    Порушення:
+        HTTPException: 409, якщо контакт з таким email або телефоном уже є у користувача.
+    """
+    try:
+        db_contact = await async_crud.update_contact(db, contact_id, contact, owner_id=current_user.id)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Email or phone already exists")
+    if db_contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return db_contact
+
+
+@router.delete("/contacts/{contact_id}", response_model=schemas.ContactResponse)
+async def delete_contact(
+    contact_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Видаляє контакт за його ID.
+
+    Аргументи:
+        contact_id (int): Ідентифікатор контакту.
+        db (AsyncSession): Асинхронна сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
+
+    Повертає:
+        schemas.ContactResponse: Видалений контакт.
+    """
+    db_contact = await async_crud.delete_contact(db, contact_id, owner_id=current_user.id)
+    if db_contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return db_contact
+
+
+@router.get("/contacts/", response_model=list[schemas.ContactResponse])
+async def read_contacts(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    after: Optional[str] = None,
+    order: Literal["id", "name"] = "id",
+    fields: tuple = Depends(serialization.response_fields),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Повертає список контактів з пагінацією skip/limit або за курсором ``after``.
+
+    Сторінки skip/limit мають заголовок ETag і відповідь 304 на ``If-None-Match``.
+
+    Аргументи:
+        request (Request): Запит від клієнта.
+        skip (int): Кількість пропущених елементів.
+        limit (int): Максимальна кількість елементів (від 1 до 100).
+        after (str, optional): Курсор останнього елемента попередньої сторінки.
+        order (str): Порядок курсорного обходу: "id" або "name".
+        fields (tuple[str, ...]): Поля відповіді з параметра ``fields`` (за замовчуванням усі).
+        db (AsyncSession): Асинхронна сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
+
+    Повертає:
+        list[schemas.ContactResponse]: Список контактів.
+    """
+    if after is None:
+        return conditional.conditional_response(request, await async_crud.get_contacts_cached(
+            db, skip=skip, limit=limit, fields=fields, owner_id=current_user.id
+        ))
+    try:
+        contacts, next_cursor = await async_crud.get_contacts_after(
+            db, after=after, limit=limit, order=order, fields=fields, owner_id=current_user.id
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return serialization.json_response(serialization.objects_to_json(contacts, fields), headers)
+
+
+@router.get("/contacts/search/", response_model=list[schemas.ContactResponse])
+async def search_contacts(
+    query: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: tuple = Depends(serialization.response_fields),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Пошук контактів за запитом (ім'я, прізвище або email).
+
+    Аргументи:
+        query (str): Пошуковий запит.
+        limit (int): Максимальна кількість результатів (від 1 до 100).
+        cursor (str, optional): Курсор наступної сторінки.
+        fields (tuple[str, ...]): Поля відповіді з параметра ``fields`` (за замовчуванням усі).
+        db (AsyncSession): Асинхронна сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
+
+    Повертає:
+        list[schemas.ContactResponse]: Список знайдених контактів.
+    """
+    try:
+        contacts, next_cursor = await async_crud.search_contacts(
+            db, query, limit=limit, cursor=cursor, fields=fields, owner_id=current_user.id
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return serialization.json_response(serialization.objects_to_json(contacts, fields), headers)
+
+
+@router.get("/contacts/upcoming_birthdays/", response_model=list[schemas.ContactResponse])
+async def upcoming_birthdays(
+    days: int = Query(7, ge=0, le=366),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Повертає контакти з найближчими днями народження.
+
+    Аргументи:
+        days (int): Кількість днів наперед (від 0 до 366).
+        db (AsyncSession): Асинхронна сесія бази даних.
+        current_user (User): Поточний користувач, власник контактів.
+
+    Повертає:
+        list[schemas.ContactResponse]: Список контактів з днями народження в межах указаного періоду.
+    """
+    return serialization.json_response(serialization.objects_to_json(
+        await async_crud.get_upcoming_birthdays(db, days=days, owner_id=current_user.id)
+    ))
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from contacts.cache import contact_cache
 from contacts.models import Contact, User
 from contacts.database import SessionLocal, get_db
 from contacts.utils import get_current_user
@@ -9,14 +11,18 @@ router = APIRouter()
 
 
 @router.post("/contacts", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
-def create_contact(contact: ContactCreate, db: Session = Depends(get_db)):
-    db_contact = db.query(Contact).filter(Contact.email == contact.email).first()
-    if db_contact:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already exists")
-    new_contact = Contact(**contact.dict())
+def create_contact(
+    contact: ContactCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+):
+    new_contact = Contact(**contact.dict(), owner_id=current_user.id)
     db.add(new_contact)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email or phone already exists")
     db.refresh(new_contact)
+    contact_cache.invalidate_contacts(owner_id=current_user.id)
     return new_contact
 
 
@@ -0,0 +1,51 @@
+"""
+Роутер зі службовими ендпоінтами для моніторингу стану застосунку.
+"""
+from fastapi import APIRouter
+
+from contacts import database
+from contacts.cache import contact_cache
+from contacts.config import get_settings
+from contacts.limiter import limiter
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/pool")
+def pool_status():
+    """
+    Повертає метрики пулів з'єднань бази даних.
+
+    Повертає:
+        dict: Метрики синхронного пулу та, якщо увімкнено, асинхронного пулу (видачі, повернення,
+        нові з'єднання, інвалідації, видачі понад pool_size, тайм-аути та гістограма часу очікування).
+    """
+    # Рушій (і разом з ним pool_metrics) створюється під час першого звернення.
+    engine = database.get_engine()
+    result = {"sync": database.pool_metrics.snapshot(engine.pool)}
+    if get_settings().db_async:
+        pool = database.get_async_engine().sync_engine.pool
+        result["async"] = database.async_pool_metrics.snapshot(pool)
+    return result
+
+
+@router.get("/cache")
+def cache_status():
+    """
+    Повертає лічильники кешу контактів.
+
+    Повертає:
+        dict: Тип сховища кешу, кількість влучань і промахів.
+    """
+    return contact_cache.stats()
+
+
+@router.get("/rate-limit")
+def rate_limit_status():
+    """
+    Повертає стан обмежувача частоти запитів.
+
+    Повертає:
+        dict: Стратегія, сховище лічильників та кількість дозволених і відхилених запитів за лімітами.
+    """
+    return limiter.snapshot()
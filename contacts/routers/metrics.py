@@ -0,0 +1,22 @@
+"""
+Роутер з метриками застосунку у форматі Prometheus.
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from contacts.metrics import render_prometheus
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    """
+    Повертає метрики застосунку у текстовому форматі Prometheus.
+
+    Повертає:
+        PlainTextResponse: Гістограми часу відповіді, кількості та часу запитів до бази даних
+        за маршрутами, журнал повільних запитів, метрики пулів з'єднань, кешу контактів
+        і обмежувача частоти запитів.
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -3,9 +3,9 @@
 
 Цей модуль містить Pydantic моделі, які забезпечують валідацію вхідних та вихідних даних для операцій із контактами.
 """
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 
 class ContactBase(BaseModel):
@@ -61,6 +61,27 @@ class ContactUpdate(BaseModel):
     additional_info: Optional[str] = None
 
 
+class ContactBulkDelete(BaseModel):
+    """
+    Модель запиту на масове видалення контактів.
+
+    Атрибути:
+        ids (List[int]): Ідентифікатори контактів (від 1 до 10000).
+    """
+    ids: List[int] = Field(min_length=1, max_length=10000)
+
+
+class ContactBulkUpdate(ContactBulkDelete):
+    """
+    Модель запиту на масове оновлення контактів.
+
+    Атрибути:
+        ids (List[int]): Ідентифікатори контактів (від 1 до 10000).
+        changes (ContactUpdate): Поля, що встановлюються всім вибраним контактам.
+    """
+    changes: ContactUpdate
+
+
 class ContactResponse(ContactBase):
     """
     Модель для відповіді при запитах на інформацію про контакт.
@@ -77,3 +98,35 @@ class ContactResponse(ContactBase):
         Налаштування моделі для коректного перетворення даних із атрибутів SQLAlchemy моделі.
         """
         from_attributes = True
+
+
+class ImportRowError(BaseModel):
+    """
+    Помилка імпорту одного рядка файлу.
+
+    Атрибути:
+        row (int): Номер рядка у файлі.
+        errors (List[str]): Опис помилок рядка.
+    """
+    row: int
+    errors: List[str]
+
+
+class ImportReport(BaseModel):
+    """
+    Звіт про масовий імпорт контактів.
+
+    Атрибути:
+        total (int): Кількість оброблених рядків.
+        inserted (int): Кількість створених контактів.
+        duplicates (int): Кількість рядків, пропущених через наявний email або телефон.
+        failed (int): Кількість рядків, що не пройшли валідацію.
+        errors (List[ImportRowError]): Помилки окремих рядків (не більше обмеження звіту).
+        errors_truncated (bool): Чи був список помилок обрізаний.
+    """
+    total: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
@@ -0,0 +1,367 @@
+"""
+Модуль повнотекстового пошуку контактів.
+
+На PostgreSQL пошук використовує GIN індекси pg_trgm (див. міграцію ``3f1c9a7d2b10``), тому
+``ILIKE '%запит%'`` не сканує всю таблицю, а результати ранжуються функцією ``similarity``.
+
+На інших СУБД (SQLite у тестах та розробці) використовується інвертований індекс n-грам,
+який будується в пам'яті процесу під час першого пошуку та оновлюється подіями ORM після
+фіксації транзакції. Індекс бачить лише зміни свого процесу, зроблені через ORM або масові
+операції ``crud``, тому він лише звужує вибірку: кандидати перевіряються в базі даних, а якщо
+індекс не знайшов жодного контакту, виконується сканування ``ILIKE``, і знайдені контакти
+додаються до індексу. Цей режим призначено для одного процесу (тести, розробка); для кількох
+процесів застосунку використовується PostgreSQL.
+"""
+import threading
+from collections import defaultdict
+
+from sqlalchemy import Float, and_, cast, event, func, literal, or_, select
+from sqlalchemy.orm import Session, load_only, object_session
+
+from contacts import models
+from contacts.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+NGRAM_SIZE = 3
+SEARCH_FIELDS = ("first_name", "last_name", "email")
+
+
+def _normalize(text) -> str:
+    return (text or "").lower()
+
+
+def _ngrams(text: str, n: int = NGRAM_SIZE) -> set:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def similarity(query: str, text: str) -> float:
+    """
+    Обчислює схожість двох рядків за триграмами (аналог ``similarity`` з pg_trgm).
+
+    Аргументи:
+        query (str): Пошуковий запит.
+        text (str): Значення поля контакту.
+
+    Повертає:
+        float: Коефіцієнт Жаккара множин триграм від 0 до 1.
+    """
+    a = _ngrams(f"  {_normalize(query)} ")
+    b = _ngrams(f"  {_normalize(text)} ")
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class NgramIndex:
+    """
+    Інвертований індекс n-грам для пошуку підрядка в полях контактів.
+
+    Атрибути:
+        n (int): Довжина n-грами.
+    """
+
+    def __init__(self, n: int = NGRAM_SIZE):
+        self.n = n
+        self._postings = defaultdict(set)
+        self._docs = {}
+        self._owners = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc_id: int, fields, owner_id: int = None):
+        """
+        Додає або оновлює документ в індексі.
+
+        Аргументи:
+            doc_id (int): Ідентифікатор контакту.
+            fields (Iterable[str]): Значення полів, за якими ведеться пошук.
+            owner_id (int, optional): Ідентифікатор власника контакту.
+        """
+        values = tuple(_normalize(value) for value in fields)
+        with self._lock:
+            self._remove(doc_id)
+            self._docs[doc_id] = values
+            self._owners[doc_id] = owner_id
+            for value in values:
+                for gram in _ngrams(value, self.n):
+                    self._postings[gram].add(doc_id)
+
+    def remove(self, doc_id: int):
+        """
+        Видаляє документ з індексу.
+
+        Аргументи:
+            doc_id (int): Ідентифікатор контакту.
+        """
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: int):
+        values = self._docs.pop(doc_id, None)
+        if values is None:
+            return
+        self._owners.pop(doc_id, None)
+        for value in values:
+            for gram in _ngrams(value, self.n):
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(doc_id)
+                    if not postings:
+                        del self._postings[gram]
+
+    def search(self, query: str, owner_id: int = None) -> list:
+        """
+        Шукає документи, що містять запит як підрядок хоча б в одному полі.
+
+        Аргументи:
+            query (str): Пошуковий запит.
+            owner_id (int, optional): Ідентифікатор власника; документи інших власників пропускаються.
+
+        Повертає:
+            list[tuple[float, int]]: Пари (оцінка, id), відсортовані за спаданням оцінки та зростанням id.
+        """
+        needle = _normalize(query)
+        grams = _ngrams(needle, self.n)
+        with self._lock:
+            if grams:
+                candidates = set.intersection(*(self._postings.get(gram, set()) for gram in grams))
+            else:
+                candidates = set(self._docs)
+            ranked = []
+            for doc_id in candidates:
+                if owner_id is not None and self._owners[doc_id] != owner_id:
+                    continue
+                values = self._docs[doc_id]
+                if any(needle in value for value in values):
+                    score = max(similarity(needle, value) for value in values)
+                    ranked.append((score, doc_id))
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        return ranked
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _index_key(engine) -> str:
+    # Синхронний та асинхронний драйвери однієї бази використовують спільний індекс.
+    url = engine.url
+    return url.set(drivername=url.get_backend_name()).render_as_string(hide_password=True)
+
+
+def _get_index(db: Session) -> NgramIndex:
+    engine = db.get_bind()
+    key = _index_key(engine)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = NgramIndex()
+            columns = (models.Contact.id, models.Contact.owner_id, *(getattr(models.Contact, f) for f in SEARCH_FIELDS))
+            for contact_id, owner_id, *fields in db.execute(select(*columns)):
+                index.add(contact_id, fields, owner_id)
+            _indexes[key] = index
+    return index
+
+
+def reset_indexes():
+    """
+    Скидає всі побудовані індекси n-грам (наприклад, після перестворення таблиць у тестах).
+    """
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def index_contact(engine, contact_id: int, fields, owner_id: int = None):
+    """
+    Оновлює запис контакту в індексі n-грам, якщо індекс для цієї бази вже побудовано.
+
+    Аргументи:
+        engine (Engine): Рушій бази даних, у якій змінено контакт.
+        contact_id (int): Ідентифікатор контакту.
+        fields (Iterable[str]): Значення полів first_name, last_name, email.
+        owner_id (int, optional): Ідентифікатор власника контакту.
+    """
+    index = _indexes.get(_index_key(engine))
+    if index is not None:
+        index.add(contact_id, fields, owner_id)
+
+
+def unindex_contact(engine, contact_id: int):
+    """
+    Видаляє контакт з індексу n-грам, якщо індекс для цієї бази вже побудовано.
+
+    Аргументи:
+        engine (Engine): Рушій бази даних, у якій видалено контакт.
+        contact_id (int): Ідентифікатор контакту.
+    """
+    index = _indexes.get(_index_key(engine))
+    if index is not None:
+        index.remove(contact_id)
+
+
+# Зміни контактів застосовуються до індексу лише після фіксації транзакції, щоб відкочені
+# зміни не залишали в ньому n-грам, яких немає в базі.
+_PENDING_KEY = "search_index_pending"
+
+
+def _defer(target, change):
+    session = object_session(target)
+    if session is None:
+        change()
+    else:
+        session.info.setdefault(_PENDING_KEY, []).append(change)
+
+
+@event.listens_for(models.Contact, "after_insert")
+@event.listens_for(models.Contact, "after_update")
+def _on_contact_saved(mapper, connection, target):
+    engine, contact_id, owner_id = connection.engine, target.id, target.owner_id
+    fields = tuple(getattr(target, f) for f in SEARCH_FIELDS)
+    _defer(target, lambda: index_contact(engine, contact_id, fields, owner_id))
+
+
+@event.listens_for(models.Contact, "after_delete")
+def _on_contact_deleted(mapper, connection, target):
+    engine, contact_id = connection.engine, target.id
+    _defer(target, lambda: unindex_contact(engine, contact_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session):
+    for change in session.info.pop(_PENDING_KEY, ()):
+        change()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _on_transaction_end(session, transaction):
+    # Після фіксації зміни вже застосовано; після відкату чи закриття сесії вони відкидаються.
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _postgres_statement(query: str, limit: int, after, options, owner_id):
+    contact = models.Contact
+    pattern = _like_pattern(query)
+    # similarity() повертає real (float4), а курсор передає double precision; без явного
+    # приведення float4 розширюється під час порівняння, і рівність з оцінкою останнього рядка
+    # не виконується, тож рядки з такою самою оцінкою пропускалися б між сторінками.
+    # Сортування й порівняння використовують один вираз типу double precision.
+    score = cast(
+        func.greatest(*(func.similarity(getattr(contact, f), query) for f in SEARCH_FIELDS)), Float(53)
+    ).label("score")
+    stmt = select(contact, score).where(
+        or_(*(getattr(contact, f).ilike(pattern, escape="\\") for f in SEARCH_FIELDS))
+    )
+    if owner_id is not None:
+        stmt = stmt.where(contact.owner_id == owner_id)
+    if after is not None:
+        last_score, last_id = after
+        last_score = cast(literal(last_score), Float(53))
+        stmt = stmt.where(or_(score < last_score, and_(score == last_score, contact.id > last_id)))
+    return stmt.options(*options).order_by(score.desc(), contact.id).limit(limit + 1)
+
+
+def _search_postgres(db: Session, query: str, limit: int, after, options, owner_id):
+    stmt = _postgres_statement(query, limit, after, options, owner_id)
+    return [(row.score, row.Contact) for row in db.execute(stmt)]
+
+
+def _scan(db: Session, query: str, owner_id, index: NgramIndex) -> list:
+    # Індекс процесу не бачить змін інших процесів і запитів Core, тож за відсутності
+    # кандидатів контакти шукаються в базі, а знайдені додаються до індексу.
+    contact = models.Contact
+    pattern = _like_pattern(query)
+    columns = (contact.id, contact.owner_id, *(getattr(contact, f) for f in SEARCH_FIELDS))
+    stmt = select(*columns).where(or_(*(getattr(contact, f).ilike(pattern, escape="\\") for f in SEARCH_FIELDS)))
+    if owner_id is not None:
+        stmt = stmt.where(contact.owner_id == owner_id)
+    needle = _normalize(query)
+    ranked = []
+    for contact_id, contact_owner, *fields in db.execute(stmt):
+        index.add(contact_id, fields, contact_owner)
+        values = [_normalize(value) for value in fields]
+        if any(needle in value for value in values):
+            ranked.append((max(similarity(needle, value) for value in values), contact_id))
+    ranked.sort(key=lambda item: (-item[0], item[1]))
+    return ranked
+
+
+def _search_ngram(db: Session, query: str, limit: int, after, options, owner_id):
+    index = _get_index(db)
+    ranked = index.search(query, owner_id) or _scan(db, query, owner_id, index)
+    if after is not None:
+        last_key = (-after[0], after[1])
+        ranked = [item for item in ranked if (-item[0], item[1]) > last_key]
+
+    needle = _normalize(query)
+    found = []
+    position = 0
+    while len(found) <= limit and position < len(ranked):
+        chunk = ranked[position:position + limit + 1]
+        position += len(chunk)
+        rows = (
+            db.query(models.Contact).options(*options)
+            .filter(models.Contact.id.in_([doc_id for _, doc_id in chunk])).all()
+        )
+        by_id = {row.id: row for row in rows}
+        for score, doc_id in chunk:
+            row = by_id.get(doc_id)
+            # Індекс у пам'яті може відставати від бази, тому збіг перевіряється ще раз.
+            if row is not None and any(needle in _normalize(getattr(row, f)) for f in SEARCH_FIELDS):
+                found.append((score, row))
+    return found[:limit + 1]
+
+
+def search_contacts(
+    db: Session, query: str, limit: int = 20, cursor: str = None, fields: tuple = None, owner_id: int = None,
+    options: list = ()
+):
+    """
+    Шукає контакти за підрядком у імені, прізвищі або email та ранжує результати.
+
+    Аргументи:
+        db (Session): Сесія бази даних.
+        query (str): Пошуковий запит.
+        limit (int): Максимальна кількість результатів на сторінці.
+        cursor (str, optional): Курсор наступної сторінки з попередньої відповіді.
+        fields (tuple[str, ...], optional): Поля контакту, що завантажуються (за замовчуванням усі).
+        owner_id (int, optional): Ідентифікатор власника; шукаються лише його контакти.
+        options (list, optional): Додаткові параметри завантаження ORM (наприклад, зв'язку owner).
+
+    Повертає:
+        tuple[list[Contact], str | None]: Знайдені контакти та курсор наступної сторінки.
+
+    Порушення:
+        InvalidCursorError: Якщо курсор пошкоджений.
+    """
+    after = None
+    if cursor:
+        score, contact_id = decode_cursor(cursor, 2)
+        try:
+            after = (float(score), int(contact_id))
+        except (TypeError, ValueError):
+            raise InvalidCursorError("Invalid cursor")
+
+    options = list(options)
+    if fields:
+        # Поля пошуку потрібні для повторної перевірки збігу в режимі без PostgreSQL.
+        columns = {field: getattr(models.Contact, field) for field in (*fields, "id", *SEARCH_FIELDS)}
+        options.append(load_only(*columns.values()))
+
+    if db.get_bind().dialect.name == "postgresql":
+        results = _search_postgres(db, query, limit, after, options, owner_id)
+    else:
+        results = _search_ngram(db, query, limit, after, options, owner_id)
+
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last_score, last_contact = results[-1]
+        next_cursor = encode_cursor(last_score, last_contact.id)
+    return [row for _, row in results], next_cursor
@@ -0,0 +1,141 @@
+"""
+Модуль для швидкої серіалізації контактів у JSON.
+
+Звичайний шлях відповіді FastAPI для списку — ORM-об'єкти → валідація ``ContactResponse``
+(``from_attributes``) → ``jsonable_encoder`` → JSON — для сторінок у тисячі рядків займає
+більшу частину часу процесора. Тут JSON будується напряму з рядків вибірки (кортежів
+стовпців) кодувальником orjson, якщо його встановлено, або ``pydantic_core.to_json``.
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response
+from pydantic_core import to_json
+
+from contacts import models
+from contacts.metrics import track_serialization
+from contacts import schemas
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson є необов'язковою залежністю
+    orjson = None
+
+# Поля відповіді в порядку схеми ContactResponse
+CONTACT_FIELDS = tuple(schemas.ContactResponse.model_fields)
+
+
+def parse_fields(value: str = None) -> tuple:
+    """
+    Розбирає список полів відповіді (sparse fieldset).
+
+    Аргументи:
+        value (str, optional): Назви полів через кому, наприклад ``first_name,phone``.
+
+    Повертає:
+        tuple[str, ...]: Поля в порядку схеми ContactResponse; ``id`` включається завжди.
+        Якщо значення порожнє — усі поля.
+
+    Порушення:
+        ValueError: Якщо вказано невідоме поле.
+    """
+    if not value:
+        return CONTACT_FIELDS
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    unknown = requested.difference(CONTACT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in CONTACT_FIELDS if field in requested or field == "id")
+
+
+def response_fields(
+    fields: Optional[str] = Query(None, description="Поля відповіді через кому, наприклад first_name,phone")
+) -> tuple:
+    """
+    Залежність FastAPI для параметра ``fields``.
+
+    Аргументи:
+        fields (str, optional): Назви полів через кому.
+
+    Повертає:
+        tuple[str, ...]: Поля відповіді.
+
+    Порушення:
+        HTTPException: 400, якщо вказано невідоме поле.
+    """
+    try:
+        return parse_fields(fields)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+
+def contact_columns(fields=CONTACT_FIELDS) -> list:
+    """
+    Повертає стовпці таблиці контактів для вибірки полів відповіді.
+
+    Аргументи:
+        fields (Iterable[str]): Назви полів відповіді.
+
+    Повертає:
+        list: Стовпці моделі Contact у порядку полів.
+    """
+    return [getattr(models.Contact, field) for field in fields]
+
+
+def dumps(value) -> bytes:
+    """
+    Кодує значення в JSON.
+
+    Аргументи:
+        value: Значення з типів JSON, дат та часу.
+
+    Повертає:
+        bytes: JSON у кодуванні UTF-8.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return to_json(value)
+
+
+def rows_to_json(rows, fields=CONTACT_FIELDS) -> bytes:
+    """
+    Кодує рядки вибірки у JSON-масив об'єктів.
+
+    Аргументи:
+        rows (Iterable[Sequence]): Рядки, у яких перші значення відповідають ``fields``
+            (додаткові стовпці в кінці рядка ігноруються).
+        fields (Sequence[str]): Назви полів.
+
+    Повертає:
+        bytes: JSON-масив об'єктів.
+    """
+    with track_serialization():
+        return dumps([dict(zip(fields, row)) for row in rows])
+
+
+def objects_to_json(objects, fields=CONTACT_FIELDS) -> bytes:
+    """
+    Кодує ORM-об'єкти у JSON-масив без валідації схемою відповіді.
+
+    Аргументи:
+        objects (Iterable[Contact]): Контакти.
+        fields (Sequence[str]): Назви полів.
+
+    Повертає:
+        bytes: JSON-масив об'єктів.
+    """
+    with track_serialization():
+        return dumps([{field: getattr(obj, field) for field in fields} for obj in objects])
+
+
+def json_response(body: bytes, headers: dict = None) -> Response:
+    """
+    Формує відповідь з уже закодованим JSON.
+
+    Аргументи:
+        body (bytes): Тіло відповіді.
+        headers (dict, optional): Додаткові заголовки.
+
+    Повертає:
+        Response: Відповідь із типом вмісту application/json.
+    """
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,218 @@
+"""
+Модуль з ключами підпису та списком відкликаних токенів.
+
+``KeyRing`` — набір ключів HMAC з ідентифікаторами (``kid``). Новий токен підписується активним
+ключем, а його ``kid`` записується в заголовок, тож під час ротації токени, підписані попередніми
+ключами, залишаються дійсними, доки ці ключі є в наборі.
+
+``RevocationList`` — відкликані токени (за ``jti``) у пам'яті процесу: фільтр Блума швидко
+відкидає токени, яких точно немає в списку, а точна множина підтверджує збіг. Перевірка не
+потребує запитів до бази даних.
+"""
+import hashlib
+import heapq
+import math
+import threading
+import time
+
+from jose import JWTError, jwt
+
+from contacts.config import get_settings
+
+
+class KeyRing:
+    """
+    Набір ключів підпису токенів.
+
+    Атрибути:
+        keys (dict[str, str]): Секрети за ідентифікаторами ключів.
+        active_kid (str): Ідентифікатор ключа, яким підписуються нові токени.
+    """
+
+    def __init__(self, keys: dict, active_kid: str = None):
+        if not keys:
+            raise ValueError("Key ring must contain at least one key")
+        self.keys = dict(keys)
+        self.active_kid = active_kid or next(iter(self.keys))
+        if self.active_kid not in self.keys:
+            raise ValueError(f"Unknown active key id: {self.active_kid}")
+
+    @classmethod
+    def parse(cls, value: str, default_secret: str = None) -> "KeyRing":
+        """
+        Створює набір ключів з рядка налаштувань.
+
+        Аргументи:
+            value (str): Ключі у форматі ``kid:secret`` через кому; перший ключ — активний.
+            default_secret (str, optional): Секрет ключа ``default``, якщо рядок порожній.
+
+        Повертає:
+            KeyRing: Набір ключів.
+
+        Порушення:
+            ValueError: Якщо запис не має формату ``kid:secret`` або не задано жодного ключа.
+        """
+        keys = {}
+        for item in filter(None, (item.strip() for item in value.split(","))):
+            kid, separator, secret = item.partition(":")
+            if not separator or not kid or not secret:
+                raise ValueError(f"Invalid key ring entry: {item!r}")
+            keys[kid] = secret
+        if not keys and default_secret:
+            keys = {"default": default_secret}
+        return cls(keys)
+
+    @property
+    def active_key(self) -> str:
+        return self.keys[self.active_kid]
+
+    def key_for(self, token: str) -> str:
+        """
+        Повертає секрет, яким має бути підписаний токен.
+
+        Токени без ``kid`` (видані до ротації ключів) перевіряються активним ключем.
+
+        Аргументи:
+            token (str): JWT токен.
+
+        Повертає:
+            str: Секрет ключа з заголовка токена.
+
+        Порушення:
+            JWTError: Якщо ключа з ``kid`` токена немає в наборі.
+        """
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except JWTError:
+            return self.active_key
+        if kid is None:
+            return self.active_key
+        try:
+            return self.keys[kid]
+        except KeyError:
+            raise JWTError(f"Unknown key id: {kid}")
+
+
+class BloomFilter:
+    """
+    Фільтр Блума для рядків.
+
+    Атрибути:
+        size (int): Кількість бітів.
+        hash_count (int): Кількість хеш-функцій.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Подвійне хешування: k позицій з двох 64-бітних половин одного дайджесту
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationListFullError(RuntimeError):
+    """
+    Помилка, що виникає, коли список відкликаних токенів заповнений непростроченими записами.
+    """
+
+
+class RevocationList:
+    """
+    Список відкликаних токенів у пам'яті процесу.
+
+    Запис зберігається до закінчення дії токена; після цього токен і так недійсний.
+    Прострочені записи видаляються з купи за часом закінчення дії під час кожного відкликання,
+    а фільтр Блума перебудовується лише після ``capacity`` додавань, тож вартість відкликання
+    в середньому не залежить від кількості записів. Непрострочені записи не витісняються
+    (інакше відкликаний токен знову став би дійсним): якщо їх ``capacity``, нові відкликання
+    відхиляються.
+
+    Атрибути:
+        capacity (int): Максимальна кількість одночасно відкликаних токенів.
+        error_rate (float): Допустима частка хибних спрацювань фільтра Блума.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001, timer=time.time):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._timer = timer
+        self._revoked = {}
+        self._expiries = []
+        self._lock = threading.Lock()
+        self._rebuild()
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def revoke(self, jti: str, expires_at: float):
+        """
+        Відкликає токен.
+
+        Аргументи:
+            jti (str): Ідентифікатор токена.
+            expires_at (float): Час закінчення дії токена (Unix time).
+
+        Порушення:
+            RevocationListFullError: Якщо список містить ``capacity`` непрострочених записів.
+        """
+        with self._lock:
+            self._expire(self._timer())
+            if jti not in self._revoked and len(self._revoked) >= self.capacity:
+                raise RevocationListFullError("Revocation list is full")
+            self._revoked[jti] = max(expires_at, self._revoked.get(jti, expires_at))
+            heapq.heappush(self._expiries, (expires_at, jti))
+            # Фільтр розрахований на 2 * capacity записів і перебудовується без прострочених,
+            # коли до нього додано стільки записів.
+            if self._bloom_count >= 2 * self.capacity:
+                self._rebuild()
+            self._bloom.add(jti)
+            self._bloom_count += 1
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Перевіряє, чи відкликано токен.
+
+        Аргументи:
+            jti (str): Ідентифікатор токена.
+
+        Повертає:
+            bool: True, якщо токен відкликано і його дія ще не закінчилася.
+        """
+        if jti not in self._bloom:
+            return False
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > self._timer()
+
+    def clear(self):
+        with self._lock:
+            self._revoked.clear()
+            self._expiries.clear()
+            self._rebuild()
+
+    def _expire(self, now: float):
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._expiries)
+            # Повторне відкликання могло продовжити запис; тоді в купі є новіший елемент.
+            if self._revoked.get(jti, now + 1) <= now:
+                del self._revoked[jti]
+
+    def _rebuild(self):
+        self._bloom = BloomFilter(2 * self.capacity, self.error_rate)
+        for jti in self._revoked:
+            self._bloom.add(jti)
+        self._bloom_count = len(self._revoked)
+
+
+revoked_tokens = RevocationList(capacity=get_settings().token_revocation_capacity)
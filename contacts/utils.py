@@ -3,22 +3,67 @@
 
 Цей модуль містить функції для створення токенів доступу, верифікації токенів, хешування паролів та отримання поточного користувача.
 """
+import hashlib
+import logging
+import secrets
+import time
+import uuid
 from datetime import datetime, timedelta
+from functools import lru_cache
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from typing import Union
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 from jose import JWTError, jwt
+from .cache import TTLCache
+from .config import get_settings
 from .models import User
-from .database import SessionLocal
+from .database import get_async_db, get_db
+from .hashing import password_hasher, pwd_context
+from .tokens import KeyRing, revoked_tokens
+
+logger = logging.getLogger(__name__)
 
-SECRET_KEY = "your_secret_key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Кеш розшифрованих токенів (ключ — SHA-256 токена) та кеш користувачів (ключ — id користувача)
+AUTH_CACHE_TTL = get_settings().auth_cache_ttl
+AUTH_CACHE_SIZE = get_settings().auth_cache_size
+token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+principal_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+# Запит користувача за id будується один раз і виконується з новим значенням параметра.
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
+
+@lru_cache
+def get_key_ring() -> KeyRing:
+    """
+    Повертає набір ключів підпису токенів (з налаштувань ``JWT_KEYS`` або ``SECRET_KEY``).
+
+    Якщо ключ не налаштовано, токени підписуються випадковим ключем процесу: вони стають
+    недійсними після перезапуску й не приймаються іншими процесами застосунку.
+
+    Повертає:
+        KeyRing: Набір ключів.
+    """
+    settings = get_settings()
+    if settings.jwt_keys or settings.secret_key:
+        return KeyRing.parse(settings.jwt_keys, default_secret=settings.secret_key)
+    logger.warning(
+        "Neither JWT_KEYS nor SECRET_KEY is set: tokens are signed with a random per-process key "
+        "and are not accepted after a restart or by other workers"
+    )
+    return KeyRing({"ephemeral": secrets.token_urlsafe(32)})
+
+
+def _encode_token(claims: dict) -> str:
+    key_ring = get_key_ring()
+    return jwt.encode(claims, key_ring.active_key, algorithm=ALGORITHM, headers={"kid": key_ring.active_kid})
 
 
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None):
@@ -37,9 +82,33 @@ def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    return _encode_token(to_encode)
+
+
+def create_refresh_token(user_id, expires_delta: Union[timedelta, None] = None):
+    """
+    Створює токен оновлення.
+
+    Токен оновлення обмінюється на нову пару токенів без перевірки пароля
+    (одна перевірка HMAC замість хешування bcrypt).
+
+    Аргументи:
+        user_id (int): Ідентифікатор користувача.
+        expires_delta (Union[timedelta, None]): Час дії токена. Якщо не вказано, використовується
+            ``refresh_token_expire_days`` з налаштувань.
+
+    Повертає:
+        str: Зашифрований JWT токен оновлення.
+    """
+    expire = datetime.utcnow() + (expires_delta or timedelta(days=get_settings().refresh_token_expire_days))
+    return _encode_token({"sub": str(user_id), "type": "refresh", "exp": expire, "jti": uuid.uuid4().hex})
+
+
+def _check_revoked(payload: dict):
+    jti = payload.get("jti")
+    if jti is not None and revoked_tokens.is_revoked(jti):
+        raise JWTError("Token has been revoked")
 
 
 def verify_access_token(token: str):
@@ -50,15 +119,66 @@ def verify_access_token(token: str):
         token (str): Токен, що перевіряється.
 
     Повертає:
-        dict або None: Розшифровані дані з токена, якщо перевірка успішна. None, якщо токен недійсний.
+        dict або None: Розшифровані дані з токена, якщо перевірка успішна. None, якщо токен недійсний,
+        відкликаний або є токеном оновлення.
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, get_key_ring().key_for(token), algorithms=[ALGORITHM])
+        if payload.get("type") == "refresh":
+            return None
+        _check_revoked(payload)
         return payload
     except JWTError:
         return None
 
 
+def decode_refresh_token(token: str):
+    """
+    Розшифровує та перевіряє токен оновлення.
+
+    Аргументи:
+        token (str): Токен оновлення.
+
+    Повертає:
+        dict: Розшифровані дані з токена.
+
+    Порушення:
+        JWTError: Якщо токен недійсний, відкликаний або не є токеном оновлення.
+    """
+    payload = jwt.decode(token, get_key_ring().key_for(token), algorithms=[ALGORITHM])
+    if payload.get("type") != "refresh":
+        raise JWTError("Not a refresh token")
+    _check_revoked(payload)
+    return payload
+
+
+def revoke_token(token: str, subject=None) -> bool:
+    """
+    Відкликає токен доступу або оновлення до закінчення його дії.
+
+    Аргументи:
+        token (str): Токен.
+        subject (optional): Ідентифікатор користувача; токени інших користувачів не відкликаються.
+
+    Повертає:
+        bool: True, якщо токен відкликано; False, якщо токен недійсний, не має ``jti``
+        або належить іншому користувачу.
+
+    Порушення:
+        RevocationListFullError: Якщо список відкликаних токенів заповнений.
+    """
+    try:
+        payload = jwt.decode(token, get_key_ring().key_for(token), algorithms=[ALGORITHM])
+    except JWTError:
+        return False
+    if "jti" not in payload:
+        return False
+    if subject is not None and payload.get("sub") != str(subject):
+        return False
+    revoked_tokens.revoke(payload["jti"], payload.get("exp", time.time()))
+    return True
+
+
 def verify_password(plain_password, hashed_password):
     """
     Перевіряє відповідність пароля його хешу.
@@ -86,34 +206,173 @@ def hash_password(password):
     return pwd_context.hash(password)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(SessionLocal)):
+async def verify_password_async(plain_password, hashed_password):
     """
-    Отримує поточного користувача з токена.
+    Перевіряє відповідність пароля його хешу в пулі процесів, не блокуючи цикл подій.
+
+    Аргументи:
+        plain_password (str): Пароль у відкритому вигляді.
+        hashed_password (str): Хеш пароля.
+
+    Повертає:
+        bool: True, якщо пароль відповідає хешу, False інакше.
+
+    Порушення:
+        HasherBusyError: Якщо черга задач хешування заповнена.
+    """
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def hash_password_async(password):
+    """
+    Генерує хеш для пароля в пулі процесів, не блокуючи цикл подій.
+
+    Аргументи:
+        password (str): Пароль у відкритому вигляді.
+
+    Повертає:
+        str: Хешований пароль.
+
+    Порушення:
+        HasherBusyError: Якщо черга задач хешування заповнена.
+    """
+    return await password_hasher.hash(password)
+
+
+def decode_access_token(token: str):
+    """
+    Розшифровує токен доступу з використанням кешу.
+
+    Розшифрований токен зберігається в кеші не довше, ніж до моменту закінчення його дії (exp).
+    Відкликання перевіряється і для токенів з кешу; токени оновлення не приймаються.
 
     Аргументи:
         token (str): Токен доступу.
-        db (Session): Сесія бази даних.
 
     Повертає:
-        User: Об'єкт користувача, отриманий із бази даних.
+        dict: Розшифровані дані з токена.
 
     Порушення:
-        HTTPException: Якщо токен недійсний або користувача не знайдено.
+        JWTError: Якщо токен недійсний, відкликаний або є токеном оновлення.
     """
-    credentials_exception = HTTPException(
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = jwt.decode(token, get_key_ring().key_for(token), algorithms=[ALGORITHM])
+        if payload.get("type") == "refresh":
+            raise JWTError("Refresh token cannot be used for access")
+        ttl = AUTH_CACHE_TTL
+        if "exp" in payload:
+            ttl = min(ttl, payload["exp"] - time.time())
+        token_cache.set(key, payload, ttl=ttl)
+    _check_revoked(payload)
+    return payload
+
+
+def invalidate_user(user_id):
+    """
+    Видаляє користувача з кешу користувачів (наприклад, після зміни його даних).
+
+    Аргументи:
+        user_id (int): Ідентифікатор користувача.
+    """
+    principal_cache.delete(str(user_id))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _on_user_changed(mapper, connection, target):
+    invalidate_user(target.id)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _principal_id(token: str) -> int:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
+        payload = decode_access_token(token)
+        user_id = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+            raise _credentials_exception()
+        return int(user_id)
+    except (JWTError, TypeError, ValueError):
+        raise _credentials_exception()
+
+
+def _cached_principal(user_id: int):
+    snapshot = principal_cache.get(str(user_id))
+    if snapshot is None:
+        return None
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+def _cache_principal(user: User):
+    principal_cache.set(str(user.id), {
+        attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs
+    })
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    Отримує поточного користувача з токена.
+
+    Користувач, знайдений за id, кешується; при повторних запитах знімок його даних
+    приєднується до сесії без запиту до бази даних.
+
+    Аргументи:
+        token (str): Токен доступу.
+        db (Session): Сесія бази даних.
+
+    Повертає:
+        User: Об'єкт користувача, отриманий із бази даних або кешу.
+
+    Порушення:
+        HTTPException: Якщо токен недійсний або користувача не знайдено.
+    """
+    user_id = _principal_id(token)
+    user = _cached_principal(user_id)
+    if user is not None:
+        return db.merge(user, load=False)
+
+    user = db.execute(USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
+    if user is None:
+        raise _credentials_exception()
+    _cache_principal(user)
+    return user
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    Отримує поточного користувача з токена через асинхронну сесію.
+
+    Асинхронний варіант ``get_current_user`` для роутера ``contacts_async``: користувач читається
+    тим самим запитом ``USER_BY_ID`` і кешується в тому самому ``principal_cache``, але запит
+    не займає потік із пулу потоків і не потребує синхронного рушія.
+
+    Аргументи:
+        token (str): Токен доступу.
+        db (AsyncSession): Асинхронна сесія бази даних.
+
+    Повертає:
+        User: Об'єкт користувача, отриманий із бази даних або кешу.
+
+    Порушення:
+        HTTPException: Якщо токен недійсний або користувача не знайдено.
+    """
+    user_id = _principal_id(token)
+    user = _cached_principal(user_id)
+    if user is not None:
+        return await db.merge(user, load=False)
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(USER_BY_ID, {"user_id": user_id})).scalar_one_or_none()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    _cache_principal(user)
     return user
@@ -0,0 +1,66 @@
+"""
+Спільні фікстури тестів.
+
+Тести працюють з окремою базою SQLite у пам'яті й не змінюють файлів репозиторію:
+таблиці створюються перед кожним тестом і видаляються після нього.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from contacts import metrics
+from contacts.cache import contact_cache
+from contacts.database import Base, get_db, get_session_factory
+from contacts.main import contacts_app
+from contacts.utils import get_current_user
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Як і рушій застосунку, рушій тестів враховує запити в метриках HTTP-запитів.
+metrics.instrument_queries(engine)
+
+
+@pytest.fixture
+def session_factory():
+    """
+    Створює таблиці в базі тестів і повертає фабрику сесій.
+    """
+    Base.metadata.create_all(bind=engine)
+    contact_cache.clear()
+    yield SessionLocal
+    Base.metadata.drop_all(bind=engine)
+    contact_cache.clear()
+
+
+@pytest.fixture
+def db(session_factory):
+    """
+    Сесія бази тестів.
+    """
+    db_session = session_factory()
+    yield db_session
+    db_session.close()
+
+
+@pytest.fixture
+def make_client(db, session_factory):
+    """
+    Повертає функцію, що створює TestClient застосунку з сесією ``db`` і, за потреби, поточним
+    користувачем. Підміни залежностей прибираються після тесту.
+    """
+    apps = []
+
+    def make(user=None, app=contacts_app):
+        app.dependency_overrides[get_db] = lambda: db
+        app.dependency_overrides[get_session_factory] = lambda: session_factory
+        if user is not None:
+            app.dependency_overrides[get_current_user] = lambda: user
+        apps.append(app)
+        return TestClient(app)
+
+    yield make
+    for app in apps:
+        for dependency in (get_db, get_session_factory, get_current_user):
+            app.dependency_overrides.pop(dependency, None)
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from contacts import async_crud
+from contacts.cache import ContactCache, RedisCacheBackend
+from contacts.database import Base, to_async_url
+from contacts.models import User
+from contacts.schemas import ContactCreate, ContactUpdate
+from contacts.utils import create_access_token, get_current_user_async, principal_cache
+from tests.test_contact_cache import FakeRedis
+
+
+class ThreadRecordingRedis(FakeRedis):
+    """
+    Заміна клієнта Redis, що запам'ятовує потоки, з яких до неї звертаються.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, value, px=None):
+        self.threads.add(threading.get_ident())
+        super().set(key, value, px)
+
+
+class TestAsyncUrl(unittest.TestCase):
+    def test_drivers(self):
+        self.assertEqual(to_async_url("sqlite:///./app.db"), "sqlite+aiosqlite:///./app.db")
+        self.assertEqual(
+            to_async_url("postgresql://user:pass@db:5432/postgres"),
+            "postgresql+asyncpg://user:pass@db:5432/postgres",
+        )
+        self.assertEqual(to_async_url("sqlite+aiosqlite://"), "sqlite+aiosqlite://")
+
+
+class TestAsyncCrud(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+        asyncio.run(self._create_tables())
+
+    async def _create_tables(self):
+        async with self.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    def run_with_session(self, scenario):
+        async def runner():
+            async with self.session_factory() as db:
+                return await scenario(db)
+        return asyncio.run(runner())
+
+    def test_create_update_delete(self):
+        async def scenario(db):
+            contact = await async_crud.create_contact(db, ContactCreate(
+                first_name="John", last_name="Doe", email="john@example.com",
+                phone="1234567890", birthday=date(1990, 1, 1)
+            ))
+            updated = await async_crud.update_contact(db, contact.id, ContactUpdate(first_name="Jane"))
+            found = await async_crud.search_contacts(db, "jane")
+            deleted = await async_crud.delete_contact(db, contact.id)
+            missing = await async_crud.get_contact(db, contact.id)
+            return updated, found, deleted, missing
+
+        updated, (found, next_cursor), deleted, missing = self.run_with_session(scenario)
+        self.assertEqual(updated.first_name, "Jane")
+        self.assertEqual([c.email for c in found], ["john@example.com"])
+        self.assertIsNone(next_cursor)
+        self.assertEqual(deleted.email, "john@example.com")
+        self.assertIsNone(missing)
+
+    def test_cached_reads_keep_redis_off_the_event_loop(self):
+        client = ThreadRecordingRedis()
+        cache = ContactCache(RedisCacheBackend(client), ttl=60)
+
+        async def scenario(db):
+            contact = await async_crud.create_contact(db, ContactCreate(
+                first_name="John", last_name="Doe", email="john@example.com",
+                phone="1234567890", birthday=date(1990, 1, 1)
+            ))
+            first = await async_crud.get_contact_cached(db, contact.id)
+            second = await async_crud.get_contact_cached(db, contact.id)
+            page = await async_crud.get_contacts_cached(db)
+            return threading.get_ident(), first, second, page
+
+        with patch.object(async_crud, "contact_cache", cache):
+            loop_thread, first, second, page = self.run_with_session(scenario)
+        self.assertIsNotNone(first)
+        self.assertEqual(first, second)
+        self.assertIn(b"john@example.com", page)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertTrue(client.threads)
+        self.assertNotIn(loop_thread, client.threads)
+
+    def test_current_user(self):
+        async def scenario(db):
+            user = User(email="async@example.com", hashed_password="x")
+            db.add(user)
+            await db.commit()
+            token = create_access_token({"sub": str(user.id)})
+            principal_cache.clear()
+            loaded = await get_current_user_async(token, db)
+            # Видалення в обхід ORM не інвалідує кеш, тож користувач береться з кешу
+            await db.execute(text("DELETE FROM users"))
+            await db.commit()
+            cached = await get_current_user_async(token, db)
+            principal_cache.clear()
+            with self.assertRaises(HTTPException):
+                await get_current_user_async(token, db)
+            return loaded, cached
+
+        loaded, cached = self.run_with_session(scenario)
+        self.assertEqual(loaded.email, "async@example.com")
+        self.assertEqual(cached.id, loaded.id)
+
+
+if __name__ == '__main__':
+    unittest.main()
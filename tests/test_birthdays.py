@@ -0,0 +1,54 @@
+import unittest
+from datetime import date
+
+import pytest
+
+from contacts.crud import birthday_window, get_upcoming_birthdays, update_contact
+from contacts.models import Contact
+from contacts.schemas import ContactUpdate
+
+
+class TestBirthdayWindow(unittest.TestCase):
+    def test_same_year(self):
+        self.assertEqual(birthday_window(date(2025, 6, 10), 7), (610, 617))
+
+    def test_wraps_new_year(self):
+        self.assertEqual(birthday_window(date(2025, 12, 28), 7), (1228, 104))
+
+    def test_feb_29_in_non_leap_year(self):
+        self.assertEqual(birthday_window(date(2025, 2, 21), 7), (221, 229))
+        self.assertEqual(birthday_window(date(2024, 2, 21), 7), (221, 228))
+
+    def test_whole_year(self):
+        self.assertIsNone(birthday_window(date(2025, 1, 1), 365))
+
+
+class TestUpcomingBirthdays(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _database(self, db):
+        self.db = db
+
+    def setUp(self):
+        birthdays = [date(1990, 12, 30), date(1985, 1, 2), date(1992, 2, 29), date(1970, 6, 15)]
+        for i, birthday in enumerate(birthdays):
+            self.db.add(Contact(first_name=f"Name{i}", last_name="Test", email=f"b{i}@example.com",
+                                phone=str(i), birthday=birthday))
+        self.db.commit()
+
+    def test_key_is_kept_in_sync(self):
+        contact = self.db.query(Contact).filter(Contact.email == "b3@example.com").one()
+        self.assertEqual(contact.birthday_doy, 615)
+        update_contact(self.db, contact.id, ContactUpdate(birthday=date(1970, 7, 1)))
+        self.assertEqual(contact.birthday_doy, 701)
+
+    def test_wraps_new_year_in_order(self):
+        result = get_upcoming_birthdays(self.db, days=7, today=date(2025, 12, 28))
+        self.assertEqual([c.email for c in result], ["b0@example.com", "b1@example.com"])
+
+    def test_feb_29_in_non_leap_year(self):
+        result = get_upcoming_birthdays(self.db, days=3, today=date(2025, 2, 25))
+        self.assertEqual([c.email for c in result], ["b2@example.com"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date
+
+import pytest
+
+from contacts import exporter, importer
+from contacts.models import Contact, User
+
+@pytest.fixture
+def user(db):
+    user = User(email="owner@example.com", hashed_password="x")
+    other = User(email="other@example.com", hashed_password="x")
+    db.add_all([user, other])
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def client(make_client, user):
+    return make_client(user)
+
+
+CSV_DATA = (
+    "first_name,last_name,email,phone,birthday,additional_info\n"
+    "John,Doe,john@example.com,111,1990-01-01,\n"
+    "Jane,Doe,jane@example.com,222,1991-02-02,\"multi\nline\"\n"
+    "Bad,Row,not-an-email,333,1992-03-03,\n"
+    "Copy,Doe,john@example.com,444,1993-04-04,\n"
+)
+
+
+def test_import_csv(client, db, monkeypatch):
+    monkeypatch.setattr(importer, "BATCH_SIZE", 1)
+    response = client.post("/contacts/import", files={"file": ("contacts.csv", CSV_DATA, "text/csv")})
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["total"], report["inserted"], report["duplicates"], report["failed"]) == (4, 2, 1, 1)
+    assert [error["row"] for error in report["errors"]] == [5, 6]
+    assert "email" in report["errors"][0]["errors"][0]
+
+    jane = db.query(Contact).filter(Contact.email == "jane@example.com").one()
+    assert jane.owner_id == 1
+    assert jane.additional_info == "multi\nline"
+    assert jane.birthday_doy == 202
+
+
+def test_import_ndjson_skips_existing_and_in_batch_duplicates(client):
+    rows = [
+        {"first_name": "A", "last_name": "B", "email": "a@example.com", "phone": "1", "birthday": "1990-01-01"},
+        {"first_name": "C", "last_name": "D", "email": "c@example.com", "phone": "1", "birthday": "1990-01-01"},
+    ]
+    data = "\n".join(json.dumps(row) for row in rows) + "\n[1, 2]\n{broken\n"
+    report = client.post("/contacts/import", files={"file": ("contacts.ndjson", data)}).json()
+    assert (report["inserted"], report["duplicates"], report["failed"]) == (1, 1, 2)
+
+    report = client.post("/contacts/import?format=ndjson", files={"file": ("again", json.dumps(rows[0]))}).json()
+    assert (report["inserted"], report["duplicates"]) == (0, 1)
+
+
+def test_import_unknown_format(client):
+    response = client.post("/contacts/import", files={"file": ("contacts.txt", "data", "text/plain")})
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def contacts(db, user, monkeypatch):
+    monkeypatch.setattr(exporter, "BATCH_SIZE", 2)
+    for i in range(5):
+        db.add(Contact(first_name=f"Name{i}", last_name="Doe", email=f"user{i}@example.com",
+                       phone=str(i), birthday=date(1990, 1, i + 1), owner_id=user.id))
+    # Контакт іншого користувача (id 6) не повинен потрапляти в масові операції
+    db.add(Contact(first_name="Foreign", last_name="Doe", email="foreign@example.com",
+                   phone="f", birthday=date(1990, 2, 1), owner_id=user.id + 1))
+    db.commit()
+
+
+def test_export_ndjson(client, contacts):
+    response = client.get("/contacts/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["email"] for row in rows] == [f"user{i}@example.com" for i in range(5)]
+    assert rows[0]["birthday"] == "1990-01-01"
+
+
+def test_export_csv_gzip(client, contacts):
+    response = client.get("/contacts/export", params={"format": "csv", "gzip": True})
+    assert response.headers["content-encoding"] == "gzip"
+    # httpx розпаковує gzip автоматично
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 5
+    assert rows[4]["first_name"] == "Name4"
+
+
+def test_gzip_chunks_round_trip():
+    chunks = [b"first,", b"", b"second"]
+    assert gzip.decompress(b"".join(exporter.gzip_chunks(chunks))) == b"first,second"
+
+
+def test_bulk_update(client, db, contacts):
+    response = client.post("/contacts/bulk-update", json={
+        "ids": [1, 2, 2, 6, 99], "changes": {"last_name": "Smith", "birthday": "1990-12-31"}
+    })
+    assert response.status_code == 200
+    assert sorted(item["id"] for item in response.json()) == [1, 2]
+    assert {item["last_name"] for item in response.json()} == {"Smith"}
+    rows = db.query(Contact).filter(Contact.last_name == "Smith").all()
+    assert {row.birthday_doy for row in rows} == {1231}
+
+
+def test_bulk_update_conflict(client, contacts):
+    response = client.post("/contacts/bulk-update", json={"ids": [1, 2], "changes": {"phone": "same"}})
+    assert response.status_code == 409
+
+
+def test_bulk_delete(client, db, contacts):
+    response = client.post("/contacts/bulk-delete", json={"ids": [3, 4, 6, 100]})
+    assert sorted(item["email"] for item in response.json()) == ["user2@example.com", "user3@example.com"]
+    assert db.query(Contact).count() == 4
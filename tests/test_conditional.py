@@ -0,0 +1,143 @@
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from contacts import main
+from contacts.cache import contact_cache
+from contacts.config import Settings
+from contacts.database import Base, get_async_db, get_db
+from contacts.models import Contact, User
+from contacts.utils import create_access_token
+from tests.conftest import engine
+
+
+@pytest.fixture
+def client(db, make_client):
+    user = User(email="owner@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.add(Contact(first_name="John", last_name="Doe", email="john@example.com", phone="111",
+                   birthday=date(1990, 1, 1), owner_id=user.id))
+    db.commit()
+    return make_client(user)
+
+
+def test_contact_etag_and_not_modified(client):
+    response = client.get("/contacts/1")
+    assert response.headers["ETag"] == 'W/"1-1"'
+    assert "Last-Modified" in response.headers
+
+    response = client.get("/contacts/1", headers={"If-None-Match": 'W/"1-1"'})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get("/contacts/1", headers={"If-Modified-Since": response.headers["Last-Modified"]})
+    assert response.status_code == 304
+
+
+def test_contact_etag_changes_on_update(client):
+    client.put("/contacts/1", json={"first_name": "Johnny"})
+    response = client.get("/contacts/1", headers={"If-None-Match": 'W/"1-1"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == 'W/"1-2"'
+    assert response.json()["first_name"] == "Johnny"
+
+
+def test_list_etag(client):
+    etag = client.get("/contacts/").headers["ETag"]
+    assert client.get("/contacts/", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put("/contacts/1", json={"last_name": "Smith"})
+    response = client.get("/contacts/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_list_page_is_ordered(client):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        client.get("/contacts/", params={"skip": 0, "limit": 5})
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    page = [statement for statement in statements if "LIMIT" in statement]
+    assert page and all("ORDER BY contacts.id" in statement for statement in page)
+
+
+def test_list_ignores_if_modified_since(client):
+    # Сторінка списку не має Last-Modified: після видалення вона зсувається на старіші записи
+    response = client.get("/contacts/")
+    assert "Last-Modified" not in response.headers
+    response = client.get("/contacts/", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert response.status_code == 200
+
+
+def test_list_sparse_fieldset(client):
+    response = client.get("/contacts/", params={"fields": "last_name"})
+    assert response.json() == [{"last_name": "Doe", "id": 1}]
+    response = client.get("/contacts/", params={"after": "", "fields": "email"})
+    assert response.json() == [{"email": "john@example.com", "id": 1}]
+
+
+def test_list_limit_bounds(client):
+    for params in ({"limit": 0}, {"after": "", "limit": 0}, {"after": "", "limit": -1}, {"limit": 101}):
+        assert client.get("/contacts/", params=params).status_code == 422
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    # Асинхронні ендпоінти (SQLALCHEMY_ASYNC=1) з aiosqlite поверх файлової бази
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    with sessionmaker(bind=sync_engine, expire_on_commit=False)() as db:
+        user = User(email="owner@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        db.add(Contact(first_name="John", last_name="Doe", email="john@example.com", phone="111",
+                       birthday=date(1990, 1, 1), owner_id=user.id))
+        db.commit()
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    with patch.object(main, "get_settings", return_value=Settings(_env_file=None, db_async=True)):
+        app = main.create_app()
+    def sync_db_is_not_used():
+        raise AssertionError("async endpoints must not use the sync session")
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_db] = sync_db_is_not_used
+    contact_cache.clear()
+    with TestClient(app) as client:
+        client.headers["Authorization"] = f"Bearer {create_access_token({'sub': str(user.id)})}"
+        yield client
+    contact_cache.clear()
+    sync_engine.dispose()
+
+
+def test_async_endpoints_are_conditional(async_client):
+    client = async_client
+    response = client.get("/contacts/1")
+    assert response.headers["ETag"] == 'W/"1-1"'
+    assert client.get("/contacts/1", headers={"If-None-Match": 'W/"1-1"'}).status_code == 304
+
+    etag = client.get("/contacts/").headers["ETag"]
+    assert client.get("/contacts/", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put("/contacts/1", json={"first_name": "Johnny"})
+    response = client.get("/contacts/1", headers={"If-None-Match": 'W/"1-1"'})
+    assert response.json()["first_name"] == "Johnny"
+    assert client.get("/contacts/", headers={"If-None-Match": etag}).status_code == 200
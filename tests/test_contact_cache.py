@@ -0,0 +1,149 @@
+import unittest
+from datetime import date
+
+import pytest
+
+from contacts import crud, schemas
+from contacts.cache import ContactCache, LocalCacheBackend, RedisCacheBackend, build_backend, contact_cache
+from contacts.limiter import limiter
+from contacts.models import Contact, User
+
+
+class FakeRedis:
+    """
+    Локальна заміна клієнта Redis з підмножиною команд, яку використовує кеш.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, px=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def scan_iter(self, match):
+        return [key for key in self.data if key.startswith(match.rstrip("*"))]
+
+
+class TestContactCache(unittest.TestCase):
+    def check_backend(self, backend):
+        cache = ContactCache(backend, ttl=60)
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return b'{"id": 1}'
+
+        self.assertEqual(cache.get_or_load(cache.contact_key(1), loader), b'{"id": 1}')
+        self.assertEqual(cache.get_or_load(cache.contact_key(1), loader), b'{"id": 1}')
+        self.assertEqual((len(loads), cache.hits, cache.misses), (1, 1, 1))
+
+        list_key = cache.list_key(0, 10)
+        cache.invalidate_contacts(1)
+        self.assertNotEqual(cache.list_key(0, 10), list_key)
+        cache.get_or_load(cache.contact_key(1), loader)
+        self.assertEqual(len(loads), 2)
+
+    def test_local_backend(self):
+        self.check_backend(LocalCacheBackend())
+
+    def test_redis_backend(self):
+        client = FakeRedis()
+        self.check_backend(RedisCacheBackend(client))
+        self.assertTrue(all(key.startswith("contacts-api:") for key in client.data))
+
+    def test_invalidation_is_scoped_to_owner(self):
+        cache = ContactCache(LocalCacheBackend(), ttl=60)
+        cache.backend.set(cache.contact_key(1, 7), b"owned", 60)
+        keys = {owner: cache.list_key(0, 10, owner_id=owner) for owner in (7, 8, None)}
+
+        cache.invalidate_contacts(1, owner_id=7)
+        self.assertIsNone(cache.backend.get(cache.contact_key(1, 7)))
+        self.assertNotEqual(cache.list_key(0, 10, owner_id=7), keys[7])
+        self.assertEqual(cache.list_key(0, 10, owner_id=8), keys[8])
+        self.assertNotEqual(cache.list_key(0, 10), keys[None])
+
+    def test_change_during_load_is_not_cached(self):
+        cache = ContactCache(LocalCacheBackend(), ttl=60)
+
+        def stale_loader():
+            # Запис змінюється і кеш інвалідується, поки читач завантажує стару версію
+            cache.invalidate_contacts(1, owner_id=7)
+            return b"stale"
+
+        self.assertEqual(cache.get_or_load(cache.contact_key(1, 7), stale_loader), b"stale")
+        self.assertEqual(cache.get_or_load(cache.contact_key(1, 7), lambda: b"fresh"), b"fresh")
+
+    def test_missing_value_is_not_cached(self):
+        cache = ContactCache(LocalCacheBackend(), ttl=60)
+        self.assertIsNone(cache.get_or_load("missing", lambda: None))
+        self.assertIsNone(cache.backend.get("missing"))
+
+    def test_build_backend(self):
+        self.assertIsInstance(build_backend("memory://"), LocalCacheBackend)
+        with self.assertRaises(ValueError):
+            build_backend("memcached://localhost")
+
+
+@pytest.fixture
+def client(db, make_client):
+    user = User(email="owner@example.com", hashed_password="x")
+    db.add(user)
+    db.add(Contact(first_name="John", last_name="Doe", email="john@example.com", phone="111",
+                   birthday=date(1990, 1, 1), owner_id=1))
+    db.commit()
+    return make_client(user)
+
+
+def test_read_contact_is_cached_and_invalidated(client, db):
+    assert client.get("/contacts/1").json()["first_name"] == "John"
+    assert client.get("/contacts/1").json()["first_name"] == "John"
+    assert (contact_cache.hits, contact_cache.misses) == (1, 1)
+
+    crud.update_contact(db, 1, schemas.ContactUpdate(first_name="Johnny"))
+    assert client.get("/contacts/1").json()["first_name"] == "Johnny"
+    assert client.get("/health/cache").json()["misses"] == 2
+
+    client.delete("/contacts/1")
+    assert client.get("/contacts/1").status_code == 404
+
+
+def test_contact_list_is_invalidated_on_create(client, db):
+    assert len(client.get("/contacts/").json()) == 1
+    crud.create_contact(db, schemas.ContactCreate(
+        first_name="Jane", last_name="Doe", email="jane@example.com", phone="222", birthday=date(1991, 2, 2)
+    ), owner_id=1)
+    assert len(client.get("/contacts/").json()) == 2
+
+
+def test_contacts_of_other_owners_are_hidden(client, db):
+    db.add(Contact(first_name="Foreign", last_name="Doe", email="foreign@example.com", phone="333", owner_id=2))
+    db.commit()
+    assert [contact["id"] for contact in client.get("/contacts/").json()] == [1]
+    assert client.get("/contacts/2").status_code == 404
+    assert client.put("/contacts/2", json={"first_name": "Mine"}).status_code == 404
+    assert client.delete("/contacts/2").status_code == 404
+
+
+def test_email_and_phone_are_unique_per_owner(client, db):
+    limiter.reset()
+    db.add(Contact(first_name="Foreign", last_name="Doe", email="jane@example.com", phone="222", owner_id=2))
+    db.commit()
+    payload = {"first_name": "Jane", "last_name": "Doe", "email": "jane@example.com", "phone": "222",
+               "birthday": "1991-02-02"}
+    assert client.post("/contacts/", json=payload).status_code == 201
+    response = client.post("/contacts/", json={**payload, "phone": "333"})
+    assert response.status_code == 409
+    assert client.put("/contacts/1", json={"phone": "222"}).status_code == 409
+    assert client.get("/contacts/1").json()["phone"] == "111"
+    limiter.reset()
@@ -0,0 +1,37 @@
+import asyncio
+import unittest
+
+from contacts.hashing import HasherBusyError, PasswordHasher
+
+
+class TestPasswordHasher(unittest.TestCase):
+    def setUp(self):
+        self.hasher = PasswordHasher(workers=1, max_pending=1)
+
+    def tearDown(self):
+        self.hasher.shutdown()
+
+    def test_hash_and_verify(self):
+        async def scenario():
+            hashed = await self.hasher.hash("testpassword")
+            return hashed, await self.hasher.verify("testpassword", hashed), await self.hasher.verify("wrong", hashed)
+
+        hashed, valid, invalid = asyncio.run(scenario())
+        self.assertNotEqual(hashed, "testpassword")
+        self.assertTrue(valid)
+        self.assertFalse(invalid)
+        self.assertEqual(self.hasher.pending, 0)
+
+    def test_rejects_when_saturated(self):
+        async def scenario():
+            return await asyncio.gather(
+                self.hasher.hash("first"), self.hasher.hash("second"), return_exceptions=True
+            )
+
+        first, second = asyncio.run(scenario())
+        self.assertIsInstance(first, str)
+        self.assertIsInstance(second, HasherBusyError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from datetime import date
+
+import pytest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+from starlette.requests import Request
+
+from contacts.limiter import limiter, rate_limit_key
+from contacts.models import User
+from contacts.ratelimit_storage import SQLiteStorage
+from contacts.utils import create_access_token
+
+
+def make_request(authorization=None):
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 1234)})
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        # Два екземпляри сховища з одним файлом імітують два процеси застосунку.
+        self.path = f"/tmp/test_ratelimit_{id(self)}.db"
+        self.first = storage_from_string(f"sqlite:///{self.path}")
+        self.second = storage_from_string(f"sqlite:///{self.path}")
+        self.first.reset()
+
+    def tearDown(self):
+        self.first.reset()
+
+    def test_storage_registered_for_scheme(self):
+        self.assertIsInstance(self.first, SQLiteStorage)
+        self.assertTrue(self.first.check())
+
+    def test_fixed_window_shared_between_instances(self):
+        item = parse("2/minute")
+        self.assertTrue(FixedWindowRateLimiter(self.first).hit(item, "user:1"))
+        self.assertTrue(FixedWindowRateLimiter(self.second).hit(item, "user:1"))
+        self.assertFalse(FixedWindowRateLimiter(self.first).hit(item, "user:1"))
+        self.assertTrue(FixedWindowRateLimiter(self.second).hit(item, "user:2"))
+
+    def test_moving_window_shared_between_instances(self):
+        item = parse("2/minute")
+        self.assertTrue(MovingWindowRateLimiter(self.first).hit(item, "user:1"))
+        self.assertTrue(MovingWindowRateLimiter(self.second).hit(item, "user:1"))
+        self.assertFalse(MovingWindowRateLimiter(self.second).hit(item, "user:1"))
+        stats = MovingWindowRateLimiter(self.first).get_window_stats(item, "user:1")
+        self.assertEqual(stats[1], 0)
+
+
+class TestRateLimitKey(unittest.TestCase):
+    def test_user_key_from_token(self):
+        token = create_access_token({"sub": "42"})
+        self.assertEqual(rate_limit_key(make_request(f"Bearer {token}")), "user:42")
+
+    def test_ip_key_without_valid_token(self):
+        self.assertEqual(rate_limit_key(make_request()), "ip:10.0.0.1")
+        self.assertEqual(rate_limit_key(make_request("Bearer broken")), "ip:10.0.0.1")
+
+
+@pytest.fixture
+def client(db, make_client):
+    user = User(email="owner@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    limiter.reset()
+    yield make_client(user)
+    limiter.reset()
+
+
+def test_create_contact_rate_limit_and_metrics(client):
+    statuses = [
+        client.post("/contacts/", json={
+            "first_name": "John", "last_name": "Doe", "email": f"john{i}@example.com", "phone": str(i),
+            "birthday": str(date(1990, 1, 1)),
+        }).status_code
+        for i in range(6)
+    ]
+    assert statuses == [201] * 5 + [429]
+    limits = client.get("/health/rate-limit").json()["limits"]
+    assert limits["5 per 1 minute"]["rejected"] >= 1
@@ -0,0 +1,175 @@
+import asyncio
+import socket
+import unittest
+
+import aiosmtplib
+import pytest
+
+from contacts.mail_queue import MailWorker, enqueue_email
+from contacts.models import OutboundEmail, User
+
+try:
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.handlers import Sink
+except ImportError:  # aiosmtpd потрібен лише для інтеграційного тесту
+    Controller = None
+
+
+class FakeSMTP:
+    """
+    Локальна заміна SMTP-клієнта: запам'ятовує надіслані листи та може імітувати помилки.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.is_connected = False
+
+    async def connect(self):
+        self.server.connects += 1
+        self.is_connected = True
+
+    async def send_message(self, message):
+        await asyncio.sleep(0)
+        if self.server.failures:
+            error = self.server.failures.pop(0)
+            if isinstance(error, aiosmtplib.SMTPServerDisconnected):
+                self.is_connected = False
+            raise error
+        self.server.sent.append(message)
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+class FakeSMTPServer:
+    def __init__(self, failures=None):
+        self.connects = 0
+        self.sent = []
+        self.failures = list(failures or [])
+
+    def factory(self):
+        return FakeSMTP(self)
+
+
+class TestMailWorker(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _database(self, session_factory):
+        self.SessionLocal = session_factory
+
+    def enqueue(self, count):
+        with self.SessionLocal() as db:
+            for i in range(count):
+                enqueue_email(db, f"user{i}@example.com", "Hello", f"Message {i}")
+
+    def statuses(self):
+        with self.SessionLocal() as db:
+            return [(row.status, row.attempts) for row in db.query(OutboundEmail).order_by(OutboundEmail.id)]
+
+    def test_batch_reuses_connections(self):
+        self.enqueue(10)
+        server = FakeSMTPServer()
+        worker = MailWorker(self.SessionLocal, server.factory, batch_size=10, concurrency=2)
+        self.assertEqual(asyncio.run(worker.run_once()), 10)
+        self.assertEqual(len(server.sent), 10)
+        self.assertEqual(server.connects, 2)
+        self.assertEqual(self.statuses(), [("sent", 1)] * 10)
+        self.assertEqual(server.sent[0]["To"], "user0@example.com")
+
+    def test_transient_error_is_retried_with_backoff(self):
+        self.enqueue(1)
+        server = FakeSMTPServer(failures=[aiosmtplib.SMTPServerDisconnected("gone")])
+        worker = MailWorker(self.SessionLocal, server.factory, retry_delay=0)
+
+        asyncio.run(worker.run_once())
+        self.assertEqual(self.statuses(), [("pending", 1)])
+        asyncio.run(worker.run_once())
+        self.assertEqual(self.statuses(), [("sent", 2)])
+        self.assertEqual(server.connects, 2)
+
+    def test_retry_is_delayed(self):
+        self.enqueue(1)
+        server = FakeSMTPServer(failures=[aiosmtplib.SMTPResponseException(421, "busy")])
+        worker = MailWorker(self.SessionLocal, server.factory, retry_delay=60)
+        asyncio.run(worker.run_once())
+        self.assertEqual(asyncio.run(worker.run_once()), 0)
+        with self.SessionLocal() as db:
+            self.assertEqual(db.query(OutboundEmail).one().last_error, "(421, 'busy')")
+
+    def test_permanent_error_and_max_attempts(self):
+        self.enqueue(2)
+        server = FakeSMTPServer(failures=[
+            aiosmtplib.SMTPResponseException(550, "no such user"),
+            aiosmtplib.SMTPResponseException(451, "try later"),
+        ])
+        worker = MailWorker(self.SessionLocal, server.factory, concurrency=1, max_attempts=1, retry_delay=0)
+        asyncio.run(worker.run_once())
+        self.assertEqual(self.statuses(), [("failed", 1), ("failed", 1)])
+        self.assertEqual(server.sent, [])
+
+
+@unittest.skipIf(Controller is None, "aiosmtpd is not installed")
+class TestMailWorkerWithSMTPServer(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _database(self, session_factory):
+        self.SessionLocal = session_factory
+
+    def setUp(self):
+        self.messages = []
+        test = self
+
+        class Handler(Sink):
+            async def handle_DATA(self, server, session, envelope):
+                test.messages.append((session.peer, envelope.rcpt_tos))
+                return "250 OK"
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.controller = Controller(Handler(), hostname="127.0.0.1", port=self.port)
+        self.controller.start()
+
+    def tearDown(self):
+        self.controller.stop()
+
+    def test_delivers_over_shared_connection(self):
+        with self.SessionLocal() as db:
+            for i in range(5):
+                enqueue_email(db, f"user{i}@example.com", "Hello", "Body")
+
+        def factory():
+            return aiosmtplib.SMTP(hostname="127.0.0.1", port=self.port, start_tls=False)
+
+        async def run():
+            worker = MailWorker(self.SessionLocal, factory, concurrency=1)
+            await worker.run_once()
+            await worker.pool.close()
+
+        asyncio.run(run())
+        self.assertEqual(len(self.messages), 5)
+        # Усі листи надіслано через одне SMTP-з'єднання.
+        self.assertEqual(len({peer for peer, _ in self.messages}), 1)
+
+
+class TestSendVerificationEmail(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _database(self, db, make_client):
+        self.db = db
+        self.client = make_client()
+
+    def setUp(self):
+        self.db.add(User(email="user@example.com", hashed_password="x"))
+        self.db.commit()
+
+    def test_email_is_queued(self):
+        response = self.client.post("/send-verification-email", json={"email": "user@example.com"})
+        self.assertEqual(response.status_code, 200)
+        queued = self.db.query(OutboundEmail).one()
+        self.assertEqual((queued.recipient, queued.status), ("user@example.com", "pending"))
+        self.assertIn("/verify-email/1", queued.body)
+
+    def test_unknown_user(self):
+        response = self.client.post("/send-verification-email", json={"email": "nobody@example.com"})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,128 @@
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import InvalidRequestError
+
+from contacts import crud, main, metrics
+from contacts.config import Settings
+from contacts.models import Contact, User
+from contacts.utils import create_access_token
+
+
+class TestQueryInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        self.metrics = metrics.HttpMetrics()
+        metrics.instrument_queries(self.engine, 0.0, self.metrics)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_queries_are_counted_per_request(self):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics._current.set(request_metrics)
+        try:
+            with self.assertLogs("contacts.metrics", "WARNING") as logs, self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                connection.execute(text("SELECT 2"))
+        finally:
+            metrics._current.reset(token)
+        self.assertEqual(request_metrics.queries, 2)
+        self.assertGreater(request_metrics.db_seconds, 0)
+        self.assertEqual(self.metrics.slow_queries, 2)
+        self.assertIn("SELECT 2", logs.output[1])
+
+    def test_query_budget(self):
+        with self.engine.connect() as connection:
+            with metrics.query_budget(1) as budget:
+                connection.execute(text("SELECT 1"))
+                with self.assertRaises(metrics.TooManyQueriesError):
+                    connection.execute(text("SELECT 2"))
+        self.assertEqual(budget.queries, 2)
+
+    def test_render_histograms(self):
+        self.metrics.observe_request("GET", "/contacts/", 200, 0.02, metrics.RequestMetrics())
+        output = metrics.render_prometheus(self.metrics)
+        self.assertIn('contacts_http_requests_total{method="GET",route="/contacts/",status="200"} 1', output)
+        self.assertIn(
+            'contacts_http_request_duration_seconds_bucket{method="GET",route="/contacts/",le="0.025"} 1', output
+        )
+        self.assertIn('contacts_http_request_duration_seconds_bucket{method="GET",route="/contacts/",le="0.01"} 0',
+                      output)
+        self.assertIn("# TYPE contacts_rate_limit_checks_total counter", output)
+
+
+@pytest.fixture
+def db(db):
+    db.add_all([User(email="admin@example.com", hashed_password="x"),
+                User(email="user@example.com", hashed_password="x")])
+    for i in range(4):
+        db.add(Contact(first_name=f"John{i}", last_name="Doe", email=f"john{i}@example.com", phone=str(i),
+                       birthday=date(1990, 1, i + 1), owner_id=i % 2 + 1))
+    db.commit()
+    return db
+
+
+def make_app(**settings):
+    with patch.object(main, "get_settings", return_value=Settings(_env_file=None, **settings)):
+        return main.create_app()
+
+
+@pytest.fixture
+def client(db, make_client):
+    return make_client(db.get(User, 1), app=make_app(admin_user_ids="1"))
+
+
+@pytest.mark.parametrize("loader, max_queries", [("selectin", 2), ("joined", 1)])
+def test_eager_loading_avoids_n_plus_one(db, session_factory, loader, max_queries):
+    with session_factory() as session, metrics.query_budget(max_queries):
+        contacts = crud.get_contacts(session, loader=loader)
+        assert {contact.owner.email for contact in contacts} == {"admin@example.com", "user@example.com"}
+
+
+def test_lazy_loading_exceeds_query_budget(db, session_factory):
+    with session_factory() as session, pytest.raises(metrics.TooManyQueriesError):
+        with metrics.query_budget(2):
+            contacts = crud.get_contacts(session)
+            [contact.owner.email for contact in contacts]
+
+
+def test_raise_loader(db, session_factory):
+    with session_factory() as session:
+        contact = crud.get_contact(session, 1, loader="raise")
+        with pytest.raises(InvalidRequestError):
+            contact.owner
+        with pytest.raises(ValueError):
+            crud.get_contacts(session, loader="eager")
+
+
+def test_query_limit_per_request(db, make_client):
+    client = make_client(db.get(User, 1), app=make_app(max_queries_per_request=2))
+    assert client.get("/contacts/1").status_code == 200
+    with pytest.raises(metrics.TooManyQueriesError):
+        client.put("/contacts/1", json={"first_name": "Johnny"})
+
+
+def test_request_metrics_and_prometheus_endpoint(client):
+    response = client.get("/contacts/1")
+    assert response.status_code == 200
+    assert 'desc="1 queries"' in response.headers["Server-Timing"]
+
+    output = client.get("/metrics").text
+    assert 'contacts_http_requests_total{method="GET",route="/contacts/{contact_id}",status="200"}' in output
+    assert 'contacts_http_request_db_queries_bucket{method="GET",route="/contacts/{contact_id}",le="1.0"}' in output
+
+
+def test_profile_is_available_only_for_admins(client):
+    admin = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    response = client.get("/contacts/", params={"profile": 1}, headers=admin)
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.headers["X-Profiled-Status"] == "200"
+    assert response.text.startswith("Duration:")
+
+    user = {"Authorization": f"Bearer {create_access_token({'sub': '2'})}"}
+    response = client.get("/contacts/", params={"profile": 1}, headers=user)
+    assert [contact["id"] for contact in response.json()] == [1, 3]
@@ -0,0 +1,81 @@
+import unittest
+from datetime import date
+
+import pytest
+
+from contacts.crud import get_contacts_after
+from contacts.models import Contact
+from contacts.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+class TestCursor(unittest.TestCase):
+    def test_round_trip(self):
+        cursor = encode_cursor("Doe", "John", 42)
+        self.assertEqual(decode_cursor(cursor, 3), ["Doe", "John", 42])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursorError):
+            decode_cursor("%%%", 1)
+        with self.assertRaises(InvalidCursorError):
+            decode_cursor(encode_cursor(1, 2), 1)
+
+
+class TestKeysetPagination(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _database(self, db):
+        self.db = db
+
+    def setUp(self):
+        names = [("Ivan", "Shevchenko"), ("Anna", "Bondar"), ("Olha", "Bondar"), ("Petro", "Koval"), ("Ira", "Melnyk")]
+        for i, (first_name, last_name) in enumerate(names):
+            self.db.add(Contact(first_name=first_name, last_name=last_name, email=f"c{i}@example.com",
+                                phone=str(i), birthday=date(1990, 1, 1)))
+        self.db.commit()
+
+    def walk(self, order, limit=2):
+        seen, after = [], ""
+        while True:
+            page, after = get_contacts_after(self.db, after=after, limit=limit, order=order)
+            seen.extend(page)
+            if after is None:
+                return seen
+
+    def test_walk_by_id(self):
+        ids = [contact.id for contact in self.walk("id")]
+        self.assertEqual(ids, [1, 2, 3, 4, 5])
+
+    def test_walk_by_name(self):
+        names = [(contact.last_name, contact.first_name) for contact in self.walk("name")]
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(len(names), 5)
+
+    def test_insert_during_walk_does_not_duplicate(self):
+        page, after = get_contacts_after(self.db, after="", limit=2, order="name")
+        self.db.add(Contact(first_name="Adam", last_name="Abramenko", email="new@example.com",
+                            phone="new", birthday=date(1990, 1, 1)))
+        self.db.commit()
+        rest = []
+        while after:
+            next_page, after = get_contacts_after(self.db, after=after, limit=2, order="name")
+            rest.extend(next_page)
+        self.assertEqual(len(page) + len(rest), 5)
+        self.assertFalse({c.id for c in page} & {c.id for c in rest})
+
+    def test_walk_by_name_with_null_names(self):
+        # Записи з NULL у прізвищі чи імені йдуть першими і не обривають обхід
+        for contact in self.db.query(Contact).filter(Contact.id.in_([2, 4, 5])):
+            contact.last_name = None
+        self.db.query(Contact).filter(Contact.id == 4).one().first_name = None
+        self.db.commit()
+        ids = [contact.id for contact in self.walk("name")]
+        self.assertEqual(ids, [4, 2, 5, 3, 1])
+
+    def test_cursor_with_non_scalar_name_is_invalid(self):
+        with self.assertRaises(InvalidCursorError):
+            get_contacts_after(self.db, after=encode_cursor("a", {"x": 1}, 3), order="name")
+        with self.assertRaises(InvalidCursorError):
+            get_contacts_after(self.db, after=encode_cursor(["a"], "b", 3), order="name")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from sqlalchemy import create_engine, exc, text
+
+from contacts.pool_metrics import InstrumentedQueuePool, instrument_engine
+
+
+class TestPoolMetrics(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05
+        )
+        self.metrics = instrument_engine(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_checkout_overflow_and_timeout(self):
+        first = self.engine.connect()
+        second = self.engine.connect()
+        with self.assertRaises(exc.TimeoutError):
+            self.engine.connect()
+        first.execute(text("SELECT 1"))
+        first.close()
+        second.close()
+
+        snapshot = self.metrics.snapshot(self.engine.pool)
+        self.assertEqual(snapshot["checkouts"], 2)
+        self.assertEqual(snapshot["checkins"], 2)
+        self.assertEqual(snapshot["overflow_checkouts"], 1)
+        self.assertEqual(snapshot["timeouts"], 1)
+        self.assertEqual(snapshot["wait_seconds"]["count"], 2)
+        self.assertEqual(snapshot["wait_seconds"]["buckets"]["+Inf"], 2)
+        self.assertEqual(snapshot["pool"]["checked_out"], 0)
+
+    def test_metrics_survive_dispose(self):
+        self.engine.dispose()
+        self.engine.connect().close()
+        self.assertIs(self.engine.pool.metrics, self.metrics)
+        self.assertEqual(self.metrics.checkouts, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,29 +1,8 @@
-import os
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
-from contacts.database import get_db
-from contacts.main import contacts_app  # импорт приложения FastAPI
-from contacts.models import Base, User, Contact
-from contacts.utils import get_current_user
+from contacts.models import User, Contact
 
-# Создание тестовой базы данных
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"  # Используется SQLite для тестирования
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Фикстура для тестовой базы данных
-@pytest.fixture(scope="module")
-def db():
-    if os.path.exists("test.db"):  # Удаление старой базы данных перед созданием новой
-        os.remove("test.db")
-    Base.metadata.create_all(bind=engine)  # Создание таблиц
-    db_session = SessionLocal()
-    yield db_session
-    db_session.close()
-    Base.metadata.drop_all(bind=engine)  # Очистка после тестов
+# База данных и сессия ``db`` — общие фикстуры из conftest.py (SQLite в памяти)
 
 # Фикстура для создания тестового пользователя
 @pytest.fixture
@@ -48,20 +27,10 @@ def test_contact(db, test_user):
     db.refresh(contact)
     return contact
 
-# Мокинг зависимости для получения текущего пользователя
-@pytest.fixture
-def override_get_current_user(test_user):
-    def mock_get_current_user():
-        return test_user  # Возвращаем тестового пользователя
-    return mock_get_current_user
-
-# Создание клиента для тестирования
+# Создание клиента для тестирования с подменой текущего пользователя
 @pytest.fixture
-def client(db, override_get_current_user):
-    # Переопределение зависимостей
-    contacts_app.dependency_overrides[get_db] = lambda: db
-    contacts_app.dependency_overrides[get_current_user] = override_get_current_user
-    return TestClient(contacts_app)
+def client(make_client, test_user):
+    return make_client(test_user)
 
 # Тест маршрута получения контактов
 def test_get_contacts(client, test_contact):
@@ -71,3 +40,47 @@ def test_get_contacts(client, test_contact):
     assert response.json()[0]["email"] == test_contact.email  # Проверка email
     assert response.json()[0]["first_name"] == test_contact.first_name  # Проверка имени
     assert response.json()[0]["last_name"] == test_contact.last_name  # Проверка фамилии
+
+# Клиент без подмены текущего пользователя для тестов аутентификации
+@pytest.fixture
+def auth_client(make_client):
+    return make_client()
+
+# Тест регистрации и получения токена (хеширование выполняется в пуле процессов)
+def test_register_and_login(auth_client):
+    client = auth_client
+    response = client.post("/register", json={"email": "newuser@example.com", "password": "secret"})
+    assert response.status_code == 201
+    assert client.post("/register", json={"email": "newuser@example.com", "password": "secret"}).status_code == 409
+
+    response = client.post("/token", data={"username": "newuser@example.com", "password": "secret"})
+    assert response.status_code == 201
+    assert response.json()["token_type"] == "bearer"
+
+    response = client.post("/token", data={"username": "newuser@example.com", "password": "wrong"})
+    assert response.status_code == 401
+
+# Тест оновлення токена: використаний токен оновлення відкликається
+def test_refresh_and_revoke(auth_client):
+    client = auth_client
+    client.post("/register", json={"email": "refresh@example.com", "password": "secret"})
+    tokens = client.post("/token", data={"username": "refresh@example.com", "password": "secret"}).json()
+
+    response = client.post("/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 201
+    refreshed = response.json()
+    assert client.post("/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert client.post("/refresh", json={"refresh_token": refreshed["access_token"]}).status_code == 401
+
+    # Отзыв требует аутентификации и действует только на токены текущего пользователя
+    assert client.post("/revoke", json={"token": refreshed["refresh_token"]}).status_code == 401
+    client.post("/register", json={"email": "other@example.com", "password": "secret"})
+    other = client.post("/token", data={"username": "other@example.com", "password": "secret"}).json()
+    other_headers = {"Authorization": f"Bearer {other['access_token']}"}
+    assert client.post("/revoke", json={"token": refreshed["refresh_token"]}, headers=other_headers).status_code == 200
+    assert client.post("/refresh", json={"refresh_token": refreshed["refresh_token"]}).status_code == 201
+
+    headers = {"Authorization": f"Bearer {refreshed['access_token']}"}
+    renewed = client.post("/token", data={"username": "refresh@example.com", "password": "secret"}).json()
+    assert client.post("/revoke", json={"token": renewed["refresh_token"]}, headers=headers).status_code == 200
+    assert client.post("/refresh", json={"refresh_token": renewed["refresh_token"]}).status_code == 401
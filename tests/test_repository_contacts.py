@@ -53,13 +53,13 @@ class TestContacts(unittest.TestCase):
 
 
     def test_get_contact_found(self):
-        self.session.query().filter().first.return_value = self.contact
+        self.session.execute().scalar_one_or_none.return_value = self.contact
         result = get_contact(contact_id=1, db=self.session)
         self.assertEqual(result, self.contact)
 
     def test_get_contact_not_found(self):
         # Мокаем возвращаемое значение запроса
-        self.session.query().filter().first.return_value = None
+        self.session.execute().scalar_one_or_none.return_value = None
         result = get_contact(contact_id=1, db=self.session)
         self.assertIsNone(result)
 
@@ -70,24 +70,24 @@ class TestContacts(unittest.TestCase):
         self.assertEqual(result, contacts)
 
     def test_delete_contact_found(self):
-        self.session.query().filter().first.return_value = self.contact
+        self.session.execute().scalar_one_or_none.return_value = self.contact
         result = delete_contact(contact_id=1, db=self.session)
         self.assertEqual(result, self.contact)
 
     def test_delete_contact_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.session.execute().scalar_one_or_none.return_value = None
         result = delete_contact(contact_id=1, db=self.session)
         self.assertIsNone(result)
 
     def test_update_contact_found(self):
         # Мокаем получение контакта и обновление
-        self.session.query().filter().first.return_value = self.contact
+        self.session.execute().scalar_one_or_none.return_value = self.contact
         result = update_contact(contact_id=1, contact_data=self.contact_update, db=self.session)
         self.assertEqual(result.first_name, self.contact_update.first_name)
         self.assertEqual(result.email, self.contact_update.email)
 
     def test_update_contact_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.session.execute().scalar_one_or_none.return_value = None
         result = update_contact(contact_id=1, contact_data=self.contact_update, db=self.session)
         self.assertIsNone(result)
 
@@ -0,0 +1,148 @@
+import unittest
+from datetime import date
+
+import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql
+
+from contacts import search
+from contacts.models import Contact, User
+
+
+class TestNgramIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = search.NgramIndex()
+        self.index.add(1, ("John", "Doe", "john.doe@example.com"))
+        self.index.add(2, ("Johnny", "Walker", "walker@example.com"))
+        self.index.add(3, ("Jane", "Smith", "jane@example.com"))
+
+    def test_substring_match(self):
+        ids = [doc_id for _, doc_id in self.index.search("joh")]
+        self.assertCountEqual(ids, [1, 2])
+
+    def test_ranking_prefers_closer_match(self):
+        ranked = self.index.search("john")
+        self.assertEqual(ranked[0][1], 1)
+
+    def test_short_query_scans_documents(self):
+        ids = [doc_id for _, doc_id in self.index.search("sm")]
+        self.assertEqual(ids, [3])
+
+    def test_update_and_remove(self):
+        self.index.add(3, ("Janet", "Jones", "janet@example.com"))
+        self.assertEqual(self.index.search("smith"), [])
+        self.index.remove(1)
+        self.assertEqual([doc_id for _, doc_id in self.index.search("john")], [2])
+
+    def test_search_by_owner(self):
+        self.index.add(4, ("John", "Foreign", "foreign@example.com"), owner_id=2)
+        self.index.add(1, ("John", "Doe", "john.doe@example.com"), owner_id=1)
+        self.assertEqual([doc_id for _, doc_id in self.index.search("john", owner_id=1)], [1])
+        self.assertCountEqual([doc_id for _, doc_id in self.index.search("john")], [1, 2, 4])
+
+
+class TestPostgresStatement(unittest.TestCase):
+    def compile(self, after=None):
+        stmt = search._postgres_statement("anna", 20, after, [], owner_id=1)
+        return str(stmt.compile(dialect=postgresql.dialect()))
+
+    def test_score_is_double_precision(self):
+        # Сортування і порівняння з курсором використовують той самий вираз double precision,
+        # тож рядки з однаковою оцінкою не пропускаються між сторінками.
+        sql = self.compile(after=(0.4166666567325592, 3))
+        score = "CAST(greatest(similarity(contacts.first_name, %(similarity_1)s)"
+        self.assertEqual(sql.count(score), 3)
+        self.assertIn("AS FLOAT(53)) < CAST(%(param_1)s AS FLOAT(53))", sql)
+        self.assertIn("AS FLOAT(53)) = CAST(%(param_1)s AS FLOAT(53)) AND contacts.id > %(id_1)s", sql)
+        self.assertIn("ORDER BY score DESC, contacts.id", sql)
+
+
+@pytest.fixture
+def client(db, make_client):
+    search.reset_indexes()
+    db.add_all([User(email="owner@example.com", hashed_password="x"),
+                User(email="other@example.com", hashed_password="x")])
+    for i in range(5):
+        db.add(Contact(
+            first_name=f"Anna{i}", last_name="Kovalenko", email=f"anna{i}@example.com", phone=f"555000{i}",
+            birthday=date(1990, 1, i + 1), owner_id=1
+        ))
+    db.add(Contact(first_name="Petro", last_name="Ivanenko", email="petro@example.com", phone="5551111",
+                   birthday=date(1985, 5, 17), owner_id=1))
+    # Контакт іншого користувача не повинен потрапляти в результати пошуку.
+    db.add(Contact(first_name="Anna", last_name="Kovalenko", email="foreign@example.com", phone="5559999",
+                   birthday=date(1990, 2, 1), owner_id=2))
+    db.commit()
+    yield make_client(db.get(User, 1))
+    search.reset_indexes()
+
+
+def test_search_paginates_with_cursor(client):
+    response = client.get("/contacts/search/", params={"query": "koval", "limit": 3})
+    assert response.status_code == 200
+    first_page = [item["email"] for item in response.json()]
+    assert len(first_page) == 3
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/contacts/search/", params={"query": "koval", "limit": 3, "cursor": cursor})
+    second_page = [item["email"] for item in response.json()]
+    assert len(second_page) == 2
+    assert "X-Next-Cursor" not in response.headers
+    assert not set(first_page) & set(second_page)
+
+
+def test_search_sees_new_contacts(client, db):
+    assert client.get("/contacts/search/", params={"query": "olena"}).json() == []
+    db.add(Contact(first_name="Olena", last_name="Shevchenko", email="olena@example.com", phone="5552222",
+                   birthday=date(1992, 3, 8), owner_id=1))
+    db.commit()
+    response = client.get("/contacts/search/", params={"query": "olena"})
+    assert [item["first_name"] for item in response.json()] == ["Olena"]
+
+
+def test_search_invalid_cursor(client):
+    response = client.get("/contacts/search/", params={"query": "anna", "cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_search_sparse_fieldset(client):
+    response = client.get("/contacts/search/", params={"query": "petro", "fields": "first_name,phone"})
+    assert response.json() == [{"first_name": "Petro", "phone": "5551111", "id": 6}]
+    response = client.get("/contacts/search/", params={"query": "petro", "fields": "secret"})
+    assert response.status_code == 400
+
+
+def test_search_pages_through_tied_scores(client):
+    # Усі п'ять контактів Kovalenko мають однакову оцінку, тож сторінки розділяє лише id.
+    emails, cursor = [], None
+    while True:
+        params = {"query": "kovalenko", "limit": 1, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/contacts/search/", params=params)
+        emails += [item["email"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert emails == [f"anna{i}@example.com" for i in range(5)]
+
+
+def test_rolled_back_update_is_not_indexed(client, db):
+    assert client.get("/contacts/search/", params={"query": "petro"}).status_code == 200
+    contact = db.get(Contact, 6)
+    contact.first_name = "Mykola"
+    db.flush()
+    db.rollback()
+    assert client.get("/contacts/search/", params={"query": "mykola"}).json() == []
+    assert [item["id"] for item in client.get("/contacts/search/", params={"query": "petro"}).json()] == [6]
+
+
+def test_search_finds_rows_written_outside_the_orm(client, db):
+    # Запити Core (або інший процес) не оновлюють індекс процесу.
+    assert client.get("/contacts/search/", params={"query": "petro"}).status_code == 200
+    db.execute(insert(Contact).values(first_name="Olena", last_name="Bondar", email="olena@example.com",
+                                      phone="5553333", birthday=date(1991, 4, 2), owner_id=1))
+    db.execute(update(Contact).where(Contact.id == 6).values(first_name="Taras"))
+    db.commit()
+    assert [item["email"] for item in client.get("/contacts/search/", params={"query": "olena"}).json()] == [
+        "olena@example.com"
+    ]
+    assert [item["id"] for item in client.get("/contacts/search/", params={"query": "taras"}).json()] == [6]
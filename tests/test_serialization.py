@@ -0,0 +1,59 @@
+import json
+import unittest
+from datetime import date
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from contacts import crud, schemas, serialization
+from contacts.models import Contact
+
+
+class TestSerialization(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _database(self, db):
+        self.db = db
+
+    def setUp(self):
+        self.db.add_all([
+            Contact(first_name="John", last_name="Doe", email="john@example.com", phone="111",
+                    birthday=date(1990, 1, 1), additional_info="Друг"),
+            Contact(first_name="Jane", last_name="Doe", email="jane@example.com", phone="222",
+                    birthday=date(1991, 2, 2)),
+        ])
+        self.db.commit()
+
+    def expected(self):
+        # Звичайний шлях FastAPI: валідація схемою відповіді та jsonable_encoder
+        contacts = crud.get_contacts(self.db)
+        return jsonable_encoder([schemas.ContactResponse.model_validate(contact) for contact in contacts])
+
+    def test_rows_to_json_matches_response_schema(self):
+        rows = crud.get_contacts_rows(self.db)
+        self.assertEqual(json.loads(serialization.rows_to_json(rows)), self.expected())
+
+    def test_objects_to_json_matches_response_schema(self):
+        contacts = crud.get_contacts(self.db)
+        self.assertEqual(json.loads(serialization.objects_to_json(contacts)), self.expected())
+
+    def test_extra_columns_are_ignored(self):
+        columns = serialization.contact_columns() + [Contact.version]
+        rows = crud.get_contacts_rows(self.db, columns=columns)
+        self.assertEqual(json.loads(serialization.rows_to_json(rows)), self.expected())
+
+    def test_parse_fields(self):
+        self.assertEqual(serialization.parse_fields(None), serialization.CONTACT_FIELDS)
+        self.assertEqual(serialization.parse_fields("phone, first_name"), ("first_name", "phone", "id"))
+        with self.assertRaises(ValueError):
+            serialization.parse_fields("first_name,password")
+
+    def test_sparse_fieldset_limits_projection(self):
+        fields = serialization.parse_fields("first_name,phone")
+        contacts = crud.get_contacts(self.db, fields=fields)
+        self.assertNotIn("additional_info", contacts[0].__dict__)
+        self.assertEqual(
+            json.loads(serialization.objects_to_json(contacts, fields))[0],
+            {"first_name": "John", "phone": "111", "id": 1},
+        )
+        rows = crud.get_contacts_rows(self.db, columns=serialization.contact_columns(fields))
+        self.assertEqual(len(rows[0]), 3)
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import StaticPool
+
+from contacts import database, main
+from contacts.config import Settings
+
+
+class TestSettings(unittest.TestCase):
+    def test_database_url_aliases(self):
+        with patch.dict("os.environ", {"DATABASE_URL": "postgresql://db/app"}, clear=True):
+            self.assertEqual(Settings(_env_file=None).database_url, "postgresql://db/app")
+        with patch.dict("os.environ", {"SQLALCHEMY_DATABASE_URL": "sqlite://", "SQLALCHEMY_ASYNC": "1"}, clear=True):
+            settings = Settings(_env_file=None)
+        self.assertEqual(settings.database_url, "sqlite://")
+        self.assertTrue(settings.db_async)
+        self.assertFalse(settings.db_create_all)
+
+    def test_env_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env_file = os.path.join(directory, ".env")
+            with open(env_file, "w") as file:
+                file.write("RATE_LIMIT_ENABLED=0\nCONTACT_CACHE_TTL=5\nMAIL_QUEUE_BATCH_SIZE=10\n")
+            with patch.dict("os.environ", {}, clear=True):
+                settings = Settings(_env_file=env_file)
+        self.assertFalse(settings.rate_limit_enabled)
+        self.assertEqual(settings.contact_cache_ttl, 5)
+        self.assertEqual(settings.mail_queue_batch_size, 10)
+
+
+class TestLifespan(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        self.patchers = [
+            patch.object(main, "get_engine", return_value=self.engine),
+            patch.object(main.password_hasher, "shutdown"),
+            patch.object(main.avatar_pipeline, "shutdown"),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+
+    def run_app(self, **settings):
+        with patch.object(main, "get_settings", return_value=Settings(_env_file=None, **settings)):
+            with TestClient(main.create_app()) as client:
+                self.assertEqual(client.get("/health/cache").status_code, 200)
+
+    def test_tables_are_not_created_by_default(self):
+        self.run_app()
+        self.assertEqual(inspect(self.engine).get_table_names(), [])
+        main.password_hasher.shutdown.assert_called_once()
+        main.avatar_pipeline.shutdown.assert_called_once()
+
+    def test_create_all_on_startup(self):
+        self.run_app(db_create_all=True)
+        self.assertIn("contacts", inspect(self.engine).get_table_names())
+
+
+class TestHealth(unittest.TestCase):
+    def test_pool_status_before_first_query(self):
+        settings = Settings(_env_file=None, database_url="sqlite://")
+        with patch.object(database, "engine", None), patch.object(database, "pool_metrics", None), \
+                patch.object(database, "get_settings", return_value=settings), \
+                patch.dict(database.SessionLocal.kw), \
+                patch.object(main, "get_settings", return_value=settings):
+            with TestClient(main.create_app()) as client:
+                response = client.get("/health/pool")
+            database.engine.dispose()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("checkouts", response.json()["sync"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,25 @@
 import unittest
-from contacts.utils import hash_password, verify_password, verify_access_token
+from datetime import timedelta
+import pytest
+from jose import JWTError, jwt
+from contacts.cache import TTLCache
+from contacts.config import Settings
+from contacts.models import User
+from contacts.utils import (
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    decode_refresh_token,
+    get_current_user,
+    get_key_ring,
+    hash_password,
+    principal_cache,
+    revoke_token,
+    verify_password,
+    verify_access_token,
+)
+from contacts.tokens import KeyRing, RevocationList, RevocationListFullError
+from sqlalchemy import text
 from unittest.mock import patch
 
 class TestUtils(unittest.TestCase):
@@ -29,5 +49,159 @@ class TestUtils(unittest.TestCase):
         with self.assertRaises(Exception):
             verify_access_token("invalid_token")
 
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = TTLCache(maxsize=2, ttl=10, timer=lambda: self.now)
+
+    def test_expiry(self):
+        self.cache.set("a", 1)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.now = 11
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), 1)
+
+
+class TestCurrentUserCache(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _database(self, session_factory):
+        self.session_factory = session_factory
+
+    def setUp(self):
+        with self.session_factory() as db:
+            user = User(email="cached@example.com", hashed_password="hashed")
+            db.add(user)
+            db.commit()
+            self.user_id = user.id
+        self.token = create_access_token({"sub": str(self.user_id)})
+        principal_cache.clear()
+
+    def test_cached_user_skips_database(self):
+        with self.session_factory() as db:
+            self.assertEqual(get_current_user(self.token, db).email, "cached@example.com")
+            # Видалення в обхід ORM не інвалідує кеш, тож користувач береться з кешу
+            db.execute(text("DELETE FROM users"))
+            db.commit()
+        with self.session_factory() as db:
+            self.assertEqual(get_current_user(self.token, db).id, self.user_id)
+
+    def test_update_invalidates_cache(self):
+        with self.session_factory() as db:
+            user = get_current_user(self.token, db)
+            user.email = "changed@example.com"
+            db.commit()
+        with self.session_factory() as db:
+            self.assertEqual(get_current_user(self.token, db).email, "changed@example.com")
+
+
+class TestTokens(unittest.TestCase):
+    def test_key_rotation(self):
+        old_ring = KeyRing.parse("old:first-secret", default_secret="unused")
+        token = jwt.encode({"sub": "1"}, old_ring.active_key, headers={"kid": old_ring.active_kid})
+        # Новий активний ключ, старий залишається для перевірки виданих токенів
+        ring = KeyRing.parse("new:second-secret,old:first-secret", default_secret="unused")
+        self.assertEqual(ring.active_kid, "new")
+        self.assertEqual(ring.key_for(token), "first-secret")
+        with self.assertRaises(JWTError):
+            KeyRing.parse("new:second-secret", default_secret="unused").key_for(token)
+        with self.assertRaises(ValueError):
+            KeyRing.parse("no-secret", default_secret="unused")
+
+    def test_key_ring_from_settings(self):
+        with patch("contacts.utils.get_settings", return_value=Settings(_env_file=None, secret_key="from-env")):
+            self.assertEqual(get_key_ring.__wrapped__().keys, {"default": "from-env"})
+        with patch("contacts.utils.get_settings", return_value=Settings(_env_file=None)), \
+                self.assertLogs("contacts.utils", "WARNING"):
+            first, second = get_key_ring.__wrapped__(), get_key_ring.__wrapped__()
+        # Без налаштованого ключа кожен процес генерує власний випадковий ключ
+        self.assertNotEqual(first.active_key, second.active_key)
+        self.assertGreaterEqual(len(first.active_key), 32)
+        with self.assertRaises(ValueError):
+            KeyRing.parse("")
+
+    def test_revoke_checks_subject(self):
+        token = create_refresh_token(1)
+        self.assertFalse(revoke_token(token, subject=2))
+        self.assertEqual(decode_refresh_token(token)["sub"], "1")
+        self.assertTrue(revoke_token(token, subject=1))
+        with self.assertRaises(JWTError):
+            decode_refresh_token(token)
+
+    def test_tokens_carry_active_kid(self):
+        token = create_access_token({"sub": "1"})
+        self.assertEqual(jwt.get_unverified_header(token)["kid"], get_key_ring().active_kid)
+
+    def test_refresh_token_is_not_an_access_token(self):
+        refresh_token = create_refresh_token(1)
+        self.assertEqual(decode_refresh_token(refresh_token)["sub"], "1")
+        with self.assertRaises(JWTError):
+            decode_access_token(refresh_token)
+        self.assertIsNone(verify_access_token(refresh_token))
+        with self.assertRaises(JWTError):
+            decode_refresh_token(create_access_token({"sub": "1"}))
+
+    def test_revoked_access_token_is_rejected_from_cache(self):
+        token = create_access_token({"sub": "1"})
+        self.assertEqual(decode_access_token(token)["sub"], "1")
+        self.assertTrue(revoke_token(token))
+        with self.assertRaises(JWTError):
+            decode_access_token(token)
+        self.assertIsNone(verify_access_token(token))
+        self.assertFalse(revoke_token(create_access_token({"sub": "1"}, timedelta(seconds=-1))))
+
+
+class TestRevocationList(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.revoked = RevocationList(capacity=2, timer=lambda: self.now)
+
+    def test_revoke_until_expiry(self):
+        self.revoked.revoke("a", expires_at=10)
+        self.assertTrue(self.revoked.is_revoked("a"))
+        self.assertFalse(self.revoked.is_revoked("b"))
+        self.now = 11
+        self.assertFalse(self.revoked.is_revoked("a"))
+
+    def test_expired_entries_are_pruned(self):
+        self.revoked.revoke("a", expires_at=10)
+        self.revoked.revoke("b", expires_at=30)
+        self.now = 20
+        self.revoked.revoke("c", expires_at=40)
+        self.assertEqual(len(self.revoked), 2)
+        self.assertTrue(self.revoked.is_revoked("b"))
+        self.assertTrue(self.revoked.is_revoked("c"))
+
+    def test_full_list_rejects_new_entries(self):
+        self.revoked.revoke("a", expires_at=10)
+        self.revoked.revoke("b", expires_at=30)
+        with self.assertRaises(RevocationListFullError):
+            self.revoked.revoke("c", expires_at=40)
+        # Непрострочені записи не витісняються, повторне відкликання дозволене
+        self.revoked.revoke("a", expires_at=10)
+        self.assertTrue(self.revoked.is_revoked("a"))
+        self.now = 10
+        self.revoked.revoke("c", expires_at=40)
+        self.assertTrue(self.revoked.is_revoked("c"))
+
+    def test_bloom_filter_is_rebuilt_in_bulk(self):
+        revoked = RevocationList(capacity=10, timer=lambda: self.now)
+        with patch.object(RevocationList, "_rebuild", autospec=True, side_effect=RevocationList._rebuild) as rebuild:
+            for i in range(100):
+                self.now = i
+                revoked.revoke(str(i), expires_at=i + 5)
+        self.assertLessEqual(rebuild.call_count, 10)
+        self.assertEqual(len(revoked), 5)
+        self.assertTrue(revoked.is_revoked("99"))
+        self.assertFalse(revoked.is_revoked("90"))
+
+
 if __name__ == '__main__':
     unittest.main()